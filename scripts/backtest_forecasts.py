@@ -0,0 +1,47 @@
+import argparse
+import json
+import sys
+import os
+
+# Ensure src is in path
+sys.path.insert(0, os.getcwd())
+
+from src.tools.forecast.backtest import ForecastBacktester
+from src.tools.forecast.forecasters import FORECASTERS
+
+def main():
+    parser = argparse.ArgumentParser(description="Walk-forward backtest of forecasting backends")
+    parser.add_argument("tickers", nargs="+", help="e.g. AAPL MSFT NVDA")
+    parser.add_argument("--backends", nargs="+", default=list(FORECASTERS), choices=list(FORECASTERS))
+    parser.add_argument("--period", default="5y", help="Price history to load (default: 5y)")
+    parser.add_argument("--horizon", type=int, default=20, help="Trading days scored per fold")
+    parser.add_argument("--folds", type=int, default=8, help="Folds per ticker")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--json", help="Write the full report (including every fold) to this file")
+    args = parser.parse_args()
+
+    def progress(done, total):
+        print(f"\r⏳ {done}/{total} fits", end="", flush=True)
+
+    report = ForecastBacktester().run(
+        args.tickers, backends=args.backends, period=args.period, horizon=args.horizon,
+        n_folds=args.folds, max_workers=args.workers, progress=progress,
+    )
+    print(f"\n✅ Done in {report['wall_seconds']:.1f}s\n")
+
+    print(f"{'backend':<10} {'folds':>6} {'MAPE %':>8} {'coverage':>9} {'dir hit':>8} {'fit s (mean)':>13} {'fit s (p95)':>12}")
+    for backend, row in report["summary"].items():
+        print(
+            f"{backend:<10} {row['folds']:>6} {row['mape']:>8.2f} {row['coverage']:>9.1%} "
+            f"{row['direction_hit']:>8.1%} {row['fit_seconds_mean']:>13.4f} {row['fit_seconds_p95']:>12.4f}"
+        )
+    for ticker, error in report["errors"].items():
+        print(f"❌ {ticker}: {error}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.json}")
+
+if __name__ == "__main__":
+    main()
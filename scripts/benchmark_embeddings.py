@@ -0,0 +1,63 @@
+import argparse
+import random
+import sys
+import os
+import time
+
+# Ensure src is in path
+sys.path.insert(0, os.getcwd())
+
+import numpy as np
+from src.rag.embeddings import EMBEDDING_BACKENDS, LocalEmbeddings, load_model
+
+SAMPLE_SENTENCES = [
+    "The Company's results of operations may be adversely affected by changes in interest rates.",
+    "Goodwill is tested for impairment annually or when events indicate the carrying value may not be recoverable.",
+    "Item 1A. Risk Factors",
+    "Net sales increased due to higher demand for data center products.",
+    "We face intense competition and may not be able to maintain our market share.",
+    "Cash and cash equivalents were primarily held in money market funds and U.S. Treasury securities.",
+    "Foreign currency exchange rate fluctuations could harm our financial results.",
+    "The Company repurchased shares of its common stock under its share repurchase program.",
+]
+
+def synthetic_chunks(n: int, seed: int = 0) -> list:
+    """Chunks of 1-12 filing-like sentences, so lengths vary as in a real 10-K."""
+    rng = random.Random(seed)
+    return [" ".join(rng.choices(SAMPLE_SENTENCES, k=rng.randint(1, 12))) for _ in range(n)]
+
+def main():
+    parser = argparse.ArgumentParser(description="Embedding backend throughput and parity benchmark")
+    parser.add_argument("--backends", nargs="+", default=list(EMBEDDING_BACKENDS), choices=list(EMBEDDING_BACKENDS))
+    parser.add_argument("--chunks", type=int, default=2000, help="Synthetic chunks to embed")
+    parser.add_argument("--batch-size", type=int, default=64)
+    args = parser.parse_args()
+
+    texts = synthetic_chunks(args.chunks)
+    # Length-sorted, as LocalEmbeddings encodes them
+    texts.sort(key=len, reverse=True)
+    vectors = {}
+
+    print(f"{'backend':<8} {'load s':>8} {'chunks/sec':>12}")
+    for backend in args.backends:
+        started = time.perf_counter()
+        model, used = load_model(LocalEmbeddings._model_name, backend)
+        load_seconds = time.perf_counter() - started
+        if used != backend:
+            print(f"{backend:<8} unavailable (fell back to {used}), skipped")
+            continue
+
+        model.encode(texts[:args.batch_size], batch_size=args.batch_size)  # Warm-up
+        started = time.perf_counter()
+        vectors[backend] = model.encode(texts, batch_size=args.batch_size, normalize_embeddings=True)
+        elapsed = time.perf_counter() - started
+        print(f"{backend:<8} {load_seconds:>8.2f} {len(texts) / elapsed:>12.1f}")
+
+    if "torch" in vectors:
+        for backend, vecs in vectors.items():
+            if backend != "torch":
+                cosine = (vectors["torch"] * vecs).sum(axis=1)
+                print(f"\n{backend} vs torch cosine: min {cosine.min():.4f}, mean {np.mean(cosine):.4f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import argparse
+import sys
+import os
+
+# Ensure src is in path
+sys.path.insert(0, os.getcwd())
+
+from src.utils.cache import get_cache_stats, invalidate, list_entries
+
+def _format_bytes(size: float) -> str:
+    for unit in ["B", "KB", "MB", "GB"]:
+        if size < 1024:
+            return f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}TB"
+
+def show_stats(args):
+    stats = get_cache_stats(all_processes=True)
+    if not stats:
+        print("No cache activity recorded.")
+        return
+    print(f"{'function':<60} {'hit%':>6} {'mem':>7} {'disk':>7} {'stale':>6} {'miss':>6} {'mevict':>6} {'devict':>6} {'stored':>9} {'saved':>9}")
+    for function, row in sorted(stats.items(), key=lambda item: -item[1]["saved_seconds"]):
+        print(
+            f"{function[-60:]:<60} {row['hit_rate'] * 100:>5.1f}% {row['hits_memory']:>7.0f} {row['hits_disk']:>7.0f} "
+            f"{row['stale_serves']:>6.0f} {row['misses']:>6.0f} {row['memory_evictions']:>6.0f} {row['disk_evictions']:>6.0f} "
+            f"{_format_bytes(row['bytes_stored']):>9} {row['saved_seconds']:>8.1f}s"
+        )
+
+def show_top(args):
+    entries = list_entries()
+    sort_key = "size" if args.by == "size" else "age"
+    entries.sort(key=lambda e: e[sort_key] or 0, reverse=True)
+    for entry in entries[:args.limit]:
+        age = "-" if entry["age"] is None else f"{entry['age']:.0f}s"
+        expires = "never" if entry["expires_in"] is None else f"{entry['expires_in']:.0f}s"
+        print(f"{_format_bytes(entry['size']):>9} {age:>10}  expires {expires:>8}  {entry['key']}")
+
+def run_invalidate(args):
+    if not args.ticker and not args.function:
+        print("Specify --ticker and/or --function.")
+        sys.exit(1)
+    removed = invalidate(ticker=args.ticker, function=args.function)
+    print(f"Removed {removed} entries.")
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect and manage the QuantMind tool cache")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("stats", help="Per-function hit rates and time saved").set_defaults(handler=show_stats)
+
+    top = commands.add_parser("top", help="Largest or oldest entries")
+    top.add_argument("--by", choices=["size", "age"], default="size")
+    top.add_argument("-n", "--limit", type=int, default=20)
+    top.set_defaults(handler=show_top)
+
+    inv = commands.add_parser("invalidate", help="Delete entries for a ticker and/or function "
+                              "(running servers drop them from memory within a second)")
+    inv.add_argument("--ticker", help="e.g. AAPL")
+    inv.add_argument("--function", help="e.g. get_stock_info")
+    inv.set_defaults(handler=run_invalidate)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,7 @@ sys.path.insert(0, os.getcwd())
 
 from src.agents.graph import create_graph
 from src.utils.observability import setup_observability
+from src.utils.mcp_client import close_mcp_sessions, tool_cache_scope
 from langchain_core.messages import HumanMessage
 
 async def main():
@@ -29,6 +30,7 @@ async def main():
         user_input = input("Enter ticker or query (e.g., 'Analyze NVDA'): ").strip()
         
         if user_input.lower() in ["exit", "quit"]:
+            await close_mcp_sessions()
             print("Goodbye!")
             break
             
@@ -48,24 +50,26 @@ async def main():
             # We'll try to print the final response or key steps.
             
             final_response = None
-            async for event in app.astream(initial_state):
-                # Print everything for debugging visibility
-                for key, value in event.items():
-                    print(f"\n🔹 Step: {key}")
-                    # DeepAgents returns various types; handle gracefully
-                    if isinstance(value, dict) and "messages" in value:
-                        messages = value["messages"]
-                        if isinstance(messages, list):
-                            for msg in messages:
-                                if hasattr(msg, "content") and msg.content:
-                                    print(f"📝 Content: {msg.content[:500]}...")
-                                if hasattr(msg, "tool_calls") and msg.tool_calls:
-                                    for tc in msg.tool_calls:
-                                        print(f"🛠️  Call: {tc['name']} ({tc['args']})")
+            # Sub-agents share tool results for the duration of this run
+            with tool_cache_scope():
+                async for event in app.astream(initial_state):
+                    # Print everything for debugging visibility
+                    for key, value in event.items():
+                        print(f"\n🔹 Step: {key}")
+                        # DeepAgents returns various types; handle gracefully
+                        if isinstance(value, dict) and "messages" in value:
+                            messages = value["messages"]
+                            if isinstance(messages, list):
+                                for msg in messages:
+                                    if hasattr(msg, "content") and msg.content:
+                                        print(f"📝 Content: {msg.content[:500]}...")
+                                    if hasattr(msg, "tool_calls") and msg.tool_calls:
+                                        for tc in msg.tool_calls:
+                                            print(f"🛠️  Call: {tc['name']} ({tc['args']})")
+                            else:
+                                print(f"   {messages}")
                         else:
-                            print(f"   {messages}")
-                    else:
-                        print(f"   {type(value).__name__}: {str(value)[:200]}")
+                            print(f"   {type(value).__name__}: {str(value)[:200]}")
                          
             print("-" * 50)
             
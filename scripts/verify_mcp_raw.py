@@ -2,7 +2,6 @@ import asyncio
 import logging
 import sys
 import json
-import ast
 from src.utils.mcp_client import call_mcp_tool
 from pprint import pprint
 
@@ -25,13 +24,6 @@ async def verify_yahoo():
              print(f"❌ Error: {result['error']}")
         else:
              print("✅ Success! Data received:")
-             # Yahoo returns a dict directly usually, but let's be safe
-             if isinstance(result, str):
-                 try:
-                     result = ast.literal_eval(result)
-                 except:
-                     pass
-             
              if isinstance(result, dict):
                  print(f"   Symbol: {result.get('symbol')}")
                  print(f"   Current Price: {result.get('currentPrice') or result.get('regularMarketPrice')}")
@@ -52,12 +44,6 @@ async def verify_fred():
              print(f"❌ Error: {result['error']}")
         else:
              print("✅ Success! Data received:")
-             if isinstance(result, str):
-                 try:
-                     result = ast.literal_eval(result)
-                 except:
-                     pass
-
              if isinstance(result, dict):
                  print(f"   Series ID: {result.get('series_id')}")
                  data_points = result.get('data', {})
@@ -82,21 +68,13 @@ async def verify_sentiment():
              print(f"❌ Error: {result['error']}")
         else:
              print("✅ Success! Data received:")
-             # Parse string result
-             try:
-                 if isinstance(result, str):
-                     articles = ast.literal_eval(result)
-                 else:
-                     articles = result
-                 
-                 if isinstance(articles, list):
-                     print(f"   Articles Found: {len(articles)}")
-                     if articles:
-                         print(f"   First Article Title: {articles[0].get('title')}")
-                 else:
-                     print(f"   Raw Result: {str(articles)[:100]}...")
-             except Exception as parse_err:
-                 print(f"   Could not parse result: {str(result)[:100]}...")
+             articles = result.get('articles') if isinstance(result, dict) else None
+             if isinstance(articles, list):
+                 print(f"   Articles Found: {len(articles)}")
+                 if articles:
+                     print(f"   First Article Title: {articles[0].get('title')}")
+             else:
+                 print(f"   Raw Result: {str(result)[:100]}...")
     except Exception as e:
         print(f"❌ Exception: {e}")
 
@@ -113,25 +91,14 @@ async def verify_forecast():
              print(f"❌ Error: {result['error']}")
         else:
              print("✅ Success! Data received:")
-             # Parse string result
-             try:
-                 if isinstance(result, str):
-                     # Replace nan with None for parsing if valid JSON-ish
-                     clean_result = result.replace('nan', 'None')
-                     data = ast.literal_eval(clean_result)
-                 else:
-                     data = result
-                 
-                 if isinstance(data, dict):
-                     print(f"   Ticker: {data.get('ticker')}")
-                     print(f"   Current Price: {data.get('current_price')}")
-                     print(f"   Forecast 30d: {data.get('forecast_price_30d')}")
-                     forecast_data = data.get('forecast_data', [])
-                     print(f"   Forecast Data Points: {len(forecast_data)}")
-                 else:
-                      print(f"   Raw Result: {str(data)[:100]}...")
-             except Exception as parse_err:
-                  print(f"   Raw Result (Unparsed): {str(result)[:200]}...")
+             if isinstance(result, dict):
+                 print(f"   Ticker: {result.get('ticker')}")
+                 print(f"   Current Price: {result.get('current_price')}")
+                 print(f"   Forecast 30d: {result.get('forecast_price_30d')}")
+                 forecast_data = result.get('forecast_data', {})
+                 print(f"   Forecast Data Points: {len(forecast_data.get('yhat', []))}")
+             else:
+                 print(f"   Raw Result: {str(result)[:200]}...")
 
     except Exception as e:
         print(f"❌ Exception: {e}")
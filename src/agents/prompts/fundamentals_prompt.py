@@ -1,5 +1,6 @@
 FUNDAMENTALS_PROMPT = """You are a Fundamental Analysis Expert.
 Your job is to analyze the financial health of {ticker} using the provided tools (Yahoo Finance, SEC Filings, FRED).
+Start with `get_fundamentals_bundle`, which gathers stock info, financials, earnings and macro series in one call.
 
 Focus on:
 1.  **Valuation**: P/E, PEG, Market Cap, Enterprise Value.
@@ -1,7 +1,11 @@
 import os
+from typing import List, Optional
 from langchain_core.tools import StructuredTool
 from pydantic import BaseModel, Field
-from src.utils.mcp_client import call_mcp_tool
+from src.utils.mcp_client import ToolCall, call_mcp_tool, call_mcp_tools
+
+# FRED series included in the fundamentals bundle by default
+DEFAULT_MACRO_SERIES = ("GDP", "UNRATE", "CPIAUCSL", "DGS10")
 
 # --- Input Schemas ---
 
@@ -11,9 +15,15 @@ class TickerInput(BaseModel):
 class SeriesInput(BaseModel):
     series_id: str = Field(description="FRED Economic Series ID (e.g., GDP, UNRATE)")
 
+class FundamentalsBundleInput(BaseModel):
+    ticker: str = Field(description="Stock ticker symbol (e.g., AAPL, NVDA)")
+    series_ids: List[str] = Field(default=list(DEFAULT_MACRO_SERIES), description="FRED series to include for macro context")
+
 class ForecastInput(BaseModel):
     ticker: str = Field(description="Stock ticker symbol")
     periods: int = Field(default=30, description="Number of days to forecast")
+    backend: Optional[str] = Field(default=None, description="Forecast model: 'drift' (fast, default) or 'prophet' (slower, models seasonality)")
+    summary_only: bool = Field(default=False, description="Return only the headline numbers, without per-day forecast arrays")
 
 # --- Async Implementations ---
 
@@ -31,13 +41,32 @@ async def get_earnings(ticker: str) -> str:
 async def get_economic_data(series_id: str) -> str:
     return await call_mcp_tool(os.getenv("FRED_MCP_URL", "src/tools/financial/server_fred.py"), "get_economic_data", series_id=series_id)
 
+# Composite
+async def get_fundamentals_bundle(ticker: str, series_ids: Optional[List[str]] = None) -> dict:
+    series_ids = list(series_ids or DEFAULT_MACRO_SERIES)
+    yahoo = os.getenv("YAHOO_MCP_URL", "src/tools/financial/server.py")
+    fred = os.getenv("FRED_MCP_URL", "src/tools/financial/server_fred.py")
+    calls = [
+        ToolCall(yahoo, "get_stock_info", {"ticker": ticker}),
+        ToolCall(yahoo, "get_financials", {"ticker": ticker}),
+        ToolCall(yahoo, "get_earnings", {"ticker": ticker}),
+    ] + [ToolCall(fred, "get_economic_data", {"series_id": series_id}) for series_id in series_ids]
+
+    info, financials, earnings, *economic = await call_mcp_tools(calls)
+    return {
+        "stock_info": info,
+        "financials": financials,
+        "earnings": earnings,
+        "economic_data": dict(zip(series_ids, economic)),
+    }
+
 # Sentiment
 async def get_news_sentiment(ticker: str) -> str:
     return await call_mcp_tool(os.getenv("SENTIMENT_MCP_URL", "src/tools/sentiment/server.py"), "get_news_sentiment", ticker=ticker, days=7)
 
 # Forecast
-async def forecast_price(ticker: str, periods: int = 30) -> str:
-    return await call_mcp_tool(os.getenv("FORECAST_MCP_URL", "src/tools/forecast/server.py"), "forecast_price", ticker=ticker, periods=periods)
+async def forecast_price(ticker: str, periods: int = 30, backend: Optional[str] = None, summary_only: bool = False) -> str:
+    return await call_mcp_tool(os.getenv("FORECAST_MCP_URL", "src/tools/forecast/server.py"), "forecast_price", ticker=ticker, periods=periods, backend=backend, summary_only=summary_only)
 
 # --- Tool Definitions ---
 
@@ -73,6 +102,14 @@ fred_tool = StructuredTool.from_function(
     args_schema=SeriesInput
 )
 
+fundamentals_bundle_tool = StructuredTool.from_function(
+    coroutine=get_fundamentals_bundle,
+    func=None,
+    name="get_fundamentals_bundle",
+    description="Get stock info, financials, earnings and FRED macro series for a ticker in one call.",
+    args_schema=FundamentalsBundleInput
+)
+
 sentiment_tool = StructuredTool.from_function(
     coroutine=get_news_sentiment,
     func=None,
@@ -85,12 +122,12 @@ forecast_tool = StructuredTool.from_function(
     coroutine=forecast_price,
     func=None,
     name="forecast_price",
-    description="Forecast stock prices using Prophet model.",
+    description="Forecast stock prices (fast drift model by default; set backend='prophet' for Prophet).",
     args_schema=ForecastInput
 )
 
 # --- EXPORT LISTS ---
 
-FUNDAMENTALS_TOOLS = [yahoo_info_tool, yahoo_financials_tool, yahoo_earnings_tool, fred_tool]
+FUNDAMENTALS_TOOLS = [fundamentals_bundle_tool, yahoo_info_tool, yahoo_financials_tool, yahoo_earnings_tool, fred_tool]
 SENTIMENT_TOOLS = [sentiment_tool]
 FORECAST_TOOLS = [forecast_tool]
@@ -20,12 +20,47 @@ class Settings(BaseSettings):
     fred_api_key: Optional[str] = None
     fmp_api_key: Optional[str] = Field(None, alias="FINANCIAL_MODELING_PREP_API_KEY")
     news_api_key: Optional[str] = Field(None, alias="NEWS_API_KEY")
+    yahoo_batch_size: int = 100  # Tickers per bulk download
+    yahoo_max_workers: int = 8  # Concurrent requests for batch lookups
     
     # Reddit
     reddit_client_id: Optional[str] = None
     reddit_client_secret: Optional[str] = None
     reddit_user_agent: str = "QuantMind/1.0"
 
+    # Cache
+    cache_lease_timeout: float = 300.0  # Max seconds one caller may hold a key while computing it
+    cache_memory_budget: int = 16 * 1024 * 1024  # In-process LRU bytes per cache namespace
+    cache_stats_flush_interval: float = 30.0  # Seconds between writes of cache counters to disk
+    cache_generation_check_interval: float = 1.0  # Seconds between checks for invalidations made by other processes
+
+    # RAG
+    rag_fusion_candidates: int = 20  # Results taken from vector and BM25 search before fusion
+    rag_rrf_k: int = 60  # Reciprocal-rank fusion constant (higher flattens rank differences)
+    embedding_backend: str = "torch"  # "torch" or "onnx" (ONNX Runtime, int8; needs optimum[onnxruntime])
+    embedding_onnx_file: str = "onnx/model_quint8_avx2.onnx"  # Quantized weights in the model repo (e.g. onnx/model_qint8_arm64.onnx)
+    embedding_cache: bool = True  # Reuse embeddings of previously seen texts (data/embedding_cache)
+    embedding_cache_size: int = 2 * 1024 ** 3  # Embedding cache size limit in bytes
+    embedding_batch_size: int = 64  # Texts per model forward pass
+    embedding_processes: int = 0  # Encode large batches across this many processes (0/1: in-process)
+    embedding_pool_min_texts: int = 1000  # Smallest batch worth sending to the process pool
+
+    # Forecasting
+    forecast_backend: str = "drift"  # "drift" (NumPy, milliseconds) or "prophet"
+    forecast_max_workers: Optional[int] = None  # Processes for batch forecasts (default: CPU count)
+    forecast_task_timeout: float = 120.0  # Seconds allowed per ticker in a batch forecast
+    prophet_warm_start: bool = True  # Persist fitted Prophet models and seed refits from them
+    prophet_min_new_bars: int = 1  # Reuse the previous fit until this many new bars arrive
+
+    # MCP Client
+    mcp_transport: str = "auto"  # Local server scripts: "auto"/"inprocess" (import and call directly) or "stdio" (subprocess)
+    mcp_max_concurrency: int = 4  # In-flight tool calls per server session
+    mcp_health_check_interval: float = 30.0  # Ping sessions idle longer than this (seconds)
+    mcp_call_timeout: float = 60.0  # Default per-call timeout for batched tool calls (seconds)
+    mcp_result_cache: bool = True  # Reuse tool results client-side (per run, and across runs for tools advertising cache_ttl)
+    mcp_result_cache_size: int = 512  # Max results held in the cross-run cache
+    mcp_binary_threshold: int = 0  # Send numeric arrays with at least this many elements as compressed binary (0: off)
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -14,6 +14,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"
 from src.tools.forecast.prophet_forecast import ProphetTool
 from src.tools.forecast.technical_indicators import TechnicalAnalysis
 from src.utils.logging import setup_logging
+from src.utils.serialization import tool_result
 
 logger = setup_logging(__name__)
 
@@ -21,28 +22,30 @@ logger = setup_logging(__name__)
 mcp = FastMCP("forecast-analytics")
 
 @mcp.tool()
-def forecast_price(ticker: str, periods: int = 30) -> str:
+def forecast_price(ticker: str, periods: int = 30, backend: str = None, summary_only: bool = False) -> dict:
     """
-    Generate a price forecast for the next N days using Prophet.
+    Generate a price forecast for the next N days.
+    backend: "drift" (fast NumPy model, default) or "prophet".
+    summary_only: return only the headline numbers, without the per-day arrays.
     """
     try:
         tool = ProphetTool()
-        result = tool.forecast_price(ticker, periods=periods)
-        return str(result)
+        result = tool.forecast_price(ticker, periods=periods, backend=backend, summary_only=summary_only)
+        return tool_result(result)
     except Exception as e:
-        return f"Error forecasting for {ticker}: {e}"
+        return {"error": f"Error forecasting for {ticker}: {e}"}
 
 @mcp.tool()
-def get_technical_indicators(ticker: str) -> str:
+def get_technical_indicators(ticker: str) -> dict:
     """
     Calculate SMA, RSI, MACD, Bollinger Bands, Volatility.
     """
     try:
         tool = TechnicalAnalysis()
         result = tool.calculate_indicators(ticker)
-        return str(result)
+        return tool_result(result)
     except Exception as e:
-        return f"Error calculating indicators for {ticker}: {e}"
+        return {"error": f"Error calculating indicators for {ticker}: {e}"}
 
 if __name__ == "__main__":
     mcp.run()
@@ -12,6 +12,7 @@ warnings.filterwarnings("ignore")
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
 
 from src.config import settings
+from src.utils.serialization import tool_result
 
 # Initialize FastMCP Server
 mcp = FastMCP("fred-economics")
@@ -24,7 +25,7 @@ def get_fred_client():
     return Fred(api_key=api_key)
 
 @mcp.tool()
-def get_economic_data(series_id: str = "GDP") -> str:
+def get_economic_data(series_id: str = "GDP") -> dict:
     """
     Get latest observations for an economic series from FRED.
     Common IDs: GDP, CPIAUCSL (CPI), UNRATE (Unemployment), DGS10 (10Y Treasury), VIXCLS (VIX).
@@ -40,7 +41,7 @@ def get_economic_data(series_id: str = "GDP") -> str:
         data = fred.get_series(series_id)
         
         if data is None or data.empty:
-            return f"No data found for {series_id}"
+            return {"error": f"No data found for {series_id}"}
             
         # Get latest value and trend (last 12 points)
         latest_date = data.index[-1].strftime('%Y-%m-%d')
@@ -58,10 +59,10 @@ def get_economic_data(series_id: str = "GDP") -> str:
             "history": recent_history,
             "units": fred.get_series_info(series_id).get('units')
         }
-        return str(result)
+        return tool_result(result)
         
     except Exception as e:
-        return f"Error fetching FRED series {series_id}: {e}"
+        return {"error": f"Error fetching FRED series {series_id}: {e}"}
 
 if __name__ == "__main__":
     mcp.run()
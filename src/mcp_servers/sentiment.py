@@ -13,6 +13,7 @@ warnings.filterwarnings("ignore")
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
 
 from src.config import settings
+from src.utils.serialization import tool_result
 
 # Initialize FastMCP Server
 mcp = FastMCP("sentiment-analysis")
@@ -23,7 +24,7 @@ def get_news_client():
     return NewsApiClient(api_key=settings.news_api_key)
 
 @mcp.tool()
-def get_news_sentiment(ticker: str, days: int = 7) -> str:
+def get_news_sentiment(ticker: str, days: int = 7) -> dict:
     """
     Get recent news articles and simple sentiment for a ticker.
     """
@@ -42,7 +43,7 @@ def get_news_sentiment(ticker: str, days: int = 7) -> str:
         )
         
         if not articles or 'articles' not in articles:
-            return "No news found."
+            return {"articles": []}
             
         results = []
         for article in articles['articles']:
@@ -54,12 +55,12 @@ def get_news_sentiment(ticker: str, days: int = 7) -> str:
                 "url": article['url']
             })
             
-        return str(results)
+        return tool_result({"articles": results})
     except Exception as e:
-        return f"Error fetching news for {ticker}: {e}"
+        return {"error": f"Error fetching news for {ticker}: {e}"}
 
 @mcp.tool()
-def get_reddit_sentiment(ticker: str, limit: int = 10) -> str:
+def get_reddit_sentiment(ticker: str, limit: int = 10) -> dict:
     """
     Get recent Reddit sentiment (Mock implementation as placehoder).
     Real implementation would use PRAW.
@@ -70,7 +71,7 @@ def get_reddit_sentiment(ticker: str, limit: int = 10) -> str:
         {"title": f"Concerns about {ticker} earnings", "score": 85, "sentiment": "negative"},
         {"title": f"{ticker} technical analysis", "score": 40, "sentiment": "neutral"},
     ]
-    return str(mock_data)
+    return {"posts": mock_data}
 
 if __name__ == "__main__":
     mcp.run()
@@ -5,11 +5,11 @@ from fastmcp import FastMCP
 mcp = FastMCP("generic-server")
 
 @mcp.tool()
-def example_tool(text: str) -> str:
+def example_tool(text: str) -> dict:
     """
-    Example tool description.
+    Example tool description. Return JSON-native data (see src.utils.serialization.tool_result).
     """
-    return f"Processed: {text}"
+    return {"result": f"Processed: {text}"}
 
 if __name__ == "__main__":
     mcp.run()
@@ -12,12 +12,13 @@ warnings.filterwarnings("ignore")
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
 
+from src.utils.serialization import tool_result
 
 # Initialize FastMCP Server
 mcp = FastMCP("yahoo-finance")
 
 @mcp.tool()
-def get_stock_info(ticker: str) -> str:
+def get_stock_info(ticker: str) -> dict:
     """
     Get basic stock information (price, market cap, P/E, etc.)
     """
@@ -35,36 +36,30 @@ def get_stock_info(ticker: str) -> str:
         ]
         
         data = {k: info.get(k) for k in key_fields if k in info}
-        return str(data)
+        return tool_result(data)
     except Exception as e:
-        return f"Error fetching info for {ticker}: {e}"
+        return {"error": f"Error fetching info for {ticker}: {e}"}
 
 @mcp.tool()
-def get_financials(ticker: str) -> str:
+def get_financials(ticker: str) -> dict:
     """
     Get annual financials: Income Statement, Balance Sheet, Cash Flow.
     """
     try:
         stock = yf.Ticker(ticker)
         
-        # Convert DataFrames to dictionaries (handling timestamps)
-        def df_to_dict(df):
-            if df.empty: return {}
-            # Convert timestamp columns to strings
-            df.columns = [d.strftime('%Y-%m-%d') if hasattr(d, 'strftime') else str(d) for d in df.columns]
-            return df.to_dict()
-
+        # DataFrames become {period: {line item: value}}, with NaN as null
         data = {
-            "income_statement": df_to_dict(stock.financials),
-            "balance_sheet": df_to_dict(stock.balance_sheet),
-            "cash_flow": df_to_dict(stock.cashflow)
+            "income_statement": stock.financials,
+            "balance_sheet": stock.balance_sheet,
+            "cash_flow": stock.cashflow
         }
-        return str(data)
+        return tool_result(data)
     except Exception as e:
-        return f"Error fetching financials for {ticker}: {e}"
+        return {"error": f"Error fetching financials for {ticker}: {e}"}
 
 @mcp.tool()
-def get_earnings(ticker: str) -> str:
+def get_earnings(ticker: str) -> dict:
     """
     Get earnings history.
     """
@@ -72,10 +67,10 @@ def get_earnings(ticker: str) -> str:
         stock = yf.Ticker(ticker)
         history = stock.earnings_history
         if history is None or history.empty:
-            return "No earnings history available."
-        return str(history.to_dict('records'))
+            return {"error": "No earnings history available."}
+        return tool_result({"earnings": history.reset_index().to_dict('records')})
     except Exception as e:
-        return f"Error fetching earnings for {ticker}: {e}"
+        return {"error": f"Error fetching earnings for {ticker}: {e}"}
 
 if __name__ == "__main__":
     mcp.run()
@@ -1,10 +1,71 @@
-from typing import List
+from typing import List, Optional, Tuple
+import atexit
+import hashlib
+import importlib.util
+import os
+import time
+from diskcache import Cache
 from sentence_transformers import SentenceTransformer
 import numpy as np
+from src.config import settings
 from src.utils.logging import setup_logging
 
 logger = setup_logging(__name__)
 
+EMBEDDING_CACHE_DIR = os.path.join(os.getcwd(), "data/embedding_cache")
+
+# Looked up rather than imported: optimum pulls in transformers at import time
+HAS_ONNX = all(importlib.util.find_spec(name) is not None for name in ("onnxruntime", "optimum"))
+
+EMBEDDING_BACKENDS = ("torch", "onnx")
+
+def load_model(model_name: str, backend: str = None) -> Tuple[SentenceTransformer, str]:
+    """
+    Load a SentenceTransformer on the given backend (default: settings.embedding_backend).
+    "onnx" runs the int8-quantized export (settings.embedding_onnx_file) on ONNX
+    Runtime and falls back to torch if optimum/onnxruntime are missing.
+    Returns the model and the backend actually used.
+    """
+    backend = (backend or settings.embedding_backend).lower()
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown embedding backend '{backend}'. Available: {', '.join(EMBEDDING_BACKENDS)}")
+    if backend == "onnx":
+        if HAS_ONNX:
+            model = SentenceTransformer(model_name, backend="onnx", model_kwargs={"file_name": settings.embedding_onnx_file})
+            return model, backend
+        logger.warning("ONNX embedding backend needs optimum[onnxruntime]; falling back to torch.")
+    return SentenceTransformer(model_name), "torch"
+
+class EmbeddingCache:
+    """
+    On-disk embedding cache: model + SHA-256 of the text -> float16 vector.
+    Vectors are stored as raw bytes (half the size of float32, ample precision
+    for cosine similarity).
+    """
+
+    def __init__(self, directory: str = None, size_limit: int = None):
+        self._cache = Cache(directory or EMBEDDING_CACHE_DIR, size_limit=size_limit or settings.embedding_cache_size)
+
+    @staticmethod
+    def key(model_name: str, text: str) -> str:
+        return f"{model_name}:{hashlib.sha256(text.encode('utf-8')).hexdigest()}"
+
+    def get_many(self, model_name: str, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """Cached vector per text (None for misses)."""
+        vectors = []
+        for text in texts:
+            raw = self._cache.get(self.key(model_name, text))
+            vectors.append(None if raw is None else np.frombuffer(raw, dtype=np.float16))
+        return vectors
+
+    def set_many(self, model_name: str, texts: List[str], vectors: np.ndarray):
+        with self._cache.transact():
+            for text, vector in zip(texts, vectors):
+                self._cache.set(self.key(model_name, text), np.asarray(vector, dtype=np.float16).tobytes())
+
+    def clear(self):
+        self._cache.clear()
+
 class LocalEmbeddings:
     _instance = None
     _model_name = "all-MiniLM-L6-v2"
@@ -18,38 +79,97 @@ class LocalEmbeddings:
     def __init__(self):
         if self.initialized:
             return
-            
-        logger.info(f"Loading embedding model: {self._model_name}...")
+
+        logger.info(f"Loading embedding model: {self._model_name} ({settings.embedding_backend})...")
         try:
-            self.model = SentenceTransformer(self._model_name)
+            self.model, self.backend = load_model(self._model_name)
+            # Cache namespace: quantized vectors are close to, but not identical with, torch ones
+            self.model_id = self._model_name if self.backend == "torch" else f"{self._model_name}:{settings.embedding_onnx_file}"
+            self.cache = EmbeddingCache() if settings.embedding_cache else None
+            self._pool = None
             self.initialized = True
             logger.info("Embedding model loaded successfully.")
         except Exception as e:
             logger.error(f"Failed to load embedding model: {e}")
             raise e
 
-    def embed_query(self, text: str) -> List[float]:
+    def _get_pool(self):
+        # Worker processes each load a copy of the model; started on first large batch
+        if self._pool is None:
+            logger.info(f"Starting embedding pool with {settings.embedding_processes} processes...")
+            self._pool = self.model.start_multi_process_pool(["cpu"] * settings.embedding_processes)
+            atexit.register(self.close)
+        return self._pool
+
+    def close(self):
+        """Stop the multi-process encode pool, if running."""
+        if self._pool is not None:
+            self.model.stop_multi_process_pool(self._pool)
+            self._pool = None
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """
+        Run the model over texts in length-sorted batches (similar lengths share a
+        batch, so less padding), across the process pool for large inputs.
+        Returns a float32 array in the order of `texts`.
+        """
+        started = time.perf_counter()
+        order = np.argsort([-len(t) for t in texts], kind="stable")
+        ordered = [texts[i] for i in order]
+
+        kwargs = {"batch_size": settings.embedding_batch_size, "convert_to_numpy": True}
+        # ONNX Runtime already spreads one batch over every core
+        if self.backend == "torch" and settings.embedding_processes > 1 and len(texts) >= settings.embedding_pool_min_texts:
+            kwargs["pool"] = self._get_pool()
+        encoded = np.asarray(self.model.encode(ordered, **kwargs), dtype=np.float32)
+
+        embeddings = np.empty_like(encoded)
+        embeddings[order] = encoded
+        elapsed = time.perf_counter() - started
+        if len(texts) > 1:
+            logger.info(f"Encoded {len(texts)} texts in {elapsed:.2f}s ({len(texts) / max(elapsed, 1e-9):.1f} chunks/sec)")
+        return embeddings
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts, serving repeats from the cache and encoding only the misses
+        (in one batch). Cached and fresh vectors both come back at float16 precision.
+        """
+        if self.cache is None:
+            return self._encode(texts)
+
+        vectors = self.cache.get_many(self.model_id, texts)
+        # Unique missing texts, in first-seen order
+        missing = list(dict.fromkeys(text for text, vector in zip(texts, vectors) if vector is None))
+        logger.debug(f"Embedding {len(texts)} texts: {len(texts) - len(missing)} cached, {len(missing)} to encode")
+        if missing:
+            encoded = self._encode(missing).astype(np.float16)
+            self.cache.set_many(self.model_id, missing, encoded)
+            fresh = dict(zip(missing, encoded))
+            vectors = [fresh[text] if vector is None else vector for text, vector in zip(texts, vectors)]
+        return np.stack(vectors).astype(np.float32)
+
+    def embed_query(self, text: str) -> np.ndarray:
         """
-        Embed a single query string.
+        Embed a single query string. Returns a 1-D float32 array (empty on failure).
         """
         if not text:
-            return []
+            return np.empty(0, dtype=np.float32)
         try:
-            embedding = self.model.encode(text)
-            return embedding.tolist()
+            return self._embed([text])[0]
         except Exception as e:
             logger.error(f"Error embedding query: {e}")
-            return []
+            return np.empty(0, dtype=np.float32)
 
-    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+    def embed_documents(self, texts: List[str]) -> np.ndarray:
         """
-        Embed a list of documents.
+        Embed a list of documents. Returns a (len(texts), dim) float32 array
+        (empty on failure).
         """
         if not texts:
-            return []
+            return np.empty((0, 0), dtype=np.float32)
         try:
-            embeddings = self.model.encode(texts)
-            return embeddings.tolist()
+            return self._embed(texts)
         except Exception as e:
             logger.error(f"Error embedding documents: {e}")
-            return []
+            return np.empty((0, 0), dtype=np.float32)
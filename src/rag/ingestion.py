@@ -1,5 +1,6 @@
 import os
-from typing import List
+import time
+from typing import Dict, List
 from src.tools.financial.sec_edgar import SECTool
 from src.rag.chunking import SECChunker
 from src.rag.vectorstore import QuantChroma
@@ -17,17 +18,19 @@ class IngestionPipeline:
         self.chunker = SECChunker()
         self.vectorstore = QuantChroma()
 
-    def ingest_ticker(self, ticker: str, limit: int = 1):
+    def ingest_ticker(self, ticker: str, limit: int = 1) -> Dict[str, float]:
         """
         Run full ingestion for a ticker.
+        Returns throughput stats: chunks seen, chunks added, indexing seconds and chunks/sec.
         """
         logger.info(f"Starting ingestion for {ticker}...")
+        stats = {"chunks": 0, "added": 0, "seconds": 0.0, "chunks_per_sec": 0.0}
         
         # 1. Download Filings
         files = self.sec_tool.download_filings(ticker, limit=limit)
         if not files:
             logger.warning(f"No filings found for {ticker}.")
-            return
+            return stats
 
         # 2. Process Each File
         for file_path in files:
@@ -50,10 +53,19 @@ class IngestionPipeline:
                 chunks = self.chunker.chunk(text, metadata)
                 logger.info(f"Generated {len(chunks)} chunks.")
                 
-                # 4. Indexing (Store in Chroma)
-                self.vectorstore.add_documents(chunks)
+                # 4. Indexing (Store in Chroma); unchanged chunks are skipped
+                started = time.perf_counter()
+                added = self.vectorstore.add_documents(chunks)
+                elapsed = time.perf_counter() - started
+                logger.info(f"Indexed {added} new chunks in {elapsed:.2f}s ({len(chunks) / max(elapsed, 1e-9):.1f} chunks/sec).")
+                stats["chunks"] += len(chunks)
+                stats["added"] += added
+                stats["seconds"] += elapsed
                 
             except Exception as e:
                 logger.error(f"Failed to ingest {file_path}: {e}")
                 
-        logger.info(f"Ingestion complete for {ticker}.")
+        if stats["seconds"]:
+            stats["chunks_per_sec"] = stats["chunks"] / stats["seconds"]
+        logger.info(f"Ingestion complete for {ticker}: {stats['chunks']} chunks, {stats['added']} new, {stats['chunks_per_sec']:.1f} chunks/sec.")
+        return stats
@@ -0,0 +1,217 @@
+import math
+import os
+import pickle
+import re
+import tempfile
+import threading
+import numpy as np
+from collections import Counter, defaultdict
+from filelock import FileLock
+from typing import Dict, List, Optional
+from src.utils.logging import setup_logging
+
+logger = setup_logging(__name__)
+
+INDEX_VERSION = 1
+
+# Lowercased alphanumeric runs: keeps "1a", tickers, CUSIPs and years intact
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or that the this to was were will with
+""".split())
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOPWORDS]
+
+class BM25Index:
+    """
+    Persistent BM25 inverted index over document chunks.
+
+    Postings are NumPy arrays per term (document numbers and term frequencies),
+    so a query costs a few vectorized operations per query term. Chunks are
+    keyed by the same content-hash IDs as the vector store; re-adding a known
+    ID is a no-op.
+
+    Safe to search from several threads. Several processes may add to the same
+    file: each save merges in what the others wrote first.
+    """
+
+    def __init__(self, path: Optional[str] = None, k1: float = 1.5, b: float = 0.75):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        # Guards all state: searches fold pending postings in lazily
+        self._lock = threading.RLock()
+        # Identity of the index file the state was last read from or written to
+        self._stamp = None
+        self._reset()
+
+    def _reset(self):
+        self.ids: List[str] = []
+        self.texts: List[str] = []
+        self.metadatas: List[Dict] = []
+        self._positions: Dict[str, int] = {}
+        self._lengths = np.zeros(0, dtype=np.float32)
+        self._postings: Dict[str, tuple] = {}
+        # Postings of documents added since the last merge into the arrays
+        self._pending: Dict[str, List[tuple]] = defaultdict(list)
+        self._pending_lengths: List[int] = []
+        self._filters: Dict[tuple, np.ndarray] = {}
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "BM25Index":
+        """Load the index saved at `path`, or start an empty one there."""
+        index = cls(path, **kwargs)
+        index._read()
+        return index
+
+    @staticmethod
+    def _file_stamp(st: os.stat_result) -> tuple:
+        # Saves replace the file, so a new inode means new content
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def _read(self):
+        # Replace the in-memory state with the saved one (caller holds the lock or owns the index)
+        self._reset()
+        self._stamp = None
+        try:
+            with open(self.path, "rb") as f:
+                self._stamp = self._file_stamp(os.fstat(f.fileno()))
+                state = pickle.load(f)
+            if state.get("version") == INDEX_VERSION:
+                self.ids, self.texts, self.metadatas = state["ids"], state["texts"], state["metadatas"]
+                self._lengths, self._postings = state["lengths"], state["postings"]
+                self._positions = {id_: i for i, id_ in enumerate(self.ids)}
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Discarding unreadable BM25 index {self.path}: {e}")
+            self._reset()
+
+    def _sync(self):
+        # Pick up another process's save, keeping any chunks it doesn't have
+        if self.path is None:
+            return
+        try:
+            stamp = self._file_stamp(os.stat(self.path))
+        except FileNotFoundError:
+            stamp = None
+        if stamp == self._stamp:
+            return
+        local = (self.ids, self.texts, self.metadatas)
+        self._read()
+        self.add(*local)
+
+    def refresh(self):
+        """Reload the index if its file changed since it was last read or written."""
+        with self._lock:
+            self._sync()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, id_: str) -> bool:
+        return id_ in self._positions
+
+    def add(self, ids: List[str], texts: List[str], metadatas: List[Dict]) -> int:
+        """Index chunks not already present. Returns the number added."""
+        added = 0
+        with self._lock:
+            for id_, text, metadata in zip(ids, texts, metadatas):
+                if id_ in self._positions:
+                    continue
+                doc = len(self.ids)
+                self._positions[id_] = doc
+                self.ids.append(id_)
+                self.texts.append(text)
+                self.metadatas.append(metadata)
+                tokens = tokenize(text)
+                for term, tf in Counter(tokens).items():
+                    self._pending[term].append((doc, tf))
+                self._pending_lengths.append(len(tokens))
+                added += 1
+            if added:
+                self._filters.clear()
+        return added
+
+    def _merge(self):
+        # Fold pending postings into the per-term arrays
+        if not self._pending_lengths:
+            return
+        for term, entries in self._pending.items():
+            docs, tfs = (np.array(col, dtype=np.int32) for col in zip(*entries))
+            if term in self._postings:
+                old_docs, old_tfs = self._postings[term]
+                docs, tfs = np.concatenate([old_docs, docs]), np.concatenate([old_tfs, tfs])
+            self._postings[term] = (docs, tfs)
+        self._lengths = np.concatenate([self._lengths, np.array(self._pending_lengths, dtype=np.float32)])
+        self._pending.clear()
+        self._pending_lengths = []
+
+    def save(self):
+        """
+        Write the index to its path (atomically), first merging in chunks other
+        processes saved since this one last read or wrote the file.
+        """
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        with self._lock, FileLock(f"{self.path}.lock"):
+            self._sync()
+            self._merge()
+            # Unique per writer, like PriceStore.write
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f"{os.path.basename(self.path)}.", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    pickle.dump({
+                        "version": INDEX_VERSION, "ids": self.ids, "texts": self.texts, "metadatas": self.metadatas,
+                        "lengths": self._lengths, "postings": self._postings,
+                    }, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+            self._stamp = self._file_stamp(os.stat(self.path))
+
+    def _mask(self, where: Dict) -> np.ndarray:
+        # Equality filters on metadata fields, cached until the next add
+        mask = np.ones(len(self.ids), dtype=bool)
+        for field, value in where.items():
+            key = (field, value)
+            if key not in self._filters:
+                self._filters[key] = np.array([m.get(field) == value for m in self.metadatas], dtype=bool)
+            mask &= self._filters[key]
+        return mask
+
+    def search(self, query: str, n_results: int = 5, where: Dict = None) -> List[Dict]:
+        """
+        Top chunks by BM25 score for the query, optionally restricted to chunks
+        whose metadata equals every field in `where`.
+        """
+        with self._lock:
+            self._merge()
+            n_docs = len(self.ids)
+            terms = [t for t in set(tokenize(query)) if t in self._postings]
+            if not n_docs or not terms:
+                return []
+
+            avg_length = float(self._lengths.mean()) or 1.0
+            norms = self.k1 * (1 - self.b + self.b * self._lengths / avg_length)
+            scores = np.zeros(n_docs, dtype=np.float32)
+            for term in terms:
+                docs, tfs = self._postings[term]
+                idf = math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+                scores[docs] += idf * tfs * (self.k1 + 1) / (tfs + norms[docs])
+
+            if where:
+                scores[~self._mask(where)] = 0.0
+            candidates = np.flatnonzero(scores)
+            if len(candidates) > n_results:
+                candidates = candidates[np.argpartition(-scores[candidates], n_results)[:n_results]]
+            candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+
+            return [{
+                "id": self.ids[i],
+                "text": self.texts[i],
+                "metadata": self.metadatas[i],
+                "bm25": float(scores[i]),
+            } for i in candidates]
@@ -1,34 +1,64 @@
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional
+from src.config import settings
 from src.rag.vectorstore import QuantChroma
 from src.utils.logging import setup_logging
 
 logger = setup_logging(__name__)
 
+# Runs the vector query alongside the lexical one
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="retriever")
+
+def rrf_fuse(rankings: List[List[Dict]], k: int = 60, limit: int = None) -> List[Dict]:
+    """
+    Reciprocal-rank fusion: each document scores sum(1 / (k + rank)) over the
+    rankings it appears in. Fields from every ranking are merged into one result
+    with an added "score".
+    """
+    fused: Dict[str, Dict] = {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking, 1):
+            entry = fused.setdefault(doc["id"], {"score": 0.0})
+            entry.update({key: value for key, value in doc.items() if key not in entry})
+            entry["score"] += 1.0 / (k + rank)
+    results = sorted(fused.values(), key=lambda doc: doc["score"], reverse=True)
+    return results[:limit] if limit else results
+
 class HybridRetriever:
     """
-    Retriever that combines semantic search with metadata filtering.
+    Retriever that fuses semantic (vector) and lexical (BM25) search, with
+    metadata filtering.
     """
-    
+
     def __init__(self):
         self.vectorstore = QuantChroma()
 
     def retrieve(self, query: str, ticker: str = None, limit: int = 5) -> List[Dict]:
         """
         Retrieve relevant documents for a query, optionally filtered by ticker.
+        Vector and BM25 candidates are fetched in parallel and combined by
+        reciprocal-rank fusion.
         """
         where_filter = None
         if ticker:
             where_filter = {"ticker": ticker}
-            
+
         logger.info(f"Retrieving for query: '{query}' (Ticker: {ticker})")
-        
-        results = self.vectorstore.query(
+        candidates = max(limit, settings.rag_fusion_candidates)
+
+        lexical = _executor.submit(self.vectorstore.lexical_search, query, candidates, where_filter)
+        semantic = self.vectorstore.query(
             query_text=query,
-            n_results=limit,
+            n_results=candidates,
             where=where_filter
         )
-        
-        return results
+        try:
+            keyword = lexical.result()
+        except Exception as e:
+            logger.error(f"Lexical search failed: {e}")
+            keyword = []
+
+        return rrf_fuse([semantic, keyword], k=settings.rag_rrf_k, limit=limit)
 
     def retrieve_context(self, query: str, ticker: str = None) -> str:
         """
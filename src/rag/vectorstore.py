@@ -1,15 +1,33 @@
 import chromadb
 from chromadb.config import Settings
 from typing import List, Dict, Any
+import hashlib
 import os
+import re
 from src.rag.embeddings import LocalEmbeddings
+from src.rag.lexical import BM25Index
 from src.utils.logging import setup_logging
 
 logger = setup_logging(__name__)
 
+LEXICAL_DIR = os.path.join(os.getcwd(), "data/bm25")
+
+# IDs per existence lookup (keeps Chroma's SQL parameter count bounded)
+ID_LOOKUP_BATCH = 500
+
+def chunk_id(text: str, metadata: Dict) -> str:
+    """
+    Stable ID for a chunk: ticker plus a SHA-256 of its whitespace-normalized
+    text and source, so re-ingesting the same filing yields the same IDs.
+    """
+    normalized = re.sub(r"\s+", " ", text).strip()
+    digest = hashlib.sha256(f"{metadata.get('source', '')}\0{normalized}".encode("utf-8")).hexdigest()
+    return f"{metadata.get('ticker', 'UNK')}_{digest[:32]}"
+
 class QuantChroma:
     """
-    Wrapper for ChromaDB vector store.
+    Wrapper for ChromaDB vector store, with a BM25 index of the same chunks
+    kept alongside it for lexical search.
     """
     
     def __init__(self, collection_name: str = "sec_filings"):
@@ -22,32 +40,71 @@ class QuantChroma:
             name=collection_name,
             metadata={"hnsw:space": "cosine"}
         )
+        self.lexical = BM25Index.load(os.path.join(LEXICAL_DIR, f"{collection_name}.pkl"))
 
-    def add_documents(self, chunks: List[Dict]):
+    def existing_ids(self, ids: List[str]) -> set:
+        """IDs (from `ids`) already stored in the collection."""
+        found = set()
+        for start in range(0, len(ids), ID_LOOKUP_BATCH):
+            result = self.collection.get(ids=ids[start:start + ID_LOOKUP_BATCH], include=[])
+            found.update(result['ids'])
+        return found
+
+    def add_documents(self, chunks: List[Dict]) -> int:
         """
         Add document chunks to the vector store.
         chunks: List of dicts with 'text' and 'metadata'.
+        Chunks already in the collection (same text and source) are skipped
+        without being re-embedded. Returns the number of chunks added.
         """
         if not chunks:
-            return
+            return 0
 
-        texts = [c['text'] for c in chunks]
-        metadatas = [c['metadata'] for c in chunks]
-        
-        # Generate IDs
-        ids = [f"{m.get('ticker', 'UNK')}_{i}_{hash(t)}" for i, (t, m) in enumerate(zip(texts, metadatas))]
-        
-        # Generate embeddings
-        logger.info(f"Generating embeddings for {len(texts)} chunks...")
-        embeddings = self.embedder.embed_documents(texts)
-        
-        logger.info(f"Adding {len(texts)} documents to ChromaDB...")
-        self.collection.upsert(
-            ids=ids,
-            documents=texts,
-            embeddings=embeddings,
-            metadatas=metadatas
-        )
+        # Content-addressed IDs; repeated chunks within the batch are stored once
+        new_chunks = {}
+        for c in chunks:
+            new_chunks.setdefault(chunk_id(c['text'], c['metadata']), c)
+
+        existing = self.existing_ids(list(new_chunks))
+        # Chunks already in Chroma; the lexical index catches up on any stored before it existed
+        stored = {id_: new_chunks.pop(id_) for id_ in existing}
+
+        if new_chunks:
+            ids = list(new_chunks)
+            texts = [c['text'] for c in new_chunks.values()]
+            metadatas = [c['metadata'] for c in new_chunks.values()]
+
+            # Generate embeddings
+            logger.info(f"Generating embeddings for {len(texts)} new chunks ({len(existing)} already indexed)...")
+            embeddings = self.embedder.embed_documents(texts)
+            if len(embeddings) != len(texts):
+                logger.error(f"Embedding failed for {len(texts)} chunks; nothing added.")
+                new_chunks = {}
+            else:
+                logger.info(f"Adding {len(texts)} documents to ChromaDB...")
+                self.collection.upsert(
+                    ids=ids,
+                    documents=texts,
+                    embeddings=embeddings,
+                    metadatas=metadatas
+                )
+                stored.update(new_chunks)
+        else:
+            logger.info(f"All {len(chunks)} chunks already indexed, nothing to embed.")
+
+        # Only chunks that have vectors, so both searches cover the same corpus
+        if self.lexical.add(list(stored), [c['text'] for c in stored.values()],
+                            [c['metadata'] for c in stored.values()]):
+            self.lexical.save()
+        return len(new_chunks)
+
+    def lexical_search(self, query_text: str, n_results: int = 5, where: Dict = None) -> List[Dict]:
+        """
+        BM25 keyword search, first picking up chunks other processes have
+        ingested since the index was loaded.
+        """
+        self.lexical.refresh()
+        return self.lexical.search(query_text, n_results, where)
 
     def query(self, query_text: str, n_results: int = 5, where: Dict = None) -> List[Dict]:
         """
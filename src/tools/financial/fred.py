@@ -3,6 +3,7 @@ from fredapi import Fred
 from typing import Dict, Any
 import os
 from src.utils.cache import disk_cache
+from src.utils.market_calendar import MarketHoursTTL
 from src.utils.retry import with_retry
 from src.utils.logging import setup_logging
 
@@ -21,7 +22,7 @@ class FredTool:
         return Fred(api_key=api_key)
 
     @staticmethod
-    @disk_cache(expire=86400) # 24h cache for economic data
+    @disk_cache(expire=MarketHoursTTL(open_ttl=6 * 3600), stale_ttl=86400 * 7) # Releases land on business days; hold until next open otherwise
     @with_retry(max_attempts=3)
     def get_economic_data(series_id: str = "GDP") -> Dict[str, Any]:
         """
@@ -0,0 +1,170 @@
+import json
+import os
+import tempfile
+import time
+import pandas as pd
+import pyarrow as pa
+from typing import Dict, Any, List, Optional
+from src.utils.logging import setup_logging
+
+logger = setup_logging(__name__)
+
+# Ensure price directory exists
+PRICE_DIR = os.path.join(os.getcwd(), "data/prices")
+os.makedirs(PRICE_DIR, exist_ok=True)
+
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume", "Dividends", "Stock Splits"]
+
+_PERIOD_OFFSETS = {
+    "1d": pd.DateOffset(days=1),
+    "5d": pd.DateOffset(days=5),
+    "1mo": pd.DateOffset(months=1),
+    "3mo": pd.DateOffset(months=3),
+    "6mo": pd.DateOffset(months=6),
+    "1y": pd.DateOffset(years=1),
+    "2y": pd.DateOffset(years=2),
+    "5y": pd.DateOffset(years=5),
+    "10y": pd.DateOffset(years=10),
+}
+
+def period_start(period: str, today: Optional[pd.Timestamp] = None) -> Optional[pd.Timestamp]:
+    """
+    First date covered by a yfinance-style period string ("1mo", "2y", "ytd", ...).
+    Returns None for "max" (no lower bound).
+    """
+    today = (today or pd.Timestamp.today()).normalize()
+    if period == "max":
+        return None
+    if period == "ytd":
+        return pd.Timestamp(year=today.year, month=1, day=1)
+    if period not in _PERIOD_OFFSETS:
+        raise ValueError(f"Unsupported period: {period}")
+    return today - _PERIOD_OFFSETS[period]
+
+def normalize_bars(hist: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convert a yfinance history frame to the store layout:
+    tz-naive daily DatetimeIndex named 'Date' and float64 OHLCV columns.
+    """
+    index = pd.DatetimeIndex(hist.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    columns = [c for c in OHLCV_COLUMNS if c in hist.columns]
+    df = hist[columns].astype("float64")
+    df.index = index.normalize()
+    df.index.name = "Date"
+    return df[~df.index.duplicated(keep="last")].sort_index()
+
+def empty_bars() -> pd.DataFrame:
+    """An empty frame in the store layout."""
+    return pd.DataFrame(columns=OHLCV_COLUMNS, dtype="float64", index=pd.DatetimeIndex([], name="Date"))
+
+def covers(meta: Dict[str, Any], start: Optional[pd.Timestamp]) -> bool:
+    """
+    Whether stored bars (described by their metadata) cover a period starting at `start`.
+    """
+    if meta.get("max_history"):
+        return True
+    covered_from = meta.get("covered_from")
+    return start is not None and covered_from is not None and pd.Timestamp(covered_from) <= start
+
+class PriceStore:
+    """
+    Columnar on-disk store of daily OHLCV bars.
+
+    One uncompressed Arrow IPC file per ticker, so reads are memory-mapped
+    instead of unpickled and float64 columns reach pandas without a copy.
+    Store bookkeeping (fetch time, covered range) lives in the schema metadata.
+    """
+
+    def __init__(self, root: str = PRICE_DIR):
+        self.root = root
+        os.makedirs(self.root, exist_ok=True)
+
+    def path(self, ticker: str) -> str:
+        return os.path.join(self.root, f"{ticker.upper()}.arrow")
+
+    def write(self, ticker: str, bars: pd.DataFrame, metadata: Optional[Dict[str, Any]] = None):
+        """
+        Atomically replace the stored bars for a ticker.
+        """
+        meta = {"fetched_at": time.time(), **(metadata or {})}
+        table = pa.Table.from_pandas(bars, preserve_index=True)
+        table = table.replace_schema_metadata({
+            **(table.schema.metadata or {}),
+            b"quantmind": json.dumps(meta).encode(),
+        })
+
+        path = self.path(ticker)
+        # Unique per writer: threads of one process may write the same ticker at once
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=f"{ticker.upper()}.", suffix=".tmp")
+        os.close(fd)
+        try:
+            with pa.OSFile(tmp_path, "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def merge(self, ticker: str, bars: pd.DataFrame, covered_from: Optional[pd.Timestamp] = None,
+              max_history: bool = False, replace: bool = False):
+        """
+        Merge new bars into the stored series (new values win on overlapping dates)
+        and record the covered range and last stored bar.
+        With replace=True the stored series is discarded but its covered range is kept.
+        """
+        meta = self.metadata(ticker)
+        stored = self.read(ticker)
+        if stored is not None and not replace:
+            bars = pd.concat([stored, bars])
+            bars = bars[~bars.index.duplicated(keep="last")].sort_index()
+        if bars.empty:
+            return
+
+        starts = [pd.Timestamp(d) for d in (meta.get("covered_from"), covered_from) if d is not None]
+        self.write(ticker, bars, {
+            "covered_from": min(starts).strftime('%Y-%m-%d') if starts else None,
+            "max_history": bool(max_history or meta.get("max_history")),
+            "last_bar": bars.index[-1].strftime('%Y-%m-%d'),
+        })
+
+    def _open(self, ticker: str) -> Optional[pa.ipc.RecordBatchFileReader]:
+        path = self.path(ticker)
+        if not os.path.exists(path):
+            return None
+        return pa.ipc.open_file(pa.memory_map(path, "r"))
+
+    def metadata(self, ticker: str) -> Dict[str, Any]:
+        """
+        Store bookkeeping for a ticker (empty if nothing is stored).
+        """
+        reader = self._open(ticker)
+        if reader is None:
+            return {}
+        raw = (reader.schema.metadata or {}).get(b"quantmind")
+        return json.loads(raw) if raw else {}
+
+    def read(self, ticker: str, start: Optional[pd.Timestamp] = None,
+             columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        """
+        Memory-map the stored bars for a ticker, optionally from `start` onwards.
+        Returns None if nothing is stored.
+        """
+        reader = self._open(ticker)
+        if reader is None:
+            return None
+        table = reader.read_all()
+        if columns:
+            table = table.select(["Date"] + [c for c in columns if c in table.column_names])
+        # The pandas schema metadata restores 'Date' as the index
+        df = table.to_pandas(split_blocks=True)
+        if start is not None:
+            # Positional slice keeps the frame a view over the mapped buffers
+            df = df.iloc[df.index.searchsorted(start):]
+        return df
+
+    def tickers(self) -> List[str]:
+        """All tickers with stored bars."""
+        return sorted(f[:-len(".arrow")] for f in os.listdir(self.root) if f.endswith(".arrow"))
@@ -1,35 +1,48 @@
 
 from fastmcp import FastMCP
+from src.utils.cache_metrics import register_metrics_route
+from src.utils.serialization import tool_result
 from src.tools.financial.yahoo_finance import YahooFinanceTool
 
 # Create FastMCP server
 mcp = FastMCP("yahoo-finance")
+register_metrics_route(mcp)
 
-# Register tools
-@mcp.tool()
+# Register tools (cache_ttl: seconds MCP clients may reuse a result)
+@mcp.tool(meta={"cache_ttl": 300})
 def get_stock_info(ticker: str) -> dict:
     """Get basic stock information (price, market cap, P/E, etc.)"""
-    return YahooFinanceTool.get_stock_info(ticker)
+    return tool_result(YahooFinanceTool.get_stock_info(ticker))
 
-@mcp.tool()
+@mcp.tool(meta={"cache_ttl": 3600})
 def get_financials(ticker: str) -> dict:
     """Get annual financials: Income Statement, Balance Sheet, Cash Flow."""
-    return YahooFinanceTool.get_financials(ticker)
+    return tool_result(YahooFinanceTool.get_financials(ticker))
 
-@mcp.tool()
+@mcp.tool(meta={"cache_ttl": 3600})
 def get_earnings(ticker: str) -> dict:
     """Get earnings history and upcoming dates."""
-    return YahooFinanceTool.get_earnings(ticker)
+    return tool_result(YahooFinanceTool.get_earnings(ticker))
 
-@mcp.tool()
+@mcp.tool(meta={"cache_ttl": 3600})
 def get_recommendations(ticker: str) -> dict:
     """Get analyst recommendations."""
-    return {"recommendations": YahooFinanceTool.get_recommendations(ticker)}
+    return tool_result({"recommendations": YahooFinanceTool.get_recommendations(ticker)})
 
-@mcp.tool()
+@mcp.tool(meta={"cache_ttl": 300})
 def get_price_history(ticker: str, period: str = "2y") -> dict:
     """Get historical price data (ohlcv) for forecasting."""
-    return {"history": YahooFinanceTool.get_price_history(ticker, period)}
+    return tool_result({"history": YahooFinanceTool.get_price_history(ticker, period)})
+
+@mcp.tool(meta={"cache_ttl": 300})
+def get_price_history_many(tickers: list[str], period: str = "2y") -> dict:
+    """Get historical price data (ohlcv) for many tickers in one call. Failures are reported per ticker."""
+    return tool_result(YahooFinanceTool.get_price_history_many(tickers, period))
+
+@mcp.tool(meta={"cache_ttl": 300})
+def get_stock_info_many(tickers: list[str]) -> dict:
+    """Get basic stock information for many tickers in one call. Failures are reported per ticker."""
+    return tool_result(YahooFinanceTool.get_stock_info_many(tickers))
 
 if __name__ == "__main__":
     mcp.run()
@@ -1,17 +1,20 @@
 
 from fastmcp import FastMCP
+from src.utils.cache_metrics import register_metrics_route
+from src.utils.serialization import tool_result
 from src.tools.financial.fred import FredTool
 
 # Create FastMCP server
 mcp = FastMCP("fred-economics")
+register_metrics_route(mcp)
 
-@mcp.tool()
+@mcp.tool(meta={"cache_ttl": 3600})
 def get_economic_data(series_id: str = "GDP") -> dict:
     """
     Get latest observations for an economic series from FRED.
     Common IDs: GDP, CPIAUCSL (CPI), UNRATE (Unemployment), DGS10 (10Y Treasury), VIXCLS (VIX).
     """
-    return FredTool.get_economic_data(series_id)
+    return tool_result(FredTool.get_economic_data(series_id))
 
 if __name__ == "__main__":
     mcp.run()
@@ -1,19 +1,31 @@
+import time
 import yfinance as yf
 import pandas as pd
-from typing import Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+from src.config import settings
+from src.tools.financial.price_store import PriceStore, covers, empty_bars, normalize_bars, period_start
 from src.utils.cache import disk_cache
+from src.utils.market_calendar import MarketHoursTTL
 from src.utils.retry import with_retry
 from src.utils.logging import setup_logging
 
 logger = setup_logging(__name__)
 
+# Market data TTLs follow the exchange calendar: short in session, until the next open otherwise
+QUOTE_TTL = MarketHoursTTL(open_ttl=900)  # 15 mins in session
+FUNDAMENTALS_TTL = MarketHoursTTL(open_ttl=86400)  # 24 hours, longer over weekends/holidays
+PRICE_HISTORY_TTL = MarketHoursTTL(open_ttl=1800)  # Stored bars synced after 30 mins in session
+
 class YahooFinanceTool:
     """
     Tool for fetching financial data using yfinance.
     """
+
+    price_store = PriceStore()
     
     @staticmethod
-    @disk_cache(expire=3600)  # Cache for 1 hour
+    @disk_cache(expire=QUOTE_TTL, stale_ttl=86400)
     @with_retry(max_attempts=3)
     def get_stock_info(ticker: str) -> Dict[str, Any]:
         """
@@ -38,7 +50,7 @@ class YahooFinanceTool:
             return {"error": str(e)}
 
     @staticmethod
-    @disk_cache(expire=86400)  # Cache for 24 hours
+    @disk_cache(expire=FUNDAMENTALS_TTL, stale_ttl=86400 * 7)
     @with_retry(max_attempts=3)
     def get_financials(ticker: str) -> Dict[str, Any]:
         """
@@ -64,7 +76,7 @@ class YahooFinanceTool:
             return {"error": str(e)}
 
     @staticmethod
-    @disk_cache(expire=86400)
+    @disk_cache(expire=FUNDAMENTALS_TTL, stale_ttl=86400 * 7)
     @with_retry(max_attempts=3)
     def get_earnings(ticker: str) -> Dict[str, Any]:
         """
@@ -91,7 +103,7 @@ class YahooFinanceTool:
             return {"error": "Data unavailable"}
             
     @staticmethod
-    @disk_cache(expire=86400)
+    @disk_cache(expire=FUNDAMENTALS_TTL, stale_ttl=86400 * 7)
     def get_recommendations(ticker: str) -> list[Dict[str, Any]]:
         """
         Get analyst recommendations.
@@ -109,14 +121,137 @@ class YahooFinanceTool:
             return []
 
     @staticmethod
-    @disk_cache(expire=1800) # 30 mins
+    def _plan_price_sync(ticker: str, period: str) -> Optional[Dict[str, Any]]:
+        """
+        Decide what to download for a ticker: the whole period if the store doesn't
+        cover it yet, only the bars since the last stored one if the store is stale,
+        or nothing (None) if it is fresh.
+        """
+        meta = YahooFinanceTool.price_store.metadata(ticker)
+        if not covers(meta, period_start(period)):
+            return {"period": period}
+        if time.time() < PRICE_HISTORY_TTL.expiry(meta.get("fetched_at", 0)):
+            return None
+        # Start at the last stored bar so a partial intraday bar gets completed
+        return {"start": meta["last_bar"]}
+
+    @staticmethod
+    def _apply_price_sync(ticker: str, period: str, fetch: Dict[str, Any], hist: pd.DataFrame) -> bool:
+        """
+        Merge downloaded bars into the store.
+        Returns False when an incremental update can't be applied because a new
+        dividend or split re-adjusts the whole history.
+        Raises ValueError for an empty download, leaving the stored series stale
+        so the next call retries.
+        """
+        # Incremental fetches start at the last stored bar, so a successful one is never empty
+        if hist.empty:
+            raise ValueError("No price data returned")
+        store = YahooFinanceTool.price_store
+        bars = normalize_bars(hist)
+
+        if "start" in fetch:
+            new_bars = bars[bars.index > pd.Timestamp(fetch["start"])]
+            actions = [c for c in ("Dividends", "Stock Splits") if c in new_bars.columns]
+            if (new_bars[actions] != 0).any().any():
+                return False
+            store.merge(ticker, bars)
+        else:
+            store.merge(ticker, bars, covered_from=period_start(period), max_history=period == "max")
+        return True
+
+    @staticmethod
+    def sync_price_history(ticker: str, period="2y"):
+        """
+        Bring the stored bars for a ticker up to date, downloading only what is missing.
+        """
+        fetch = YahooFinanceTool._plan_price_sync(ticker, period)
+        if fetch is None:
+            return
+
+        stock = yf.Ticker(ticker)
+        if not YahooFinanceTool._apply_price_sync(ticker, period, fetch, stock.history(**fetch)):
+            YahooFinanceTool._refetch_price_history(ticker)
+
+    @staticmethod
+    def _refetch_price_history(ticker: str):
+        """
+        Redownload everything the store covers for a ticker (adjusted prices changed).
+        """
+        meta = YahooFinanceTool.price_store.metadata(ticker)
+        logger.info(f"New dividend/split for {ticker}, refetching full price history")
+        full = {"period": "max"} if meta.get("max_history") else {"start": meta["covered_from"]}
+        hist = yf.Ticker(ticker).history(**full)
+        if not hist.empty:
+            YahooFinanceTool.price_store.merge(ticker, normalize_bars(hist), replace=True)
+
+    @staticmethod
+    def _bulk_frame(data: Optional[pd.DataFrame], ticker: str) -> pd.DataFrame:
+        """
+        Pull one ticker's bars out of a yf.download(group_by="ticker") result.
+        """
+        if data is None or data.empty or ticker not in data.columns.get_level_values(0):
+            return pd.DataFrame()
+        return data[ticker].dropna(how="all")
+
+    @staticmethod
+    def sync_price_history_many(tickers: List[str], period="2y") -> Dict[str, str]:
+        """
+        Bring the stored bars for many tickers up to date with bulk downloads.
+        Tickers needing the same download range are fetched together in chunks.
+        Returns error messages keyed by ticker for the ones that failed.
+        """
+        groups: Dict[tuple, List[str]] = {}
+        for ticker in tickers:
+            fetch = YahooFinanceTool._plan_price_sync(ticker, period)
+            if fetch is not None:
+                groups.setdefault(tuple(sorted(fetch.items())), []).append(ticker)
+
+        errors = {}
+        batch_size = settings.yahoo_batch_size
+        for key, group in groups.items():
+            fetch = dict(key)
+            for i in range(0, len(group), batch_size):
+                chunk = group[i:i + batch_size]
+                try:
+                    # yf.download keeps module-level state, so chunks run one at a time
+                    # and the thread pool lives inside the download
+                    data = yf.download(
+                        chunk, group_by="ticker", actions=True, auto_adjust=True,
+                        threads=settings.yahoo_max_workers, progress=False, **fetch
+                    )
+                except Exception as e:
+                    logger.error(f"Bulk download failed for {len(chunk)} tickers: {e}")
+                    errors.update({t: str(e) for t in chunk})
+                    continue
+
+                for ticker in chunk:
+                    try:
+                        hist = YahooFinanceTool._bulk_frame(data, ticker)
+                        if not YahooFinanceTool._apply_price_sync(ticker, period, fetch, hist):
+                            YahooFinanceTool._refetch_price_history(ticker)
+                    except Exception as e:
+                        logger.error(f"Error storing price history for {ticker}: {e}")
+                        errors[ticker] = str(e)
+        return errors
+
+    @staticmethod
+    def get_price_frame(ticker: str, period="2y") -> pd.DataFrame:
+        """
+        Get historical daily bars as a date-indexed float64 DataFrame.
+        Served from the local columnar price store, synced incrementally when stale.
+        """
+        YahooFinanceTool.sync_price_history(ticker, period)
+        bars = YahooFinanceTool.price_store.read(ticker, start=period_start(period))
+        return bars if bars is not None else empty_bars()
+
+    @staticmethod
     def get_price_history(ticker: str, period="2y") -> Dict[str, Any]:
         """
         Get historical price data (ohlcv) for forecasting.
         """
         try:
-            stock = yf.Ticker(ticker)
-            hist = stock.history(period=period)
+            hist = YahooFinanceTool.get_price_frame(ticker, period=period)
             if hist.empty:
                 return {}
             
@@ -128,3 +263,62 @@ class YahooFinanceTool:
         except Exception as e:
             logger.error(f"Error fetching price history for {ticker}: {e}")
             return {"error": str(e)}
+
+    @staticmethod
+    def get_price_frames_many(tickers: List[str], period="2y") -> Tuple[Dict[str, pd.DataFrame], Dict[str, str]]:
+        """
+        Get historical daily bars for many tickers.
+        Returns (frames keyed by ticker, error messages keyed by ticker).
+        """
+        tickers = list(dict.fromkeys(tickers))
+        errors = YahooFinanceTool.sync_price_history_many(tickers, period)
+
+        frames = {}
+        start = period_start(period)
+        for ticker in tickers:
+            if ticker in errors:
+                continue
+            bars = YahooFinanceTool.price_store.read(ticker, start=start)
+            if bars is None or bars.empty:
+                errors[ticker] = "No price data available"
+            else:
+                frames[ticker] = bars
+        return frames, errors
+
+    @staticmethod
+    def get_price_history_many(tickers: List[str], period="2y") -> Dict[str, Any]:
+        """
+        Get historical price data (ohlcv) for many tickers in one call.
+        """
+        try:
+            frames, errors = YahooFinanceTool.get_price_frames_many(tickers, period)
+        except Exception as e:
+            logger.error(f"Error fetching batch price history: {e}")
+            return {"results": {}, "errors": {t: str(e) for t in tickers}}
+
+        results = {}
+        for ticker, hist in frames.items():
+            hist = hist.reset_index()
+            hist['Date'] = hist['Date'].dt.strftime('%Y-%m-%d')
+            results[ticker] = hist.to_dict('records')
+        return {"results": results, "errors": errors}
+
+    @staticmethod
+    def get_stock_info_many(tickers: List[str]) -> Dict[str, Any]:
+        """
+        Get basic stock information for many tickers using a bounded thread pool.
+        """
+        tickers = list(dict.fromkeys(tickers))
+        results, errors = {}, {}
+        with ThreadPoolExecutor(max_workers=settings.yahoo_max_workers) as pool:
+            futures = {ticker: pool.submit(YahooFinanceTool.get_stock_info, ticker) for ticker in tickers}
+            for ticker, future in futures.items():
+                try:
+                    info = future.result()
+                except Exception as e:
+                    info = {"error": str(e)}
+                if "error" in info:
+                    errors[ticker] = info["error"]
+                else:
+                    results[ticker] = info
+        return {"results": results, "errors": errors}
@@ -0,0 +1,160 @@
+import os
+import time
+import multiprocessing
+import pandas as pd
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Any, List, Optional, Callable
+from src.config import settings
+from src.tools.financial.yahoo_finance import YahooFinanceTool
+from src.tools.forecast.forecasters import FORECASTERS, get_forecaster
+from src.utils.logging import setup_logging
+
+logger = setup_logging(__name__)
+
+# Backend options for backtests: folds must not read or overwrite persisted warm-start models
+BACKTEST_OPTIONS = {"prophet": {"warm_start": False}}
+
+def walk_forward_cutoffs(n_bars: int, horizon: int, n_folds: int, min_train: int) -> List[int]:
+    """
+    Index of the last training bar for each fold. Folds are evenly spaced so the
+    last one's test window ends on the final bar; each trains on everything up to
+    its cutoff and is scored on the following `horizon` bars.
+    """
+    last = n_bars - horizon - 1
+    first = min_train - 1
+    if last < first:
+        return []
+    step = max((last - first) // max(n_folds - 1, 1), 1)
+    cutoffs = list(range(last, first - 1, -step))[:n_folds]
+    return sorted(cutoffs)
+
+def score_fold(forecast: pd.DataFrame, actual: pd.Series, last_close: float) -> Dict[str, float]:
+    """
+    MAPE (%), interval coverage and directional hit of one fold's forecast,
+    evaluated on the trading days in `actual`.
+    """
+    predicted = forecast.set_index('ds').reindex(actual.index)
+    y = actual.to_numpy()
+    yhat = predicted['yhat'].to_numpy()
+    inside = (y >= predicted['yhat_lower'].to_numpy()) & (y <= predicted['yhat_upper'].to_numpy())
+    return {
+        "mape": float(np.mean(np.abs(yhat - y) / np.abs(y)) * 100),
+        "coverage": float(inside.mean()),
+        "direction_hit": float(np.sign(yhat[-1] - last_close) == np.sign(y[-1] - last_close)),
+    }
+
+def _run_fold(backend: str, ticker: str, close: pd.Series, cutoff: int, horizon: int) -> Dict[str, Any]:
+    """Fit one backend on bars up to `cutoff` and score it on the next `horizon` bars."""
+    train = close.iloc[:cutoff + 1]
+    actual = close.iloc[cutoff + 1:cutoff + 1 + horizon]
+    periods = (actual.index[-1] - train.index[-1]).days
+    forecaster = get_forecaster(backend, **BACKTEST_OPTIONS.get(backend, {}))
+
+    started = time.perf_counter()
+    forecast = forecaster.forecast(ticker, train, periods)
+    fit_seconds = time.perf_counter() - started
+
+    return {
+        "backend": backend,
+        "ticker": ticker,
+        "cutoff": train.index[-1].strftime('%Y-%m-%d'),
+        "fit_seconds": fit_seconds,
+        **score_fold(forecast, actual, float(train.iloc[-1])),
+    }
+
+def summarize(folds: List[Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+    """Average fold metrics per backend."""
+    summary = {}
+    for backend, rows in pd.DataFrame(folds).groupby("backend"):
+        summary[backend] = {
+            "folds": int(len(rows)),
+            "mape": float(rows["mape"].mean()),
+            "coverage": float(rows["coverage"].mean()),
+            "direction_hit": float(rows["direction_hit"].mean()),
+            "fit_seconds_mean": float(rows["fit_seconds"].mean()),
+            "fit_seconds_p95": float(rows["fit_seconds"].quantile(0.95)),
+        }
+    return summary
+
+class ForecastBacktester:
+    """
+    Walk-forward evaluation of forecasting backends over stored price history.
+    """
+
+    def __init__(self):
+        self.yf_tool = YahooFinanceTool()
+
+    def run(self, tickers: List[str], backends: Optional[List[str]] = None, period: str = "5y",
+            horizon: int = 20, n_folds: int = 8, min_train: int = 252, max_workers: Optional[int] = None,
+            progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, Any]:
+        """
+        Run walk-forward folds for every ticker and backend, in parallel.
+        :param horizon: Trading days scored after each cutoff
+        :param n_folds: Folds per ticker (fewer if history is short)
+        :param min_train: Minimum bars in the first fold's training window
+        :param max_workers: Worker processes (default: settings.forecast_max_workers or CPU count
+            if any backend benefits from a pool, otherwise 1)
+        :param progress: Called as progress(done, total) after each fit, successful or not
+        Returns {"summary": {backend: metrics}, "folds": [per-fold rows], "errors": {ticker: message}}.
+        """
+        backends = [b.lower() for b in (backends or list(FORECASTERS))]
+        unknown = [b for b in backends if b not in FORECASTERS]
+        if unknown:
+            raise ValueError(f"Unknown forecast backend(s): {', '.join(unknown)}")
+
+        frames, errors = self.yf_tool.get_price_frames_many(tickers, period)
+        tasks = []
+        for ticker, bars in frames.items():
+            close = bars['Close'].dropna()
+            cutoffs = walk_forward_cutoffs(len(close), horizon, n_folds, min_train)
+            if not cutoffs:
+                errors[ticker] = f"Need at least {min_train + horizon} bars, have {len(close)}"
+                continue
+            tasks.extend((backend, ticker, close, cutoff, horizon) for backend in backends for cutoff in cutoffs)
+
+        if not any(FORECASTERS[b].parallel for b in backends):
+            # Cheap fits: pool start-up would cost more than it saves
+            max_workers = max_workers or 1
+        max_workers = max_workers or settings.forecast_max_workers or os.cpu_count() or 1
+        max_workers = max(1, min(max_workers, len(tasks)))
+        logger.info(f"Backtesting {len(backends)} backend(s) over {len(frames)} tickers: {len(tasks)} fits on {max_workers} worker(s)")
+
+        folds = []
+        done = 0
+        def record(task, outcome):
+            nonlocal done
+            if isinstance(outcome, Exception):
+                logger.error(f"Backtest fold failed for {task[1]} ({task[0]}): {outcome}")
+                errors.setdefault(task[1], str(outcome))
+            else:
+                folds.append(outcome)
+            done += 1
+            if progress:
+                progress(done, len(tasks))
+
+        started = time.perf_counter()
+        if max_workers == 1:
+            for task in tasks:
+                try:
+                    record(task, _run_fold(*task))
+                except Exception as e:
+                    record(task, e)
+        else:
+            # Spawned workers don't inherit this process's threads or open handles
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as pool:
+                futures = {pool.submit(_run_fold, *task): task for task in tasks}
+                for future in as_completed(futures):
+                    try:
+                        record(futures[future], future.result())
+                    except Exception as e:
+                        record(futures[future], e)
+
+        folds.sort(key=lambda row: (row["backend"], row["ticker"], row["cutoff"]))
+        return {
+            "summary": summarize(folds) if folds else {},
+            "folds": folds,
+            "errors": errors,
+            "wall_seconds": time.perf_counter() - started,
+        }
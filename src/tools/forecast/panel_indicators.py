@@ -0,0 +1,185 @@
+import time
+import pandas as pd
+import numpy as np
+from typing import Dict, Any, List, Tuple
+from src.tools.financial.yahoo_finance import YahooFinanceTool
+from src.utils.logging import setup_logging
+
+logger = setup_logging(__name__)
+
+# Indicators reported as the latest value per ticker
+LATEST_FIELDS = [
+    "current_price", "sma_20", "sma_50", "sma_200", "rsi_14", "macd", "macd_signal",
+    "bb_upper", "bb_lower", "volatility_annualized_pct",
+]
+
+# --- Vectorized kernels: arrays are dates x tickers, NaN where a ticker has no bar ---
+
+def rolling_mean(x: np.ndarray, window: int) -> np.ndarray:
+    """Trailing mean over `window` rows; NaN until `window` valid observations exist."""
+    valid = ~np.isnan(x)
+    sums = np.cumsum(np.where(valid, x, 0.0), axis=0)
+    counts = np.cumsum(valid, axis=0)
+    sums[window:] = sums[window:] - sums[:-window]
+    counts[window:] = counts[window:] - counts[:-window]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts == window, sums / window, np.nan)
+
+def _moments(x: np.ndarray, window: int = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Count, sum and sum of squares over a trailing window (expanding when window is None).
+    # Values are shifted by a per-column reference to keep the sums well conditioned.
+    valid = ~np.isnan(x)
+    with np.errstate(invalid="ignore"):
+        shifted = np.where(valid, x - _first_valid(x), 0.0)
+    counts = np.cumsum(valid, axis=0).astype(np.float64)
+    sums = np.cumsum(shifted, axis=0)
+    squares = np.cumsum(shifted * shifted, axis=0)
+    if window is not None:
+        for arr in (counts, sums, squares):
+            arr[window:] = arr[window:] - arr[:-window]
+    return counts, sums, squares
+
+def _first_valid(x: np.ndarray) -> np.ndarray:
+    valid = ~np.isnan(x)
+    first = valid.argmax(axis=0)
+    ref = x[first, np.arange(x.shape[1])]
+    return np.where(valid.any(axis=0), ref, 0.0)
+
+def rolling_std(x: np.ndarray, window: int = None, ddof: int = 1) -> np.ndarray:
+    """
+    Trailing sample standard deviation over `window` rows, or over all rows so far
+    when `window` is None.
+    """
+    counts, sums, squares = _moments(x, window)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        var = (squares - sums * sums / counts) / (counts - ddof)
+        std = np.sqrt(np.maximum(var, 0.0))
+    required = window if window is not None else ddof + 1
+    return np.where(counts >= required, std, np.nan)
+
+def ema(x: np.ndarray, span: int) -> np.ndarray:
+    """Exponential moving average (pandas `ewm(span, adjust=False)`), vectorized across tickers."""
+    alpha = 2.0 / (span + 1)
+    out = np.empty_like(x)
+    prev = np.full(x.shape[1], np.nan)
+    for t in range(x.shape[0]):
+        row = x[t]
+        prev = np.where(np.isnan(prev), row, np.where(np.isnan(row), prev, alpha * row + (1 - alpha) * prev))
+        out[t] = prev
+    return out
+
+def rsi(close: np.ndarray, window: int = 14) -> np.ndarray:
+    """RSI from simple rolling means of gains and losses."""
+    delta = np.empty_like(close)
+    delta[0] = np.nan
+    delta[1:] = close[1:] - close[:-1]
+    with np.errstate(invalid="ignore"):
+        # A ticker's first bar counts as a zero move; rows before it stay missing
+        gain = np.where(np.isnan(close), np.nan, np.where(delta > 0, delta, 0.0))
+        loss = np.where(np.isnan(close), np.nan, np.where(delta < 0, -delta, 0.0))
+    avg_gain = rolling_mean(gain, window)
+    avg_loss = rolling_mean(loss, window)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return 100 - 100 / (1 + avg_gain / avg_loss)
+
+def compute_indicators(close: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Compute every indicator for a dates x tickers close matrix.
+    Returns full series (same shape as `close`) keyed by indicator name.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    if close.ndim == 1:
+        close = close[:, None]
+
+    sma_20 = rolling_mean(close, 20)
+    std_20 = rolling_std(close, 20)
+    macd = ema(close, 12) - ema(close, 26)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        log_returns = np.full_like(close, np.nan)
+        log_returns[1:] = np.log(close[1:] / close[:-1])
+
+    return {
+        "current_price": close,
+        "sma_20": sma_20,
+        "sma_50": rolling_mean(close, 50),
+        "sma_200": rolling_mean(close, 200),
+        "rsi_14": rsi(close, 14),
+        "macd": macd,
+        "macd_signal": ema(macd, 9),
+        "bb_upper": sma_20 + 2 * std_20,
+        "bb_lower": sma_20 - 2 * std_20,
+        # Expanding, so the last row is the volatility over the whole lookback
+        "volatility_annualized_pct": rolling_std(log_returns) * np.sqrt(252) * 100,
+    }
+
+def latest_values(series: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Last observed value of each indicator per ticker (ignoring missing trailing rows)."""
+    close = series["current_price"]
+    valid = ~np.isnan(close)
+    last = close.shape[0] - 1 - valid[::-1].argmax(axis=0)
+    cols = np.arange(close.shape[1])
+    return {name: values[last, cols] for name, values in series.items()}
+
+def interpret(values: Dict[str, float]) -> List[str]:
+    """Plain-language signals for one ticker's latest indicator values."""
+    signals = []
+    if values["rsi_14"] > 70: signals.append("Overbought (RSI > 70)")
+    elif values["rsi_14"] < 30: signals.append("Oversold (RSI < 30)")
+
+    if values["current_price"] > values["sma_200"]: signals.append("Bullish Trend (> 200 SMA)")
+    else: signals.append("Bearish Trend (< 200 SMA)")
+
+    if values["macd"] > values["macd_signal"]: signals.append("MACD Bullish Crossover")
+    return signals
+
+class PanelIndicators:
+    """
+    Technical indicators for a whole universe of tickers in one vectorized pass.
+    """
+
+    def __init__(self):
+        self.yf_tool = YahooFinanceTool()
+
+    def load_close_panel(self, tickers: List[str], period: str = "1y") -> Tuple[pd.DataFrame, Dict[str, str]]:
+        """
+        Dates x tickers frame of closes from the local price store (synced in bulk).
+        Gaps inside a ticker's history are forward-filled.
+        """
+        frames, errors = self.yf_tool.get_price_frames_many(tickers, period)
+        if not frames:
+            return pd.DataFrame(), errors
+        panel = pd.concat({ticker: bars["Close"] for ticker, bars in frames.items()}, axis=1).sort_index()
+        return panel.ffill(), errors
+
+    def calculate_indicators_many(self, tickers: List[str], period: str = "1y",
+                                  include_series: bool = False) -> Dict[str, Any]:
+        """
+        Calculate SMA, RSI, MACD, Bollinger Bands and volatility for many tickers.
+        Returns {"results": {ticker: indicators}, "errors": {ticker: message}}, plus the
+        shared "dates" axis when full series are requested.
+        """
+        try:
+            panel, errors = self.load_close_panel(tickers, period)
+        except Exception as e:
+            logger.error(f"Error loading price panel: {e}")
+            return {"results": {}, "errors": {t: str(e) for t in tickers}}
+        if panel.empty:
+            return {"results": {}, "errors": errors}
+
+        started = time.perf_counter()
+        series = compute_indicators(panel.to_numpy(dtype=np.float64))
+        latest = latest_values(series)
+        logger.info(f"Computed indicators for {panel.shape[1]} tickers x {panel.shape[0]} bars in {time.perf_counter() - started:.3f}s")
+
+        results = {}
+        for i, ticker in enumerate(panel.columns):
+            values = {name: float(latest[name][i]) for name in LATEST_FIELDS}
+            result = {"ticker": ticker, **values, "signals": interpret(values)}
+            if include_series:
+                result["series"] = {name: series[name][:, i] for name in LATEST_FIELDS}
+            results[ticker] = result
+
+        response = {"results": results, "errors": errors}
+        if include_series:
+            response["dates"] = [d.strftime('%Y-%m-%d') for d in panel.index]
+        return response
@@ -1,58 +1,85 @@
+import os
 import pandas as pd
-from prophet import Prophet
-from typing import Dict, Any, List, Optional
+import numpy as np
+from typing import Dict, Any, List, Optional, Callable
+from src.config import settings
 from src.tools.financial.yahoo_finance import YahooFinanceTool
+from src.tools.forecast.forecasters import FORECASTERS, get_forecaster
 from src.utils.cache import disk_cache
 from src.utils.logging import setup_logging
-import logging
-
-# Prophet is noisy
-logging.getLogger('cmdstanpy').setLevel(logging.WARNING)
-logging.getLogger('prophet').setLevel(logging.WARNING)
+from src.utils.process_pool import run_tasks
 
 logger = setup_logging(__name__)
 
+# Price history window every forecast is fitted on
+HISTORY_PERIOD = "2y"
+# Value columns of a forecast, in payload order
+FORECAST_COLUMNS = ['yhat', 'yhat_lower', 'yhat_upper']
+
+def compact_forecast(prediction: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Columnar forecast payload: first date, frequency and one float array per
+    column (one value per day), instead of a record dict per day.
+    """
+    return {
+        "start": prediction['ds'].iloc[0].strftime('%Y-%m-%d'),
+        "freq": "D",
+        **{col: np.round(prediction[col].to_numpy(dtype=np.float64), 4).tolist() for col in FORECAST_COLUMNS},
+    }
+
+def expand_forecast(data: Dict[str, Any]) -> pd.DataFrame:
+    """Rebuild a ds/yhat/yhat_lower/yhat_upper frame from a compact forecast payload."""
+    ds = pd.date_range(data["start"], periods=len(data["yhat"]), freq=data["freq"])
+    return pd.DataFrame({'ds': ds, **{col: data[col] for col in FORECAST_COLUMNS}})
+
+def _forecast_worker(ticker: str, periods: int, backend: Optional[str], summary_only: bool) -> Dict[str, Any]:
+    """Run one forecast (in a worker process)."""
+    return ProphetTool().forecast_price(ticker, periods=periods, backend=backend, summary_only=summary_only)
+
 class ProphetTool:
     """
-    Tool for price forecasting using Meta's Prophet model.
+    Tool for price forecasting. Uses a fast NumPy drift model by default;
+    Meta's Prophet is available as the "prophet" backend.
     """
     
     def __init__(self):
         self.yf_tool = YahooFinanceTool()
 
-    @disk_cache(expire=3600*12) # Cache for 12 hours
-    def forecast_price(self, ticker: str, periods: int = 30) -> Dict[str, Any]:
+    def forecast_price(self, ticker: str, periods: int = 30, backend: Optional[str] = None,
+                       summary_only: bool = False) -> Dict[str, Any]:
         """
         Generate a price forecast for the next N days.
+        :param backend: "drift" or "prophet" (default: settings.forecast_backend)
+        :param summary_only: Omit the per-day forecast arrays
         """
-        logger.info(f"Generating Prophet forecast for {ticker}...")
+        # Resolved before the cache lookup, so the default and explicit names share
+        # an entry and a settings change doesn't serve the old backend's forecast
+        backend = (backend or settings.forecast_backend).lower()
+        return self._forecast_price(ticker, periods=periods, backend=backend, summary_only=summary_only)
+
+    @disk_cache(expire=3600*12) # Cache for 12 hours
+    def _forecast_price(self, ticker: str, periods: int, backend: str, summary_only: bool) -> Dict[str, Any]:
+        try:
+            forecaster = get_forecaster(backend)
+        except ValueError as e:
+            return {"error": str(e)}
+        logger.info(f"Generating {forecaster.name} forecast for {ticker}...")
         
         # 1. Get Historical Data (2 years)
-        hist_data = self.yf_tool.get_price_history(ticker, period="2y")
-        if not hist_data or "error" in hist_data:
+        try:
+            hist = self.yf_tool.get_price_frame(ticker, period=HISTORY_PERIOD)
+        except Exception as e:
+            logger.error(f"Error loading price history for {ticker}: {e}")
+            hist = None
+        if hist is None or hist.empty:
             return {"error": "Insufficient data for forecasting"}
             
         try:
-            # 2. Prepare Data for Prophet (ds, y)
-            df = pd.DataFrame(hist_data)
-            df['ds'] = pd.to_datetime(df['Date'])
-            df['y'] = df['Close']
-            df = df[['ds', 'y']]
-            
-            # 3. Fit Model
-            # Daily data, disable intraday
-            m = Prophet(daily_seasonality=True, yearly_seasonality=True, weekly_seasonality=True)
-            m.fit(df)
-            
-            # 4. Predict
-            future = m.make_future_dataframe(periods=periods)
-            forecast = m.predict(future)
-            
-            # 5. Extract Results
-            # Last 'periods' rows are the prediction
-            prediction = forecast.tail(periods)
+            # 2. Fit and predict the days after the last bar
+            close = hist['Close']
+            prediction = forecaster.forecast(ticker, close, periods)
             
-            current_price = df.iloc[-1]['y']
+            current_price = close.iloc[-1]
             target_price = prediction.iloc[-1]['yhat']
             upper_bound = prediction.iloc[-1]['yhat_upper']
             lower_bound = prediction.iloc[-1]['yhat_lower']
@@ -64,8 +91,9 @@ class ProphetTool:
             if change_pct > 2: trend = "bullish"
             elif change_pct < -2: trend = "bearish"
             
-            return {
+            result = {
                 "ticker": ticker,
+                "model": forecaster.name,
                 "current_price": float(current_price),
                 "forecast_price_30d": float(target_price),
                 "forecast_upper": float(upper_bound),
@@ -73,9 +101,77 @@ class ProphetTool:
                 "change_pct": float(change_pct),
                 "trend": trend,
                 "confidence_interval": [float(lower_bound), float(upper_bound)],
-                "forecast_data": prediction[['ds', 'yhat', 'yhat_lower', 'yhat_upper']].tail(periods).to_dict('records') # Convert timestamps to str?
             }
+            if not summary_only:
+                result["forecast_data"] = compact_forecast(prediction)
+            return result
             
         except Exception as e:
-            logger.error(f"Prophet forecast failed for {ticker}: {e}")
+            logger.error(f"{forecaster.name} forecast failed for {ticker}: {e}")
             return {"error": str(e)}
+
+    def forecast_many(self, tickers: List[str], periods: int = 30, backend: Optional[str] = None,
+                      summary_only: bool = False, max_workers: Optional[int] = None, timeout: Optional[float] = None,
+                      progress: Optional[Callable[[int, int, str], None]] = None) -> Dict[str, Any]:
+        """
+        Forecast many tickers, fitting models in parallel on worker processes.
+        Price history is synced in bulk first so workers read it from the shared
+        price store instead of each refetching.
+        :param backend: Forecasting backend (default: settings.forecast_backend)
+        :param summary_only: Omit the per-day forecast arrays
+        :param max_workers: Worker processes (default: settings.forecast_max_workers or CPU count)
+        :param timeout: Seconds allowed per ticker (default: settings.forecast_task_timeout). A fit
+            that overruns has its worker process, and any Stan subprocess, killed.
+        :param progress: Called as progress(done, total, ticker) after each ticker finishes
+        Backends whose fits are cheap (not `parallel`) run in this process, without a pool or timeout.
+        Returns {"results": {ticker: forecast}, "errors": {ticker: message}} in input order.
+        """
+        tickers = list(dict.fromkeys(tickers))
+        timeout = settings.forecast_task_timeout if timeout is None else timeout
+        backend = (backend or settings.forecast_backend).lower()
+        if backend not in FORECASTERS:
+            return {"results": {}, "errors": {t: f"Unknown forecast backend '{backend}'" for t in tickers}}
+
+        try:
+            errors = self.yf_tool.sync_price_history_many(tickers, HISTORY_PERIOD)
+        except Exception as e:
+            logger.error(f"Error syncing price history for batch forecast: {e}")
+            errors = {}
+        pending = [t for t in tickers if t not in errors]
+        outcomes = {t: {"error": msg} for t, msg in errors.items()}
+
+        done = len(outcomes)
+        def record(ticker, outcome):
+            nonlocal done
+            outcomes[ticker] = outcome
+            done += 1
+            if progress:
+                progress(done, len(tickers), ticker)
+
+        if not FORECASTERS[backend].parallel:
+            # Cheap fits: pool start-up would cost more than it saves
+            logger.info(f"Forecasting {len(pending)} tickers in-process...")
+            for ticker in pending:
+                try:
+                    record(ticker, _forecast_worker(ticker, periods, backend, summary_only))
+                except Exception as e:
+                    record(ticker, {"error": str(e)})
+        elif pending:
+            max_workers = max_workers or settings.forecast_max_workers or os.cpu_count() or 1
+            max_workers = max(1, min(max_workers, len(pending)))
+            logger.info(f"Forecasting {len(pending)} tickers on {max_workers} worker(s)...")
+            tasks = {t: (t, periods, backend, summary_only) for t in pending}
+            for ticker, outcome, error in run_tasks(_forecast_worker, tasks, max_workers, timeout or None):
+                if error is not None:
+                    logger.error(f"Forecast failed for {ticker}: {error}")
+                    outcome = {"error": f"Forecast failed: {error}"}
+                record(ticker, outcome)
+
+        results, errors = {}, {}
+        for ticker in tickers:
+            outcome = outcomes[ticker]
+            if "error" in outcome:
+                errors[ticker] = outcome["error"]
+            else:
+                results[ticker] = outcome
+        return {"results": results, "errors": errors}
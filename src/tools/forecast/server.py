@@ -1,26 +1,70 @@
 
-from fastmcp import FastMCP
+import asyncio
+from fastmcp import FastMCP, Context
+from src.utils.cache_metrics import register_metrics_route
+from src.utils.serialization import tool_result
 from src.tools.forecast.prophet_forecast import ProphetTool
 from src.tools.forecast.technical_indicators import TechnicalAnalysis
+from src.tools.forecast.panel_indicators import PanelIndicators
+from src.tools.forecast.streaming_indicators import StreamingIndicators
 
 # Create FastMCP server
 mcp = FastMCP("forecast-analytics")
+register_metrics_route(mcp)
 
-@mcp.tool()
-def forecast_price(ticker: str, periods: int = 30) -> dict:
+@mcp.tool(meta={"cache_ttl": 1800})
+def forecast_price(ticker: str, periods: int = 30, backend: str | None = None, summary_only: bool = False) -> dict:
     """
-    Generate a price forecast for the next N days using Prophet.
+    Generate a price forecast for the next N days.
+    backend: "drift" (fast NumPy model, default) or "prophet".
+    summary_only: return only the headline numbers, without the per-day arrays.
     """
     tool = ProphetTool()
-    return {"forecast": tool.forecast_price(ticker, periods=periods)}
+    return tool_result({"forecast": tool.forecast_price(ticker, periods=periods, backend=backend, summary_only=summary_only)})
 
-@mcp.tool()
+@mcp.tool(meta={"cache_ttl": 1800})
+async def forecast_price_many(tickers: list[str], periods: int = 30, backend: str | None = None,
+                              summary_only: bool = True, ctx: Context = None) -> dict:
+    """
+    Generate price forecasts for many tickers in parallel. Failures and timeouts are reported per ticker.
+    Per-day arrays are omitted unless summary_only is False.
+    """
+    loop = asyncio.get_running_loop()
+
+    def progress(done, total, ticker):
+        if ctx is not None:
+            asyncio.run_coroutine_threadsafe(ctx.report_progress(done, total, f"Forecasted {ticker}"), loop)
+
+    tool = ProphetTool()
+    result = await asyncio.to_thread(tool.forecast_many, tickers, periods=periods, backend=backend,
+                                     summary_only=summary_only, progress=progress)
+    return tool_result(result)
+
+@mcp.tool(meta={"cache_ttl": 900})
 def get_technical_indicators(ticker: str) -> dict:
     """
     Calculate SMA, RSI, MACD, Bollinger Bands, Volatility.
     """
     tool = TechnicalAnalysis()
-    return {"indicators": tool.calculate_indicators(ticker)}
+    return tool_result({"indicators": tool.calculate_indicators(ticker)})
+
+@mcp.tool(meta={"cache_ttl": 900})
+def get_technical_indicators_many(tickers: list[str], period: str = "1y", include_series: bool = False) -> dict:
+    """
+    Calculate SMA, RSI, MACD, Bollinger Bands, Volatility for many tickers in one pass.
+    Set include_series to also return the full daily series for each indicator.
+    """
+    tool = PanelIndicators()
+    return tool_result(tool.calculate_indicators_many(tickers, period=period, include_series=include_series))
+
+@mcp.tool()
+def get_live_indicators(ticker: str) -> dict:
+    """
+    Incrementally updated SMA, Wilder RSI, MACD, Bollinger Bands, Volatility,
+    including today's still-forming bar while the market is open.
+    """
+    tool = StreamingIndicators()
+    return tool_result({"indicators": tool.get_indicators(ticker)})
 
 if __name__ == "__main__":
     mcp.run()
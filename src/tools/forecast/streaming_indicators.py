@@ -0,0 +1,438 @@
+import datetime
+import math
+import pandas as pd
+from collections import deque
+from typing import Dict, Any, Optional
+from src.tools.financial.yahoo_finance import YahooFinanceTool
+from src.tools.forecast.panel_indicators import interpret
+from src.utils.cache import load_state, save_state
+from src.utils.market_calendar import EXCHANGE_TZ, is_market_open
+from src.utils.logging import setup_logging
+
+logger = setup_logging(__name__)
+
+NAN = float("nan")
+
+# Bump when the persisted state layout changes
+STATE_VERSION = 1
+
+# Trailing daily returns behind the realized volatility (one trading year)
+VOLATILITY_WINDOW = 252
+
+class RollingSMA:
+    """Simple moving average over the last `window` values, O(1) per update."""
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.total = 0.0
+        self._since_resync = 0
+
+    def update(self, x: float) -> float:
+        if len(self.values) == self.window:
+            self.total -= self.values[0]
+        self.values.append(x)
+        self.total += x
+        # Re-add the window now and then so rounding error can't accumulate (amortized O(1))
+        self._since_resync += 1
+        if self._since_resync >= self.window:
+            self.total = math.fsum(self.values)
+            self._since_resync = 0
+        return self.value
+
+    def peek(self, x: float) -> float:
+        """Value if `x` were the next bar, without consuming it."""
+        if len(self.values) + 1 < self.window:
+            return NAN
+        dropped = self.values[0] if len(self.values) == self.window else 0.0
+        return (self.total - dropped + x) / self.window
+
+    @property
+    def value(self) -> float:
+        return self.total / self.window if len(self.values) == self.window else NAN
+
+    def to_state(self) -> Dict[str, Any]:
+        return {"window": self.window, "values": list(self.values)}
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "RollingSMA":
+        obj = cls(state["window"])
+        obj.values.extend(state["values"])
+        obj.total = math.fsum(obj.values)
+        return obj
+
+class RollingStats:
+    """Running mean and sample variance over the last `window` values, O(1) per update."""
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque(maxlen=window)
+        # Sums are taken relative to the first value seen to keep them well conditioned
+        self.shift = None
+        self.total = 0.0
+        self.squares = 0.0
+        self._since_resync = 0
+
+    def _resync(self):
+        centered = [v - self.shift for v in self.values]
+        self.total = math.fsum(centered)
+        self.squares = math.fsum(c * c for c in centered)
+        self._since_resync = 0
+
+    def update(self, x: float):
+        if self.shift is None:
+            self.shift = x
+        if len(self.values) == self.window:
+            old = self.values[0] - self.shift
+            self.total -= old
+            self.squares -= old * old
+        self.values.append(x)
+        centered = x - self.shift
+        self.total += centered
+        self.squares += centered * centered
+        self._since_resync += 1
+        if self._since_resync >= self.window:
+            self._resync()
+
+    def _moments(self, n: int, total: float, squares: float, shift: float):
+        if n < self.window or n < 2:
+            return NAN, NAN
+        mean = total / n
+        var = max((squares - total * total / n) / (n - 1), 0.0)
+        return mean + shift, math.sqrt(var)
+
+    @property
+    def mean_std(self):
+        return self._moments(len(self.values), self.total, self.squares, self.shift)
+
+    def peek(self, x: float):
+        """(mean, std) if `x` were the next value, without consuming it."""
+        if self.shift is None:
+            return self._moments(1, 0.0, 0.0, x)
+        total, squares, n = self.total, self.squares, len(self.values) + 1
+        if len(self.values) == self.window:
+            old = self.values[0] - self.shift
+            total -= old
+            squares -= old * old
+            n -= 1
+        centered = x - self.shift
+        return self._moments(n, total + centered, squares + centered * centered, self.shift)
+
+    def to_state(self) -> Dict[str, Any]:
+        return {"window": self.window, "values": list(self.values)}
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "RollingStats":
+        obj = cls(state["window"])
+        obj.values.extend(state["values"])
+        if obj.values:
+            obj.shift = obj.values[0]
+            obj._resync()
+        return obj
+
+class EMA:
+    """Exponential moving average (same recursion as pandas `ewm(span, adjust=False)`)."""
+
+    def __init__(self, span: int, value: Optional[float] = None):
+        self.span = span
+        self.alpha = 2.0 / (span + 1)
+        self.value = NAN if value is None else value
+
+    def peek(self, x: float) -> float:
+        return x if math.isnan(self.value) else self.alpha * x + (1 - self.alpha) * self.value
+
+    def update(self, x: float) -> float:
+        self.value = self.peek(x)
+        return self.value
+
+    def to_state(self) -> Dict[str, Any]:
+        return {"span": self.span, "value": self.value}
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "EMA":
+        return cls(state["span"], state["value"])
+
+class MACD:
+    """MACD line (fast EMA - slow EMA) and its signal EMA."""
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.fast = EMA(fast)
+        self.slow = EMA(slow)
+        self.signal = EMA(signal)
+
+    def update(self, x: float):
+        macd = self.fast.update(x) - self.slow.update(x)
+        return macd, self.signal.update(macd)
+
+    def peek(self, x: float):
+        macd = self.fast.peek(x) - self.slow.peek(x)
+        return macd, self.signal.peek(macd)
+
+    @property
+    def value(self):
+        return self.fast.value - self.slow.value, self.signal.value
+
+    def to_state(self) -> Dict[str, Any]:
+        return {"fast": self.fast.to_state(), "slow": self.slow.to_state(), "signal": self.signal.to_state()}
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "MACD":
+        obj = cls.__new__(cls)
+        obj.fast = EMA.from_state(state["fast"])
+        obj.slow = EMA.from_state(state["slow"])
+        obj.signal = EMA.from_state(state["signal"])
+        return obj
+
+class WilderRSI:
+    """
+    RSI with Wilder smoothing: averages are seeded with the simple mean of the
+    first `period` moves, then updated as avg = (avg * (period - 1) + move) / period.
+    """
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.prev_close = None
+        self.count = 0
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+
+    def _advance(self, close: float):
+        # New (count, avg_gain, avg_loss) after consuming `close`
+        if self.prev_close is None:
+            return 0, 0.0, 0.0
+        change = close - self.prev_close
+        gain, loss = max(change, 0.0), max(-change, 0.0)
+        count = self.count + 1
+        if count <= self.period:
+            # Seeding: accumulate a running simple mean
+            avg_gain = self.avg_gain + (gain - self.avg_gain) / count
+            avg_loss = self.avg_loss + (loss - self.avg_loss) / count
+        else:
+            avg_gain = (self.avg_gain * (self.period - 1) + gain) / self.period
+            avg_loss = (self.avg_loss * (self.period - 1) + loss) / self.period
+        return count, avg_gain, avg_loss
+
+    def _rsi(self, count: int, avg_gain: float, avg_loss: float) -> float:
+        if count < self.period:
+            return NAN
+        if avg_loss == 0:
+            return 100.0 if avg_gain > 0 else 50.0
+        return 100 - 100 / (1 + avg_gain / avg_loss)
+
+    def update(self, close: float) -> float:
+        self.count, self.avg_gain, self.avg_loss = self._advance(close)
+        self.prev_close = close
+        return self.value
+
+    def peek(self, close: float) -> float:
+        return self._rsi(*self._advance(close))
+
+    @property
+    def value(self) -> float:
+        return self._rsi(self.count, self.avg_gain, self.avg_loss)
+
+    def to_state(self) -> Dict[str, Any]:
+        return {"period": self.period, "prev_close": self.prev_close, "count": self.count,
+                "avg_gain": self.avg_gain, "avg_loss": self.avg_loss}
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "WilderRSI":
+        obj = cls(state["period"])
+        obj.prev_close = state["prev_close"]
+        obj.count = state["count"]
+        obj.avg_gain = state["avg_gain"]
+        obj.avg_loss = state["avg_loss"]
+        return obj
+
+class RealizedVolatility:
+    """Annualized standard deviation of daily log returns over a trailing window, in percent."""
+
+    def __init__(self, window: int = 252, periods_per_year: int = 252):
+        self.periods_per_year = periods_per_year
+        self.prev_close = None
+        self.returns = RollingStats(window)
+
+    def _scale(self, std: float) -> float:
+        return std * math.sqrt(self.periods_per_year) * 100
+
+    def update(self, close: float) -> float:
+        if self.prev_close is not None:
+            self.returns.update(math.log(close / self.prev_close))
+        self.prev_close = close
+        return self.value
+
+    def peek(self, close: float) -> float:
+        if self.prev_close is None:
+            return NAN
+        return self._scale(self.returns.peek(math.log(close / self.prev_close))[1])
+
+    @property
+    def value(self) -> float:
+        return self._scale(self.returns.mean_std[1])
+
+    def to_state(self) -> Dict[str, Any]:
+        return {"periods_per_year": self.periods_per_year, "prev_close": self.prev_close,
+                "returns": self.returns.to_state()}
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "RealizedVolatility":
+        obj = cls(state["returns"]["window"], state["periods_per_year"])
+        obj.prev_close = state["prev_close"]
+        obj.returns = RollingStats.from_state(state["returns"])
+        return obj
+
+class IndicatorState:
+    """
+    Incremental versions of the technical indicators for one ticker, fed one
+    daily close at a time.
+    """
+
+    def __init__(self, volatility_window: int = VOLATILITY_WINDOW):
+        self.sma = {window: RollingSMA(window) for window in (20, 50, 200)}
+        self.rsi = WilderRSI(14)
+        self.macd = MACD(12, 26, 9)
+        self.bollinger = RollingStats(20)
+        self.volatility = RealizedVolatility(volatility_window)
+        self.last_date = None
+        self.last_close = None
+
+    def update(self, date: pd.Timestamp, close: float):
+        for sma in self.sma.values():
+            sma.update(close)
+        self.rsi.update(close)
+        self.macd.update(close)
+        self.bollinger.update(close)
+        self.volatility.update(close)
+        self.last_date = pd.Timestamp(date)
+        self.last_close = float(close)
+
+    def continues(self, close: pd.Series) -> bool:
+        """Whether `close` extends the bars already consumed (unchanged history)."""
+        if self.last_date is None or self.last_date not in close.index:
+            return False
+        return math.isclose(close.loc[self.last_date], self.last_close, rel_tol=1e-9)
+
+    def snapshot(self, partial_close: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Current indicator values. With `partial_close`, values include the
+        still-forming bar without consuming it.
+        """
+        if partial_close is None:
+            price = self.last_close
+            smas = {window: sma.value for window, sma in self.sma.items()}
+            rsi = self.rsi.value
+            macd, signal = self.macd.value
+            mean, std = self.bollinger.mean_std
+            vol = self.volatility.value
+        else:
+            price = partial_close
+            smas = {window: sma.peek(price) for window, sma in self.sma.items()}
+            rsi = self.rsi.peek(price)
+            macd, signal = self.macd.peek(price)
+            mean, std = self.bollinger.peek(price)
+            vol = self.volatility.peek(price)
+
+        return {
+            "current_price": price,
+            "sma_20": smas[20],
+            "sma_50": smas[50],
+            "sma_200": smas[200],
+            "rsi_14": rsi,
+            "macd": macd,
+            "macd_signal": signal,
+            "bb_upper": mean + 2 * std,
+            "bb_lower": mean - 2 * std,
+            "volatility_annualized_pct": vol,
+        }
+
+    def to_state(self) -> Dict[str, Any]:
+        return {
+            "version": STATE_VERSION,
+            "sma": [sma.to_state() for sma in self.sma.values()],
+            "rsi": self.rsi.to_state(),
+            "macd": self.macd.to_state(),
+            "bollinger": self.bollinger.to_state(),
+            "volatility": self.volatility.to_state(),
+            "last_date": None if self.last_date is None else self.last_date.isoformat(),
+            "last_close": self.last_close,
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> Optional["IndicatorState"]:
+        if not state or state.get("version") != STATE_VERSION:
+            return None
+        obj = cls.__new__(cls)
+        obj.sma = {s["window"]: RollingSMA.from_state(s) for s in state["sma"]}
+        obj.rsi = WilderRSI.from_state(state["rsi"])
+        obj.macd = MACD.from_state(state["macd"])
+        obj.bollinger = RollingStats.from_state(state["bollinger"])
+        obj.volatility = RealizedVolatility.from_state(state["volatility"])
+        obj.last_date = None if state["last_date"] is None else pd.Timestamp(state["last_date"])
+        obj.last_close = state["last_close"]
+        return obj
+
+class StreamingIndicators:
+    """
+    Technical indicators kept up to date incrementally. Per-ticker state is
+    persisted in the cache, so a refresh only consumes bars added since the
+    last call.
+    """
+
+    def __init__(self):
+        self.yf_tool = YahooFinanceTool()
+
+    @staticmethod
+    def state_key(ticker: str) -> str:
+        return f"{__name__}.IndicatorState:{ticker.upper()}:v{STATE_VERSION}"
+
+    def get_indicators(self, ticker: str) -> Dict[str, Any]:
+        """
+        Calculate SMA, Wilder RSI, MACD, Bollinger Bands and realized volatility,
+        including today's still-forming bar while the market is open.
+        """
+        try:
+            # Two years so the 252-return volatility window is full after a rebuild
+            hist = self.yf_tool.get_price_frame(ticker, period="2y")
+        except Exception as e:
+            logger.error(f"Error loading price history for {ticker}: {e}")
+            hist = None
+        if hist is None or hist.empty:
+            return {"error": "Data unavailable"}
+
+        try:
+            close = hist['Close']
+            # Today's bar keeps changing during the session: peek at it, don't consume it
+            partial = None
+            today = datetime.datetime.now(EXCHANGE_TZ).date()
+            if is_market_open() and close.index[-1].date() == today:
+                partial = float(close.iloc[-1])
+                close = close.iloc[:-1]
+
+            key = self.state_key(ticker)
+            state = IndicatorState.from_state(load_state(key))
+            # Short histories (recent listings) get a volatility window sized to the returns available
+            window = max(min(VOLATILITY_WINDOW, len(close) - 1), 2)
+            if state is None or not state.continues(close) or state.volatility.returns.window < window:
+                # First call, history was rewritten (e.g. split/dividend adjustment), or more history is now available
+                logger.debug(f"Rebuilding indicator state for {ticker} from {len(close)} bars")
+                state = IndicatorState(window)
+                new_bars = close
+            else:
+                new_bars = close[close.index > state.last_date]
+
+            for date, value in new_bars.items():
+                state.update(date, float(value))
+            if len(new_bars):
+                save_state(key, state.to_state())
+
+            values = state.snapshot(partial)
+            return {
+                "ticker": ticker,
+                "as_of": (close.index[-1] if partial is None else hist.index[-1]).strftime('%Y-%m-%d'),
+                "partial_bar": partial is not None,
+                **values,
+                "signals": interpret(values),
+            }
+        except Exception as e:
+            logger.error(f"Streaming indicators failed for {ticker}: {e}")
+            return {"error": str(e)}
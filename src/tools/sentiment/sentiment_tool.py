@@ -4,6 +4,7 @@ from typing import Dict, Any, List
 import datetime
 import os
 from src.utils.cache import disk_cache
+from src.utils.market_calendar import MarketHoursTTL
 from src.utils.retry import with_retry
 from src.utils.logging import setup_logging
 
@@ -22,7 +23,7 @@ class SentimentTool:
         return NewsApiClient(api_key=api_key)
 
     @staticmethod
-    @disk_cache(expire=3600)  # 1h cache
+    @disk_cache(expire=MarketHoursTTL(open_ttl=3600, closed_ttl=6 * 3600), stale_ttl=6 * 3600)  # 1h in session, up to 6h otherwise
     @with_retry(max_attempts=3)
     def get_news_sentiment(ticker: str, days: int = 7) -> List[Dict[str, Any]]:
         """
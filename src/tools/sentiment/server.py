@@ -1,23 +1,26 @@
 
 from fastmcp import FastMCP
+from src.utils.cache_metrics import register_metrics_route
+from src.utils.serialization import tool_result
 from src.tools.sentiment.sentiment_tool import SentimentTool
 
 # Create FastMCP server
 mcp = FastMCP("sentiment-analysis")
+register_metrics_route(mcp)
 
-@mcp.tool()
+@mcp.tool(meta={"cache_ttl": 900})
 def get_news_sentiment(ticker: str, days: int = 7) -> dict:
     """
     Get recent news articles and simple sentiment for a ticker.
     """
-    return {"articles": SentimentTool.get_news_sentiment(ticker, days)}
+    return tool_result({"articles": SentimentTool.get_news_sentiment(ticker, days)})
 
-@mcp.tool()
+@mcp.tool(meta={"cache_ttl": 900})
 def get_reddit_sentiment(ticker: str, limit: int = 10) -> dict:
     """
     Get recent Reddit sentiment (Mock).
     """
-    return {"posts": SentimentTool.get_reddit_sentiment(ticker, limit)}
+    return tool_result({"posts": SentimentTool.get_reddit_sentiment(ticker, limit)})
 
 if __name__ == "__main__":
     mcp.run()
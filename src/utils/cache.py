@@ -1,5 +1,18 @@
+import atexit
+import datetime
 import functools
+import hashlib
+import inspect
+import json
 import os
+import pickle
+import threading
+import time
+import uuid
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
 from diskcache import Cache
 from src.config import settings
 from src.utils.logging import setup_logging
@@ -14,32 +27,523 @@ os.makedirs(CACHE_DIR, exist_ok=True)
 # Size limit: 1GB, Eviction: Least Recently Used
 _cache = Cache(CACHE_DIR, size_limit=int(1e9))
 
-def disk_cache(expire=3600):
+_MISSING = object()
+
+# Internal bookkeeping keys kept out of listings
+STATS_KEY = "__stats__"
+LEASE_SUFFIX = "::lease"
+# Changed on every invalidation so other processes drop their memory tier
+GENERATION_KEY = "__generation__"
+
+class CacheStats:
+    """
+    Per-function cache counters.
+
+    Counters are kept in-process (cheap enough for memory-tier hits) and
+    periodically added to shared totals under one disk cache key, so the CLI
+    and metrics endpoints can report totals across all processes with a single read.
+    """
+
+    FIELDS = ("hits_memory", "hits_disk", "misses", "stale_serves", "bytes_stored",
+              "memory_evictions", "disk_evictions", "compute_seconds")
+
+    def __init__(self, flush_interval: float):
+        self.flush_interval = flush_interval
+        self._totals = defaultdict(lambda: defaultdict(float))
+        self._pending = defaultdict(lambda: defaultdict(float))
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def record(self, function: str, field: str, amount: float = 1):
+        with self._lock:
+            self._totals[function][field] += amount
+            self._pending[function][field] += amount
+
+    @staticmethod
+    def _with_savings(counters: Dict[str, Dict[str, float]]) -> Dict[str, Dict[str, float]]:
+        # Every hit saves roughly the average compute time of a miss
+        result = {}
+        for function, values in counters.items():
+            row = {field: values.get(field, 0) for field in CacheStats.FIELDS}
+            hits = row["hits_memory"] + row["hits_disk"] + row["stale_serves"]
+            avg_compute = row["compute_seconds"] / row["misses"] if row["misses"] else 0.0
+            row["saved_seconds"] = hits * avg_compute
+            row["hit_rate"] = hits / (hits + row["misses"]) if hits + row["misses"] else 0.0
+            result[function] = row
+        return result
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Counters recorded by this process."""
+        with self._lock:
+            return self._with_savings({f: dict(v) for f, v in self._totals.items()})
+
+    def flush(self, force: bool = False):
+        """Add counters recorded since the last flush to the shared totals on disk."""
+        with self._lock:
+            if not force and time.monotonic() - self._last_flush < self.flush_interval:
+                return
+            pending, self._pending = self._pending, defaultdict(lambda: defaultdict(float))
+            self._last_flush = time.monotonic()
+        if not pending:
+            return
+        try:
+            with _cache.transact():
+                totals = _cache.get(STATS_KEY, default={})
+                for function, values in pending.items():
+                    row = totals.setdefault(function, {})
+                    for field, amount in values.items():
+                        row[field] = row.get(field, 0) + amount
+                _cache.set(STATS_KEY, totals)
+        except Exception as e:
+            logger.debug(f"Failed to flush cache stats: {e}")
+
+    def persisted(self) -> Dict[str, Dict[str, float]]:
+        """Totals across all processes sharing the disk cache."""
+        self.flush(force=True)
+        return self._with_savings(_cache.get(STATS_KEY, default={}))
+
+    def reset(self):
+        with self._lock:
+            self._totals.clear()
+            self._pending.clear()
+
+_stats = CacheStats(settings.cache_stats_flush_interval)
+atexit.register(lambda: _stats.flush(force=True))
+
+class MemoryTier:
+    """
+    In-process LRU cache in front of the disk cache.
+
+    Entries are grouped into namespaces (one per cached function by default),
+    each with its own byte budget, so a bulky function can only evict its own
+    entries. Sizes are measured as pickled bytes. Hits return the cached object
+    itself, so callers must treat cached values as read-only.
+    """
+
+    def __init__(self, default_budget: int, on_evict: Optional[Callable[[str], None]] = None):
+        self.default_budget = default_budget
+        self.on_evict = on_evict
+        self._budgets = {}
+        self._entries = {}  # namespace -> OrderedDict[key, (value, expire_at, size)]
+        self._used = {}
+        self._lock = threading.Lock()
+
+    def configure(self, namespace: str, budget: int = None):
+        """Set the byte budget for a namespace (None keeps the current or default budget)."""
+        with self._lock:
+            if budget is not None or namespace not in self._budgets:
+                self._budgets[namespace] = self.default_budget if budget is None else budget
+            self._entries.setdefault(namespace, OrderedDict())
+            self._used.setdefault(namespace, 0)
+
+    def get(self, namespace: str, key: str):
+        with self._lock:
+            entries = self._entries.get(namespace)
+            entry = entries.get(key) if entries is not None else None
+            if entry is None:
+                return _MISSING
+            value, expire_at, size = entry
+            if expire_at is not None and expire_at <= time.time():
+                del entries[key]
+                self._used[namespace] -= size
+                return _MISSING
+            entries.move_to_end(key)
+            return value
+
+    def set(self, namespace: str, key: str, value, expire_at: float = None):
+        budget = self._budgets.get(namespace, self.default_budget)
+        if budget <= 0:
+            return
+        try:
+            size = len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception:
+            return
+        if size > budget:
+            return
+
+        with self._lock:
+            entries = self._entries.setdefault(namespace, OrderedDict())
+            self._used.setdefault(namespace, 0)
+            old = entries.pop(key, None)
+            if old is not None:
+                self._used[namespace] -= old[2]
+            while entries and self._used[namespace] + size > budget:
+                _, (_, _, evicted_size) = entries.popitem(last=False)
+                self._used[namespace] -= evicted_size
+                if self.on_evict:
+                    self.on_evict(namespace)
+            entries[key] = (value, expire_at, size)
+            self._used[namespace] += size
+
+    def clear(self):
+        with self._lock:
+            for namespace in self._entries:
+                self._entries[namespace].clear()
+                self._used[namespace] = 0
+
+_memory = MemoryTier(settings.cache_memory_budget, on_evict=lambda ns: _stats.record(ns, "memory_evictions"))
+
+# Last invalidation generation seen by this process, and when it was checked
+_generation = {"seen": _MISSING, "checked": 0.0}
+
+def _sync_generation():
+    """
+    Drop the memory tier if another process invalidated entries since the last
+    check. The disk lookup runs at most every cache_generation_check_interval seconds.
+    """
+    now = time.monotonic()
+    if now - _generation["checked"] < settings.cache_generation_check_interval:
+        return
+    _generation["checked"] = now
+    current = _cache.get(GENERATION_KEY, default=None)
+    if current != _generation["seen"]:
+        if _generation["seen"] is not _MISSING:
+            logger.debug("Cache invalidated by another process; clearing memory tier")
+            _memory.clear()
+        _generation["seen"] = current
+
+def _bump_generation():
+    token = time.time_ns()
+    _cache.set(GENERATION_KEY, token)
+    _memory.clear()
+    _generation["seen"] = token
+
+# Per-key locks so threads in this process wait on one computation
+_key_locks = {}
+_key_locks_guard = threading.Lock()
+
+@contextmanager
+def _key_lock(key):
+    with _key_locks_guard:
+        lock, users = _key_locks.get(key, (None, 0))
+        if lock is None:
+            lock = threading.Lock()
+        _key_locks[key] = (lock, users + 1)
+    try:
+        with lock:
+            yield
+    finally:
+        with _key_locks_guard:
+            lock, users = _key_locks[key]
+            if users == 1:
+                del _key_locks[key]
+            else:
+                _key_locks[key] = (lock, users - 1)
+
+class CacheEntry(NamedTuple):
+    """A cached value and the time it stops being fresh (it may be served stale after that)."""
+    value: Any
+    fresh_until: float
+    stored_at: float = 0.0
+
+    @property
+    def is_fresh(self) -> bool:
+        return time.time() < self.fresh_until
+
+def _resolve_ttl(expire) -> float:
+    """Fixed TTL in seconds, or a policy callable (e.g. MarketHoursTTL) evaluated now."""
+    return expire() if callable(expire) else expire
+
+def _store(key, value, expire, stale_ttl, ns):
+    now = time.time()
+    ttl = _resolve_ttl(expire)
+    entry = CacheEntry(value, now + ttl, now)
+    # Keep the entry on disk through its stale window. Counting inside one
+    # transaction shows how many entries the set culled (expired or over size_limit).
+    with _cache.transact():
+        expected = len(_cache) + (key not in _cache)
+        _cache.set(key, entry, expire=ttl + stale_ttl)
+        culled = expected - len(_cache)
+    if culled > 0:
+        _stats.record(ns, "disk_evictions", culled)
+    try:
+        _stats.record(ns, "bytes_stored", len(pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL)))
+    except Exception:
+        pass
+    return entry, now + ttl + stale_ttl
+
+def _get_fresh(key):
+    entry, expire_at = _cache.get(key, default=None, expire_time=True)
+    if isinstance(entry, CacheEntry) and entry.is_fresh:
+        return entry, expire_at
+    return None, None
+
+def _release_lease(lease_key, token):
+    # Compare-and-delete: the lease may have expired and been taken by another process
+    with _cache.transact():
+        if _cache.get(lease_key) == token:
+            _cache.delete(lease_key)
+
+def _single_flight(key, compute, expire, stale_ttl=0, ns=None):
+    """
+    Return a fresh (entry, expire_at) for key, computing the value at most once at a time.
+
+    Threads in this process serialize on a per-key lock. Across processes
+    (e.g. the MCP servers sharing data/cache) the first caller takes a lease
+    in the cache itself; late callers poll for its result instead of
+    recomputing. A lease that outlives `cache_lease_timeout` expires, so a
+    crashed owner can't block the key forever.
+    """
+    with _key_lock(key):
+        entry, expire_at = _get_fresh(key)
+        if entry is not None:
+            return entry, expire_at
+
+        lease_key = f"{key}{LEASE_SUFFIX}"
+        # Unique per attempt: an owner that outlived its lease must not release the next owner's
+        token = uuid.uuid4().hex
+        wait = 0.01
+        while True:
+            if _cache.add(lease_key, token, expire=settings.cache_lease_timeout):
+                try:
+                    # Another process may have finished between our read and the lease
+                    entry, expire_at = _get_fresh(key)
+                    if entry is None:
+                        started = time.perf_counter()
+                        value = compute()
+                        _stats.record(ns, "misses")
+                        _stats.record(ns, "compute_seconds", time.perf_counter() - started)
+                        entry, expire_at = _store(key, value, expire, stale_ttl, ns)
+                        _stats.flush()
+                    return entry, expire_at
+                finally:
+                    _release_lease(lease_key, token)
+
+            time.sleep(wait)
+            wait = min(wait * 2, 0.25)
+            entry, expire_at = _get_fresh(key)
+            if entry is not None:
+                logger.debug(f"Coalesced with in-flight computation for {key}")
+                return entry, expire_at
+
+# Stale entries are refreshed off the caller's thread, once per key at a time
+_refresher = ThreadPoolExecutor(max_workers=4, thread_name_prefix="cache-refresh")
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+def _refresh_in_background(key, ns, compute, expire, stale_ttl):
+    with _refreshing_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+
+    def refresh():
+        try:
+            entry, expire_at = _single_flight(key, compute, expire, stale_ttl, ns)
+            _memory.set(ns, key, entry, expire_at)
+        except Exception as e:
+            logger.warning(f"Background refresh failed for {key}: {e}")
+        finally:
+            with _refreshing_lock:
+                _refreshing.discard(key)
+
+    _refresher.submit(refresh)
+
+def _upper(value):
+    return value.strip().upper() if isinstance(value, str) else value
+
+# Arguments normalized by parameter name before hashing, so e.g. AAPL/aapl share an entry
+ARG_NORMALIZERS: Dict[str, Callable[[Any], Any]] = {
+    "ticker": _upper,
+    "tickers": lambda v: [_upper(t) for t in v] if isinstance(v, (list, tuple)) else v,
+    "series_id": _upper,
+}
+
+# Arguments that name the entry's subject; kept readable in the key for inspection/invalidation
+SUBJECT_ARGS = ("ticker", "series_id")
+
+def _canonical_default(value):
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=repr)
+    if hasattr(value, "item"):  # numpy scalars
+        return value.item()
+    return repr(value)
+
+def function_version(func) -> str:
+    """
+    Short digest of a function's source, so editing a cached function
+    invalidates only that function's entries.
     """
-    Decorator to cache function results to disk.
-    :param expire: Expiration time in seconds (default 1 hour)
+    func = inspect.unwrap(func)
+    try:
+        source = inspect.getsource(func).encode()
+    except (OSError, TypeError):
+        source = func.__code__.co_code
+    return hashlib.sha256(source).hexdigest()[:8]
+
+def make_cache_key(signature: inspect.Signature, prefix: str, args, kwargs) -> str:
+    """
+    Stable cross-process key: arguments are bound by signature (so positional
+    and keyword forms match), defaults applied, `self`/`cls` dropped, known
+    arguments normalized, and the canonical JSON form hashed.
+    """
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    params = dict(bound.arguments)
+
+    first = next(iter(signature.parameters), None)
+    if first in ("self", "cls"):
+        params.pop(first, None)
+    for name, param in signature.parameters.items():
+        if param.kind is inspect.Parameter.VAR_KEYWORD:
+            params.update(params.pop(name, {}))
+
+    for name, normalize in ARG_NORMALIZERS.items():
+        if name in params:
+            params[name] = normalize(params[name])
+
+    payload = json.dumps(params, sort_keys=True, separators=(",", ":"), default=_canonical_default)
+    digest = hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+    subject = next((params[a] for a in SUBJECT_ARGS if isinstance(params.get(a), str)), None)
+    if subject:
+        return f"{prefix}:{subject}:{digest}"
+    return f"{prefix}:{digest}"
+
+def disk_cache(expire=3600, stale_ttl=0, namespace=None, memory_budget=None, version=None):
+    """
+    Decorator to cache function results in memory and on disk.
+    Hot entries are served from an in-process LRU tier; disk is the second tier.
+    Concurrent misses on the same key (across threads and processes) are
+    coalesced into a single call.
+    :param expire: Expiration time in seconds (default 1 hour), or a TTL policy
+        callable such as MarketHoursTTL evaluated when the value is stored
+    :param stale_ttl: Seconds past expiry during which the old value is returned
+        immediately while a background refresh runs (0 disables)
+    :param namespace: Memory-tier budget group (default: the function's qualified name)
+    :param memory_budget: Memory-tier bytes for the namespace (0 disables the memory tier)
+    :param version: Key version for the function (default: digest of its source)
     """
     def decorator(func):
+        ns = namespace or f"{func.__module__}.{func.__qualname__}"
+        _memory.configure(ns, memory_budget)
+
+        signature = inspect.signature(func)
+        prefix = f"{func.__module__}.{func.__qualname__}@{version or function_version(func)}"
+
+        def cache_key(*args, **kwargs) -> str:
+            return make_cache_key(signature, prefix, args, kwargs)
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            # Create a unique key based on function name and arguments
-            key = f"{func.__module__}.{func.__name__}:{str(args)}:{str(kwargs)}"
-            
-            if key in _cache:
-                logger.debug(f"Cache hit for {func.__name__}")
-                return _cache[key]
-            
-            try:
-                result = func(*args, **kwargs)
-                _cache.set(key, result, expire=expire)
-                return result
-            except Exception as e:
-                # Don't cache failures
-                raise e
+            key = cache_key(*args, **kwargs)
+            compute = lambda: func(*args, **kwargs)
+
+            tier = "hits_memory"
+            _sync_generation()
+            entry = _memory.get(ns, key)
+            if entry is _MISSING:
+                tier = "hits_disk"
+                entry, expire_at = _cache.get(key, default=_MISSING, expire_time=True)
+                if isinstance(entry, CacheEntry):
+                    logger.debug(f"Cache hit for {func.__name__}")
+                    _memory.set(ns, key, entry, expire_at)
+                else:
+                    entry = _MISSING
+
+            if entry is not _MISSING:
+                if entry.is_fresh:
+                    _stats.record(ns, tier)
+                else:
+                    logger.debug(f"Serving stale {func.__name__} while refreshing")
+                    _stats.record(ns, "stale_serves")
+                    _refresh_in_background(key, ns, compute, expire, stale_ttl)
+                return entry.value
+
+            # Failures propagate and are not cached
+            entry, expire_at = _single_flight(key, compute, expire, stale_ttl, ns)
+            _memory.set(ns, key, entry, expire_at)
+            return entry.value
+
+        wrapper.cache_key = cache_key
+        wrapper.cache_prefix = prefix
         return wrapper
     return decorator
 
+def load_state(key: str, default=None):
+    """Read state persisted with `save_state`."""
+    return _cache.get(key, default=default)
+
+def save_state(key: str, value, expire: float = None):
+    """
+    Persist a small piece of state (e.g. incremental indicators) in the disk
+    cache, shared across processes.
+    """
+    _cache.set(key, value, expire=expire)
+
+def get_cache_stats(all_processes: bool = False) -> Dict[str, Dict[str, float]]:
+    """
+    Per-function counters: hits (memory/disk), misses, stale serves, bytes
+    stored, memory-tier and disk evictions, compute time spent and time saved by hits.
+    :param all_processes: Report totals shared through the disk cache instead of this process only
+    """
+    return _stats.persisted() if all_processes else _stats.snapshot()
+
+def _is_bookkeeping(key) -> bool:
+    return not isinstance(key, str) or key == GENERATION_KEY or key.startswith(STATS_KEY) or key.endswith(LEASE_SUFFIX)
+
+def disk_usage() -> Dict[str, int]:
+    """Entry count and bytes used by the disk cache, read from its metadata (no scan)."""
+    return {"entries": len(_cache), "bytes": _cache.volume()}
+
+def list_entries() -> List[Dict[str, Any]]:
+    """
+    Describe every cached entry (key, size in pickled bytes, age and time to
+    expiry in seconds). Reads every value, so it is meant for the CLI, not hot paths.
+    Age is None for entries without a store time (state, or entries from older versions).
+    """
+    now = time.time()
+    entries = []
+    for key in _cache.iterkeys():
+        if _is_bookkeeping(key):
+            continue
+        value, expire_time = _cache.get(key, default=_MISSING, expire_time=True)
+        if value is _MISSING:
+            continue
+        try:
+            size = len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception:
+            size = 0
+        stored_at = value.stored_at if isinstance(value, CacheEntry) else 0.0
+        entries.append({
+            "key": key,
+            "function": key.split("@", 1)[0],
+            "size": size,
+            "age": now - stored_at if stored_at else None,
+            "expires_in": None if expire_time is None else expire_time - now,
+        })
+    return entries
+
+def invalidate(ticker: str = None, function: str = None) -> int:
+    """
+    Delete cached entries for a ticker/series and/or a function
+    (matched on the end of its qualified name, e.g. "get_stock_info").
+    Other processes drop their memory tier within cache_generation_check_interval.
+    Returns the number of entries removed.
+    """
+    if not ticker and not function:
+        raise ValueError("Specify a ticker and/or a function to invalidate")
+    subject = f":{_upper(ticker)}:" if ticker else None
+
+    removed = 0
+    # Matching needs only the keys; list() so deletes don't disturb the iteration
+    for key in list(_cache.iterkeys()):
+        if _is_bookkeeping(key):
+            continue
+        if subject and subject not in key:
+            continue
+        if function and not key.split("@", 1)[0].endswith(function):
+            continue
+        if _cache.delete(key):
+            removed += 1
+    _bump_generation()
+    logger.info(f"Invalidated {removed} cache entries (ticker={ticker}, function={function}).")
+    return removed
+
 def clear_cache():
     """Clear all cached data."""
     _cache.clear()
+    _bump_generation()
     logger.info("Cache cleared.")
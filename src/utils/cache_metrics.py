@@ -0,0 +1,50 @@
+import asyncio
+from src.utils.cache import disk_usage, get_cache_stats
+
+# (counter field, metric name, help text)
+METRICS = [
+    ("hits_memory", "quantmind_cache_memory_hits_total", "Fresh hits served from the in-process tier"),
+    ("hits_disk", "quantmind_cache_disk_hits_total", "Fresh hits served from the disk cache"),
+    ("misses", "quantmind_cache_misses_total", "Calls that computed a new value"),
+    ("stale_serves", "quantmind_cache_stale_serves_total", "Stale values served while refreshing"),
+    ("bytes_stored", "quantmind_cache_stored_bytes_total", "Bytes written to the disk cache"),
+    ("memory_evictions", "quantmind_cache_memory_evictions_total", "Entries evicted from the in-process tier"),
+    ("disk_evictions", "quantmind_cache_disk_evictions_total", "Entries culled from the disk cache (expired or over size_limit)"),
+    ("compute_seconds", "quantmind_cache_compute_seconds_total", "Time spent computing missed values"),
+    ("saved_seconds", "quantmind_cache_saved_seconds_total", "Estimated compute time saved by hits"),
+]
+
+def render_prometheus(all_processes: bool = True) -> str:
+    """
+    Render cache counters in the Prometheus text exposition format.
+    """
+    stats = get_cache_stats(all_processes=all_processes)
+    lines = []
+    for field, name, help_text in METRICS:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} counter")
+        for function, row in sorted(stats.items()):
+            lines.append(f'{name}{{function="{function}"}} {row[field]:g}')
+
+    usage = disk_usage()
+    lines.append("# HELP quantmind_cache_entries Entries currently on disk")
+    lines.append("# TYPE quantmind_cache_entries gauge")
+    lines.append(f"quantmind_cache_entries {usage['entries']}")
+    lines.append("# HELP quantmind_cache_size_bytes Bytes currently on disk")
+    lines.append("# TYPE quantmind_cache_size_bytes gauge")
+    lines.append(f"quantmind_cache_size_bytes {usage['bytes']}")
+    return "\n".join(lines) + "\n"
+
+def register_metrics_route(mcp):
+    """
+    Expose cache metrics at GET /metrics when the server runs over HTTP/SSE.
+    """
+    from starlette.responses import PlainTextResponse
+
+    @mcp.custom_route("/metrics", methods=["GET"])
+    async def metrics(request):
+        # Reads the disk cache, so keep it off the server's event loop
+        text = await asyncio.to_thread(render_prometheus)
+        return PlainTextResponse(text, media_type="text/plain; version=0.0.4")
+
+    return metrics
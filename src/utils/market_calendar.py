@@ -0,0 +1,82 @@
+import datetime
+import time
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+from typing import Optional
+from src.utils.logging import setup_logging
+
+logger = setup_logging(__name__)
+
+try:
+    import holidays
+    HAS_HOLIDAYS = True
+except ImportError:
+    HAS_HOLIDAYS = False
+
+# NYSE regular session (early closes are treated as full sessions)
+EXCHANGE_TZ = ZoneInfo("America/New_York")
+SESSION_OPEN = datetime.time(9, 30)
+SESSION_CLOSE = datetime.time(16, 0)
+
+@lru_cache(maxsize=16)
+def _exchange_holidays(year: int) -> frozenset:
+    if not HAS_HOLIDAYS:
+        return frozenset()
+    return frozenset(holidays.financial_holidays("NYSE", years=year))
+
+def is_trading_day(day: datetime.date) -> bool:
+    """Weekday that is not an exchange holiday."""
+    return day.weekday() < 5 and day not in _exchange_holidays(day.year)
+
+def _exchange_now(now: Optional[float] = None) -> datetime.datetime:
+    return datetime.datetime.fromtimestamp(time.time() if now is None else now, tz=EXCHANGE_TZ)
+
+def is_market_open(now: Optional[float] = None) -> bool:
+    """
+    Whether the regular session is open at `now` (epoch seconds, default: current time).
+    """
+    local = _exchange_now(now)
+    return is_trading_day(local.date()) and SESSION_OPEN <= local.time() < SESSION_CLOSE
+
+def next_market_open(now: Optional[float] = None) -> float:
+    """
+    Epoch seconds of the next session open strictly after `now`.
+    """
+    local = _exchange_now(now)
+    day = local.date()
+    if local.time() >= SESSION_OPEN:
+        day += datetime.timedelta(days=1)
+    while not is_trading_day(day):
+        day += datetime.timedelta(days=1)
+    return datetime.datetime.combine(day, SESSION_OPEN, tzinfo=EXCHANGE_TZ).timestamp()
+
+class MarketHoursTTL:
+    """
+    TTL policy that follows the exchange calendar.
+
+    While the market is open, entries live for `open_ttl` seconds. Outside the
+    session nothing changes, so entries live until the next open (capped at
+    `closed_ttl` when given).
+    """
+
+    def __init__(self, open_ttl: float, closed_ttl: Optional[float] = None):
+        self.open_ttl = open_ttl
+        self.closed_ttl = closed_ttl
+
+    def expiry(self, since: Optional[float] = None) -> float:
+        """Epoch seconds at which an entry stored at `since` goes stale."""
+        since = time.time() if since is None else since
+        if is_market_open(since):
+            return since + self.open_ttl
+        until_open = next_market_open(since) - since
+        if self.closed_ttl is not None:
+            until_open = min(until_open, self.closed_ttl)
+        return since + max(until_open, self.open_ttl)
+
+    def __call__(self) -> float:
+        """TTL in seconds for an entry stored now."""
+        now = time.time()
+        return self.expiry(now) - now
+
+    def __repr__(self):
+        return f"MarketHoursTTL(open_ttl={self.open_ttl}, closed_ttl={self.closed_ttl})"
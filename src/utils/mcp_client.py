@@ -1,46 +1,362 @@
+import asyncio
+import contextvars
+import copy
+import importlib
+import importlib.util
 import json
+import os
+import time
+import weakref
+from collections import OrderedDict
+from contextlib import asynccontextmanager, contextmanager
 from fastmcp import Client
+from fastmcp.client.transports import SSETransport
+from fastmcp.exceptions import ToolError
+from src.config import settings
 from src.utils.logging import setup_logging
-from typing import Any
+from src.utils.serialization import from_jsonable
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
 
 logger = setup_logging(__name__)
 
-async def call_mcp_tool(server_path: str, tool_name: str, **kwargs) -> Any:
+# Transports: "inprocess" imports a local server script and calls its FastMCP object
+# directly; "stdio" runs it as a subprocess. URLs always use SSE.
+TRANSPORTS = ("auto", "inprocess", "stdio")
+
+# Imported server modules by resolved path
+_server_modules: Dict[str, Any] = {}
+
+def is_remote(server_path: str) -> bool:
+    return server_path.startswith(("http://", "https://"))
+
+def resolve_transport(server_path: str) -> str:
     """
-    Helper to call a FastMCP server tool via Client (Stdio) or SSE.
+    Transport for a server: "sse" for URLs, otherwise settings.mcp_transport
+    ("auto" picks in-process for local scripts).
     """
-    try:
-        if server_path.startswith("http"):
-            # SSE Mode (Docker/Remote)
-            from mcp.client.sse import sse_client
-            from mcp.client.session import ClientSession
-            
-            async with sse_client(url=server_path) as (read, write):
-                async with ClientSession(read, write) as session:
-                    await session.initialize()
-                    result = await session.call_tool(tool_name, arguments=kwargs)
-                    output = result.content[0].text
-        else:
-            # Stdio Mode (Local Script)
-            # Use Client context manager to connect to the server script
-            async with Client(server_path) as client:
-                result = await client.call_tool(tool_name, kwargs)
-                output = result.content[0].text
-        
-        # Attempt to parse specific stringified outputs
+    if is_remote(server_path):
+        return "sse"
+    mode = settings.mcp_transport.lower()
+    if mode not in TRANSPORTS:
+        raise ValueError(f"Unknown MCP transport '{mode}'. Available: {', '.join(TRANSPORTS)}")
+    return "stdio" if mode == "stdio" else "inprocess"
+
+def load_server(server_path: str):
+    """
+    Import a local server script and return its `mcp` FastMCP object.
+    Scripts inside the working tree are imported under their package name
+    (e.g. src.tools.financial.server) so they share modules and caches with the caller.
+    """
+    path = os.path.realpath(server_path)
+    module = _server_modules.get(path)
+    if module is None:
+        relative = os.path.relpath(path, os.getcwd())
+        try:
+            if relative.startswith(os.pardir):
+                raise ImportError(f"{path} is outside the working tree")
+            module = importlib.import_module(os.path.splitext(relative)[0].replace(os.sep, "."))
+        except ImportError:
+            spec = importlib.util.spec_from_file_location(os.path.splitext(os.path.basename(path))[0], path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+        _server_modules[path] = module
+    return module.mcp
+
+class MCPSessionPool:
+    """
+    Long-lived MCP client sessions keyed by server URL/path.
+
+    Each server gets a single connected `fastmcp.Client` (one stdio subprocess or
+    one SSE connection) that is reused across tool calls, plus a semaphore that
+    bounds the number of concurrent in-flight calls against it.
+    """
+
+    def __init__(self, max_concurrency: int = None, health_check_interval: float = None):
+        self.max_concurrency = max_concurrency or settings.mcp_max_concurrency
+        self.health_check_interval = (
+            settings.mcp_health_check_interval if health_check_interval is None else health_check_interval
+        )
+        self._clients: Dict[str, Client] = {}
+        self._last_used: Dict[str, float] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        # Advertised cache_ttl per tool, fetched once per server
+        self._ttls: Dict[str, Dict[str, float]] = {}
+        # Identical calls currently in flight, keyed by result cache key
+        self.inflight: Dict[str, asyncio.Task] = {}
+
+    def _create_client(self, server_path: str) -> Client:
+        transport = resolve_transport(server_path)
+        if transport == "inprocess":
+            return Client(load_server(server_path))
+        if transport == "sse":
+            # Explicit: Client would infer Streamable HTTP for URLs not ending in /sse
+            return Client(SSETransport(server_path))
+        # Client infers stdio for script paths
+        return Client(server_path)
+
+    async def _connect(self, server_path: str) -> Client:
+        client = self._create_client(server_path)
+        await client.__aenter__()
+        logger.info(f"Opened MCP session ({resolve_transport(server_path)}): {server_path}")
+        return client
+
+    async def _discard(self, server_path: str):
+        client = self._clients.pop(server_path, None)
+        self._last_used.pop(server_path, None)
+        if client is None:
+            return
         try:
-            # First try JSON parsing (standard for MCP)
-            return json.loads(output)
-        except:
+            await client.__aexit__(None, None, None)
+        except Exception as e:
+            logger.debug(f"Error closing MCP session {server_path}: {e}")
+
+    async def _is_healthy(self, server_path: str, client: Client) -> bool:
+        if not client.is_connected():
+            return False
+        idle = time.monotonic() - self._last_used.get(server_path, 0.0)
+        if idle < self.health_check_interval:
+            return True
+        try:
+            return await client.ping()
+        except Exception as e:
+            logger.warning(f"MCP health check failed for {server_path}: {e}")
+            return False
+
+    async def get_client(self, server_path: str) -> Client:
+        """
+        Return a connected client for the server, (re)connecting if needed.
+        """
+        lock = self._locks.setdefault(server_path, asyncio.Lock())
+        async with lock:
+            client = self._clients.get(server_path)
+            if client is not None and not await self._is_healthy(server_path, client):
+                logger.info(f"Reconnecting stale MCP session: {server_path}")
+                await self._discard(server_path)
+                client = None
+            if client is None:
+                client = await self._connect(server_path)
+                self._clients[server_path] = client
+            self._last_used[server_path] = time.monotonic()
+            return client
+
+    @asynccontextmanager
+    async def session(self, server_path: str):
+        """
+        Acquire a pooled client, respecting the per-server concurrency limit.
+        """
+        semaphore = self._semaphores.setdefault(server_path, asyncio.Semaphore(self.max_concurrency))
+        async with semaphore:
+            yield await self.get_client(server_path)
+
+    async def call_tool(self, server_path: str, tool_name: str, arguments: Dict[str, Any]):
+        """
+        Call a tool over the pooled session, reconnecting once on transport failure.
+        """
+        async with self.session(server_path) as client:
+            try:
+                result = await client.call_tool(tool_name, arguments)
+            except ToolError:
+                # The server answered; the tool itself failed
+                raise
+            except Exception as e:
+                logger.warning(f"MCP session error on {server_path}, reconnecting: {e}")
+                async with self._locks[server_path]:
+                    if self._clients.get(server_path) is client:
+                        await self._discard(server_path)
+                client = await self.get_client(server_path)
+                result = await client.call_tool(tool_name, arguments)
+            self._last_used[server_path] = time.monotonic()
+            return result
+
+    async def tool_ttl(self, server_path: str, tool_name: str) -> float:
+        """
+        Seconds a result of the tool may be reused, as advertised in its
+        `cache_ttl` meta (0 if not advertised or the listing fails).
+        """
+        ttls = self._ttls.get(server_path)
+        if ttls is None:
             try:
-                # Fallback to literal_eval (for Python dict reprs)
-                import ast
-                val = ast.literal_eval(output)
-                return val
-            except:
-                # Return raw text if parsing fails
-                return output
-            
+                async with self.session(server_path) as client:
+                    tools = await client.list_tools()
+                ttls = {tool.name: float((tool.meta or {}).get("cache_ttl") or 0) for tool in tools}
+            except Exception as e:
+                logger.warning(f"Could not list tools on {server_path}: {e}")
+                return 0.0
+            self._ttls[server_path] = ttls
+        return ttls.get(tool_name, 0.0)
+
+    async def close(self):
+        """Close every pooled session."""
+        for server_path in list(self._clients):
+            await self._discard(server_path)
+
+# One pool per event loop: sessions and semaphores are bound to the loop they were created on
+_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, MCPSessionPool]" = weakref.WeakKeyDictionary()
+
+def get_session_pool() -> MCPSessionPool:
+    """Return the session pool for the running event loop."""
+    loop = asyncio.get_running_loop()
+    pool = _pools.get(loop)
+    if pool is None:
+        pool = MCPSessionPool()
+        _pools[loop] = pool
+    return pool
+
+async def close_mcp_sessions():
+    """Close all pooled MCP sessions for the running event loop."""
+    pool = _pools.pop(asyncio.get_running_loop(), None)
+    if pool is not None:
+        await pool.close()
+
+class ResultCache:
+    """
+    Bounded LRU of tool results with per-entry expiry, shared across runs.
+    """
+
+    def __init__(self, max_size: int = None):
+        self.max_size = max_size or settings.mcp_result_cache_size
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def set(self, key: str, value: Any, ttl: float):
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+_result_cache = ResultCache()
+# Results memoized for the current research run (see `tool_cache_scope`)
+_run_cache: contextvars.ContextVar[Optional[Dict[str, Any]]] = contextvars.ContextVar("mcp_run_cache", default=None)
+
+@contextmanager
+def tool_cache_scope():
+    """
+    Memoize tool results for the duration of a run: identical calls inside the
+    block (including from concurrent tasks started within it) are made once,
+    regardless of the tool's cache_ttl.
+    """
+    token = _run_cache.set({})
+    try:
+        yield
+    finally:
+        _run_cache.reset(token)
+
+def clear_result_cache():
+    """Drop every result held in the cross-run cache."""
+    _result_cache.clear()
+
+def result_cache_key(server_path: str, tool_name: str, arguments: Dict[str, Any]) -> str:
+    """Server, tool and canonical (key-sorted JSON) arguments."""
+    return f"{server_path}|{tool_name}|{json.dumps(arguments, sort_keys=True, default=str)}"
+
+def _is_error(result: Any) -> bool:
+    """
+    Whether a result reports a failure: an "error" key at the top level or in
+    a wrapped payload such as {"forecast": {"error": ...}}.
+    """
+    if not isinstance(result, dict):
+        return False
+    return "error" in result or any(isinstance(v, dict) and "error" in v for v in result.values())
+
+def parse_tool_result(result) -> Any:
+    """
+    Decode a CallToolResult. Tools that return JSON come back as structured
+    content; plain-text results are parsed as JSON when possible, else returned as text.
+    """
+    if result.structured_content is not None:
+        data = result.data if result.data is not None else result.structured_content
+        return from_jsonable(data)
+
+    output = "".join(getattr(block, "text", "") for block in result.content)
+    try:
+        return from_jsonable(json.loads(output))
+    except ValueError:
+        return output
+
+async def _call(pool: MCPSessionPool, server_path: str, tool_name: str, arguments: Dict[str, Any]) -> Any:
+    try:
+        result = await pool.call_tool(server_path, tool_name, arguments)
+        return parse_tool_result(result)
     except Exception as e:
         logger.error(f"MCP Call Error: {e}")
         return {"error": str(e)}
+
+async def _fetch(pool: MCPSessionPool, server_path: str, tool_name: str, arguments: Dict[str, Any],
+                 key: str, run_cache: Optional[Dict[str, Any]]) -> Any:
+    # The shared request behind coalesced calls; caches the result unless it is an error
+    result = await _call(pool, server_path, tool_name, arguments)
+    if not _is_error(result):
+        if run_cache is not None:
+            run_cache[key] = result
+        ttl = await pool.tool_ttl(server_path, tool_name)
+        if ttl > 0:
+            _result_cache.set(key, result, ttl)
+    return result
+
+async def call_mcp_tool(server_path: str, tool_name: str, **kwargs) -> Any:
+    """
+    Helper to call a FastMCP server tool in-process, via Client (Stdio) or SSE.
+    Sessions are pooled per server and reused across calls.
+    Unless settings.mcp_result_cache is off, results are reused within a
+    `tool_cache_scope` and for the tool's advertised cache_ttl, and concurrent
+    identical calls share one request. Errors are never cached.
+    """
+    pool = get_session_pool()
+    if not settings.mcp_result_cache:
+        return await _call(pool, server_path, tool_name, kwargs)
+
+    key = result_cache_key(server_path, tool_name, kwargs)
+    run_cache = _run_cache.get()
+    if run_cache is not None and key in run_cache:
+        return copy.deepcopy(run_cache[key])
+    hit, value = _result_cache.get(key)
+    if hit:
+        return copy.deepcopy(value)
+
+    task = pool.inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(_fetch(pool, server_path, tool_name, kwargs, key, run_cache))
+        pool.inflight[key] = task
+        task.add_done_callback(lambda _: pool.inflight.pop(key, None))
+    else:
+        logger.debug(f"Joining in-flight MCP call {tool_name}")
+    # Shielded: a caller that is cancelled (e.g. by a timeout) leaves the shared request running
+    return copy.deepcopy(await asyncio.shield(task))
+
+class ToolCall(NamedTuple):
+    """One tool invocation for `call_mcp_tools`."""
+    server_path: str
+    tool_name: str
+    arguments: Dict[str, Any] = {}
+    timeout: Optional[float] = None  # Seconds (default: settings.mcp_call_timeout)
+
+async def call_mcp_tools(calls: List[ToolCall]) -> List[Any]:
+    """
+    Run many tool calls concurrently over the pooled sessions (calls to the same
+    server share its session, bounded by `mcp_max_concurrency`).
+    Results come back in the order of `calls`; a failed or timed-out call yields
+    {"error": ...} in its slot without affecting the others.
+    """
+    async def run(call: ToolCall) -> Any:
+        timeout = call.timeout if call.timeout is not None else settings.mcp_call_timeout
+        try:
+            return await asyncio.wait_for(call_mcp_tool(call.server_path, call.tool_name, **call.arguments), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"MCP call {call.tool_name} timed out after {timeout}s")
+            return {"error": f"{call.tool_name} timed out after {timeout}s"}
+
+    return await asyncio.gather(*(run(ToolCall(*call)) for call in calls))
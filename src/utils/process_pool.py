@@ -0,0 +1,139 @@
+import multiprocessing
+import os
+import signal
+import time
+from collections import deque
+from multiprocessing.connection import wait
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional, Tuple
+from src.utils.logging import setup_logging
+
+logger = setup_logging(__name__)
+
+class TaskTimeout(Exception):
+    """A task ran past its time budget; its worker (and the worker's subprocesses) were killed."""
+
+class TaskError(Exception):
+    """A task raised in its worker; carries the worker-side message."""
+
+# Sent once a worker has started, so imports don't count against the first task's time
+_READY = "ready"
+
+def _worker_main(conn, target: Callable):
+    # Own process group, so a timeout kill also reaches subprocesses the task
+    # started (e.g. the cmdstan binary behind a Prophet fit)
+    if hasattr(os, "setsid"):
+        os.setsid()
+    conn.send(_READY)
+    while True:
+        args = conn.recv()
+        if args is None:
+            break
+        try:
+            conn.send((True, target(*args)))
+        except Exception as e:
+            conn.send((False, str(e) or type(e).__name__))
+
+class _Worker:
+    def __init__(self, context, target: Callable):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child, target), daemon=True)
+        self.process.start()
+        child.close()
+        self.ready = False
+        self.key = None
+        self.timeout = None
+        self.deadline = None
+
+    def submit(self, key: Hashable, args: tuple, timeout: Optional[float]):
+        self.key = key
+        self.timeout = timeout
+        self.deadline = None
+        if self.ready:
+            self.start_clock()
+        self.conn.send(args)
+
+    def start_clock(self):
+        self.ready = True
+        if self.timeout:
+            self.deadline = time.monotonic() + self.timeout
+
+    def kill(self):
+        try:
+            os.killpg(self.process.pid, signal.SIGKILL)
+        except (AttributeError, ProcessLookupError, PermissionError):
+            # No process groups (Windows), or killed before it left the parent's group
+            self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+    def close(self):
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.kill()
+        else:
+            self.conn.close()
+
+def run_tasks(target: Callable, tasks: Dict[Hashable, tuple], max_workers: int, timeout: Optional[float] = None,
+              context=None) -> Iterator[Tuple[Hashable, Any, Optional[Exception]]]:
+    """
+    Run target(*args) for every task on up to `max_workers` worker processes,
+    yielding (key, result, error) as tasks finish; error is a TaskError or
+    TaskTimeout and result is None when it is set.
+
+    Unlike ProcessPoolExecutor, a task that runs past `timeout` seconds (timed
+    from when its worker is up, so start-up imports don't count) is stopped:
+    its worker's whole process group is killed and a fresh worker takes the
+    next task. `target` must be importable by spawned processes.
+    """
+    # Spawned workers don't inherit the parent's threads or open handles
+    context = context or multiprocessing.get_context("spawn")
+    queue = deque(tasks.items())
+    idle, busy = [], []
+    try:
+        while queue or busy:
+            while queue and len(busy) < max_workers:
+                worker = idle.pop() if idle else _Worker(context, target)
+                key, args = queue.popleft()
+                worker.submit(key, args, timeout)
+                busy.append(worker)
+
+            deadlines = [w.deadline for w in busy if w.deadline is not None]
+            wait_for = max(min(deadlines) - time.monotonic(), 0) if deadlines else None
+            ready = set(wait([w.conn for w in busy] + [w.process.sentinel for w in busy], timeout=wait_for))
+
+            now = time.monotonic()
+            for worker in list(busy):
+                if worker.conn in ready or worker.process.sentinel in ready:
+                    try:
+                        message = worker.conn.recv()
+                    except (EOFError, OSError):
+                        message = None
+                    if message == _READY:
+                        worker.start_clock()
+                        continue
+                    busy.remove(worker)
+                    if message is None:
+                        # Died mid-task (e.g. out of memory)
+                        worker.kill()
+                        yield worker.key, None, TaskError(f"Worker exited with code {worker.process.exitcode}")
+                        continue
+                    ok, value = message
+                    if worker.process.is_alive():
+                        idle.append(worker)
+                    else:
+                        worker.kill()
+                    yield (worker.key, value, None) if ok else (worker.key, None, TaskError(value))
+                elif worker.deadline is not None and worker.deadline <= now:
+                    busy.remove(worker)
+                    logger.warning(f"Task {worker.key} exceeded {timeout:g}s; killing its worker")
+                    worker.kill()
+                    yield worker.key, None, TaskTimeout(f"Exceeded the {timeout:g}s time limit")
+    finally:
+        for worker in busy:
+            worker.kill()
+        for worker in idle:
+            worker.close()
@@ -0,0 +1,97 @@
+import base64
+import datetime
+import decimal
+import math
+import zlib
+import numpy as np
+import pandas as pd
+from typing import Any, Optional
+from src.config import settings
+
+# Marker key for arrays shipped as compressed binary
+NDARRAY_TAG = "__ndarray__"
+
+def encode_array(arr: np.ndarray) -> dict:
+    """Pack a numeric array as zlib-compressed, base64-encoded bytes."""
+    arr = np.ascontiguousarray(arr)
+    return {
+        NDARRAY_TAG: base64.b64encode(zlib.compress(arr.tobytes())).decode("ascii"),
+        "dtype": arr.dtype.str,
+        "shape": list(arr.shape),
+    }
+
+def decode_array(obj: dict) -> np.ndarray:
+    """Inverse of `encode_array`."""
+    raw = zlib.decompress(base64.b64decode(obj[NDARRAY_TAG]))
+    return np.frombuffer(raw, dtype=np.dtype(obj["dtype"])).reshape(obj["shape"])
+
+def _timestamp(value) -> str:
+    # Dates stay short; anything with a time of day keeps it
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is None and value.time() == datetime.time(0):
+            return value.strftime('%Y-%m-%d')
+        return value.isoformat()
+    return value.isoformat()
+
+def _key(key) -> str:
+    if isinstance(key, str):
+        return key
+    if isinstance(key, (datetime.date, np.datetime64)):
+        return _timestamp(pd.Timestamp(key))
+    return str(key)
+
+def to_jsonable(obj: Any, binary_threshold: Optional[int] = None) -> Any:
+    """
+    Convert a tool result to JSON-native types: numpy scalars become Python
+    numbers, NaN/inf and missing values become None, dates become ISO strings,
+    pandas objects become dicts/lists.
+    :param binary_threshold: Encode numeric arrays with at least this many elements
+        with `encode_array` instead of as lists (None: never)
+    """
+    if obj is None or isinstance(obj, (str, bool)):
+        return obj
+    if isinstance(obj, dict):
+        return {_key(k): to_jsonable(v, binary_threshold) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple, set)):
+        return [to_jsonable(v, binary_threshold) for v in obj]
+    if isinstance(obj, np.bool_):
+        return bool(obj)
+    if isinstance(obj, (int, np.integer)):
+        return int(obj)
+    if isinstance(obj, (float, np.floating, decimal.Decimal)):
+        value = float(obj)
+        return value if math.isfinite(value) else None
+    if obj is pd.NaT or obj is pd.NA:
+        return None
+    if isinstance(obj, np.ndarray):
+        if binary_threshold is not None and obj.dtype.kind in "biuf" and obj.size >= binary_threshold:
+            return encode_array(obj)
+        return to_jsonable(obj.tolist(), binary_threshold)
+    if isinstance(obj, pd.DataFrame):
+        return to_jsonable(obj.to_dict(), binary_threshold)
+    if isinstance(obj, pd.Series):
+        return to_jsonable(obj.to_dict(), binary_threshold)
+    if isinstance(obj, np.datetime64):
+        return to_jsonable(pd.Timestamp(obj))
+    if isinstance(obj, (datetime.date, datetime.time)):
+        return _timestamp(obj)
+    if isinstance(obj, (datetime.timedelta, np.timedelta64)):
+        return pd.Timedelta(obj).total_seconds()
+    return str(obj)
+
+def from_jsonable(obj: Any) -> Any:
+    """Decode binary-encoded arrays in a result produced by `to_jsonable`."""
+    if isinstance(obj, dict):
+        if NDARRAY_TAG in obj:
+            return decode_array(obj)
+        return {k: from_jsonable(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [from_jsonable(v) for v in obj]
+    return obj
+
+def tool_result(obj: Any) -> Any:
+    """
+    Normalize a tool's return value for MCP. Large numeric arrays are sent as
+    compressed binary when settings.mcp_binary_threshold is set.
+    """
+    return to_jsonable(obj, binary_threshold=settings.mcp_binary_threshold or None)
@@ -0,0 +1,17 @@
+import pytest
+from unittest.mock import patch
+from diskcache import Cache
+from src.utils import cache as cache_module
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path_factory):
+    """
+    Point disk_cache at a throwaway directory so tests never read or write data/cache.
+    Cache keys are stable across processes, so a shared cache would leak results between runs.
+    """
+    cache = Cache(str(tmp_path_factory.mktemp("cache")))
+    cache_module._memory.clear()
+    with patch.object(cache_module, '_cache', cache):
+        yield cache
+    cache_module._memory.clear()
+    cache.close()
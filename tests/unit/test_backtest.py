@@ -0,0 +1,54 @@
+import pytest
+import pandas as pd
+import numpy as np
+from unittest.mock import patch
+from src.tools.forecast.backtest import ForecastBacktester, score_fold, walk_forward_cutoffs
+
+@pytest.fixture
+def bars():
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range('2021-01-04', periods=400, name='Date')
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0005, 0.01, 400)))
+    return pd.DataFrame({"Close": close}, index=dates)
+
+def test_walk_forward_cutoffs():
+    cutoffs = walk_forward_cutoffs(n_bars=400, horizon=20, n_folds=4, min_train=252)
+    assert len(cutoffs) == 4
+    assert cutoffs[-1] == 400 - 20 - 1
+    assert cutoffs[0] >= 251
+    assert walk_forward_cutoffs(n_bars=100, horizon=20, n_folds=4, min_train=252) == []
+
+def test_score_fold():
+    dates = pd.bdate_range('2024-01-01', periods=2)
+    forecast = pd.DataFrame({'ds': dates, 'yhat': [110.0, 110.0], 'yhat_lower': [100.0, 100.0], 'yhat_upper': [120.0, 105.0]})
+    scores = score_fold(forecast, pd.Series([100.0, 110.0], index=dates), last_close=105.0)
+    assert scores["mape"] == pytest.approx(5.0)
+    assert scores["coverage"] == 0.5
+    assert scores["direction_hit"] == 1.0
+
+def test_backtest_drift(bars):
+    with patch('src.tools.forecast.backtest.YahooFinanceTool') as mock_yf:
+        mock_yf.return_value.get_price_frames_many.return_value = ({"AAPL": bars, "NEW": bars.iloc[:50]}, {})
+        report = ForecastBacktester().run(["AAPL", "NEW"], backends=["drift"], horizon=10, n_folds=3, max_workers=1)
+
+    summary = report["summary"]["drift"]
+    assert summary["folds"] == 3
+    assert 0 <= summary["coverage"] <= 1
+    assert summary["mape"] > 0
+    assert "NEW" in report["errors"]
+    assert {row["ticker"] for row in report["folds"]} == {"AAPL"}
+
+def test_backtest_progress_counts_failed_folds_and_skips_pool_for_drift(bars):
+    seen = []
+    # The first fold fails to score
+    with patch('src.tools.forecast.backtest.YahooFinanceTool') as mock_yf, \
+         patch('src.tools.forecast.backtest.ProcessPoolExecutor') as pool, \
+         patch('src.tools.forecast.backtest.score_fold', side_effect=[ValueError("bad fold"), *[{"mape": 1.0, "coverage": 1.0, "direction_hit": 1.0}] * 3]):
+        mock_yf.return_value.get_price_frames_many.return_value = ({"AAPL": bars}, {})
+        report = ForecastBacktester().run(["AAPL"], backends=["drift"], horizon=10, n_folds=4,
+                                          progress=lambda done, total: seen.append((done, total)))
+
+    pool.assert_not_called()
+    assert seen[-1] == (4, 4)
+    assert report["errors"]["AAPL"] == "bad fold"
+    assert report["summary"]["drift"]["folds"] == 3
@@ -0,0 +1,274 @@
+import threading
+import time
+import pytest
+from unittest.mock import patch
+from src.utils import cache as cache_module
+from src.utils.cache import disk_cache
+
+@pytest.fixture
+def tmp_cache(isolated_cache):
+    return isolated_cache
+
+# --- Single-Flight Tests ---
+def test_concurrent_misses_call_once(tmp_cache):
+    calls = []
+
+    @disk_cache(expire=60)
+    def slow_lookup(ticker):
+        calls.append(ticker)
+        time.sleep(0.2)
+        return {"ticker": ticker}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(slow_lookup("AAPL"))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert calls == ["AAPL"]
+    assert results == [{"ticker": "AAPL"}] * 5
+
+def test_waits_for_other_process_lease(tmp_cache):
+    calls = []
+
+    @disk_cache(expire=60)
+    def lookup(ticker):
+        calls.append(ticker)
+        return "computed here"
+
+    key = lookup.cache_key("MSFT")
+    # Simulate another process holding the lease and finishing shortly after
+    tmp_cache.add(f"{key}::lease", -1, expire=60)
+    entry = cache_module.CacheEntry("computed elsewhere", time.time() + 60)
+    threading.Timer(0.2, lambda: tmp_cache.set(key, entry)).start()
+
+    assert lookup("MSFT") == "computed elsewhere"
+    assert calls == []
+
+def test_expired_owner_keeps_successors_lease(tmp_cache):
+    @disk_cache(expire=60)
+    def fit(ticker):
+        # Outlives its lease; another process takes the key over meanwhile
+        tmp_cache.set(lease_key, "other-owner", expire=60)
+        return "fitted"
+
+    lease_key = f"{fit.cache_key('TSLA')}::lease"
+    assert fit("TSLA") == "fitted"
+    assert tmp_cache.get(lease_key) == "other-owner"
+
+def test_failures_not_cached(tmp_cache):
+    attempts = []
+
+    @disk_cache(expire=60)
+    def flaky(ticker):
+        attempts.append(ticker)
+        if len(attempts) == 1:
+            raise ConnectionError("boom")
+        return "ok"
+
+    with pytest.raises(ConnectionError):
+        flaky("NVDA")
+    assert flaky("NVDA") == "ok"
+    assert len(attempts) == 2
+
+# --- Memory Tier Tests ---
+def test_memory_tier_serves_without_disk(tmp_cache):
+    @disk_cache(expire=60)
+    def info(ticker):
+        return {"symbol": ticker}
+
+    first = info("AAPL")
+    with patch.object(tmp_cache, 'get', side_effect=AssertionError("disk read")):
+        assert info("AAPL") is first
+
+def test_memory_tier_budgets_are_per_namespace():
+    tier = cache_module.MemoryTier(default_budget=10_000)
+    tier.configure("prices", 2_000)
+    tier.configure("fundamentals")
+
+    tier.set("fundamentals", "AAPL", {"pe": 30})
+    for i in range(10):
+        tier.set("prices", f"P{i}", "x" * 500)
+
+    # Prices evicted their own oldest entries but never touched fundamentals
+    assert tier.get("prices", "P0") is cache_module._MISSING
+    assert tier.get("prices", "P9") == "x" * 500
+    assert tier.get("fundamentals", "AAPL") == {"pe": 30}
+
+def test_memory_tier_respects_expiry():
+    tier = cache_module.MemoryTier(default_budget=10_000)
+    tier.set("ns", "k", "v", expire_at=time.time() - 1)
+    assert tier.get("ns", "k") is cache_module._MISSING
+
+# --- Stale-While-Revalidate Tests ---
+def test_stale_value_served_while_refreshing(tmp_cache):
+    calls = []
+    refreshed = threading.Event()
+
+    @disk_cache(expire=0.1, stale_ttl=60)
+    def quote(ticker):
+        calls.append(ticker)
+        if len(calls) > 1:
+            refreshed.set()
+        return len(calls)
+
+    assert quote("AAPL") == 1
+    time.sleep(0.15)
+
+    # Expired but within the stale window: old value returned immediately
+    assert quote("AAPL") == 1
+    assert refreshed.wait(timeout=5)
+    time.sleep(0.05)
+    assert quote("AAPL") == 2
+
+# --- Market Calendar Tests ---
+def test_market_hours_ttl():
+    from datetime import datetime
+    from src.utils.market_calendar import EXCHANGE_TZ, MarketHoursTTL, is_market_open
+
+    policy = MarketHoursTTL(open_ttl=900)
+    tuesday_noon = datetime(2024, 6, 11, 12, 0, tzinfo=EXCHANGE_TZ).timestamp()
+    saturday = datetime(2024, 6, 15, 12, 0, tzinfo=EXCHANGE_TZ).timestamp()
+    monday_open = datetime(2024, 6, 17, 9, 30, tzinfo=EXCHANGE_TZ).timestamp()
+    thanksgiving = datetime(2024, 11, 28, 12, 0, tzinfo=EXCHANGE_TZ).timestamp()
+
+    assert is_market_open(tuesday_noon)
+    assert not is_market_open(saturday)
+    assert not is_market_open(thanksgiving)
+    assert policy.expiry(tuesday_noon) == tuesday_noon + 900
+    assert policy.expiry(saturday) == monday_open
+    assert MarketHoursTTL(open_ttl=900, closed_ttl=3600).expiry(saturday) == saturday + 3600
+
+# --- Key Tests ---
+class Analyzer:
+    @disk_cache(expire=60)
+    def analyze(self, ticker, period="1y"):
+        return ticker
+
+def test_cache_keys_are_canonical():
+    key = Analyzer.analyze.cache_key
+    a, b = Analyzer(), Analyzer()
+    # Instance identity, ticker case and positional/keyword form don't matter
+    assert key(a, "aapl") == key(b, "AAPL") == key(a, ticker="AAPL", period="1y")
+    assert key(a, "AAPL") != key(a, "AAPL", period="2y")
+    assert ":AAPL:" in key(a, "AAPL")
+
+def test_cache_key_versioning():
+    @disk_cache(expire=60)
+    def lookup(ticker):
+        return ticker
+
+    @disk_cache(expire=60, version="2")
+    def lookup_v2(ticker):
+        return ticker
+
+    assert lookup.cache_prefix.endswith(f"@{cache_module.function_version(lookup)}")
+    assert lookup_v2.cache_prefix.endswith("@2")
+
+# --- Observability Tests ---
+def test_stats_count_hits_and_misses(tmp_cache):
+    cache_module._stats.reset()
+
+    @disk_cache(expire=60)
+    def quote(ticker):
+        time.sleep(0.01)
+        return ticker
+
+    quote("AAPL")
+    quote("AAPL")
+    cache_module._memory.clear()
+    quote("AAPL")
+
+    row = cache_module.get_cache_stats()[quote.cache_prefix.split("@")[0]]
+    assert (row["misses"], row["hits_memory"], row["hits_disk"]) == (1, 1, 1)
+    assert row["bytes_stored"] > 0
+    assert row["saved_seconds"] >= 2 * 0.01
+
+    # Counters are shared with other processes through the disk cache
+    persisted = cache_module.get_cache_stats(all_processes=True)
+    assert persisted[quote.cache_prefix.split("@")[0]]["misses"] == 1
+
+def test_list_and_invalidate_entries(tmp_cache):
+    @disk_cache(expire=60)
+    def quote(ticker):
+        return ticker
+
+    @disk_cache(expire=60)
+    def profile(ticker):
+        return ticker
+
+    for ticker in ["AAPL", "MSFT"]:
+        quote(ticker)
+        profile(ticker)
+
+    assert len(cache_module.list_entries()) == 4
+    assert cache_module.invalidate(ticker="aapl") == 2
+    assert cache_module.invalidate(function="profile") == 1
+    assert [e["key"] for e in cache_module.list_entries()] == [quote.cache_key("MSFT")]
+
+def test_invalidation_reaches_other_processes_memory_tier(tmp_cache, monkeypatch):
+    from src.config import settings
+    monkeypatch.setattr(settings, "cache_generation_check_interval", 0)
+    calls = []
+
+    @disk_cache(expire=60)
+    def quote(ticker):
+        calls.append(ticker)
+        return ticker
+
+    quote("AAPL")
+    quote("AAPL")
+    assert calls == ["AAPL"]
+
+    # Another process (e.g. the cache CLI) deletes the entry and bumps the generation
+    tmp_cache.delete(quote.cache_key("AAPL"))
+    tmp_cache.set(cache_module.GENERATION_KEY, "other-process")
+    quote("AAPL")
+    assert calls == ["AAPL", "AAPL"]
+
+def test_prometheus_rendering(tmp_cache):
+    from src.utils.cache_metrics import render_prometheus
+
+    @disk_cache(expire=60)
+    def quote(ticker):
+        return ticker
+
+    quote("AAPL")
+    text = render_prometheus()
+    assert "# TYPE quantmind_cache_misses_total counter" in text
+    assert "quantmind_cache_entries " in text
+    assert "# TYPE quantmind_cache_disk_evictions_total counter" in text
+
+def test_metrics_route_runs_off_event_loop(tmp_cache):
+    import asyncio
+    from src.utils.cache_metrics import register_metrics_route
+
+    routes = {}
+    class FakeMCP:
+        def custom_route(self, path, methods):
+            return lambda handler: routes.setdefault(path, handler)
+
+    register_metrics_route(FakeMCP())
+    with patch('src.utils.cache_metrics.asyncio.to_thread', wraps=asyncio.to_thread) as to_thread:
+        response = asyncio.run(routes["/metrics"](None))
+    to_thread.assert_called_once()
+    assert b"quantmind_cache_entries" in response.body
+
+def test_disk_evictions_counted(tmp_path, monkeypatch):
+    from diskcache import Cache
+    cache_module._stats.reset()
+    # Tiny size limit: every set past the first few culls older entries
+    small = Cache(str(tmp_path / "small"), size_limit=1, cull_limit=10, disk_min_file_size=1 << 20)
+    monkeypatch.setattr(cache_module, '_cache', small)
+
+    @disk_cache(expire=60, memory_budget=0)
+    def blob(i):
+        return "x" * 10_000
+
+    for i in range(30):
+        blob(i)
+    row = cache_module.get_cache_stats()[blob.cache_prefix.split("@")[0]]
+    assert row["disk_evictions"] > 0
+    assert row["disk_evictions"] + cache_module.disk_usage()["entries"] >= 30
+    assert row["memory_evictions"] == 0
@@ -2,7 +2,7 @@ import pytest
 import pandas as pd
 import numpy as np
 from unittest.mock import MagicMock, patch
-from src.tools.forecast.prophet_forecast import ProphetTool
+from src.tools.forecast.prophet_forecast import ProphetTool, expand_forecast
 from src.tools.forecast.technical_indicators import TechnicalAnalysis
 from src.utils.cache import disk_cache
 
@@ -27,35 +27,32 @@ def mock_yf_tech():
 @pytest.fixture
 def sample_price_history():
     # Create 200+ days of data
-    dates = pd.date_range(start='2023-01-01', periods=250, freq='D')
+    dates = pd.date_range(start='2023-01-01', periods=250, freq='D', name='Date')
     prices = np.linspace(100, 200, 250) # Linear trend
-    return [
-        {"Date": d.strftime('%Y-%m-%d'), "Close": p} 
-        for d, p in zip(dates, prices)
-    ]
+    return pd.DataFrame({"Close": prices}, index=dates)
 
 # --- Prophet Tests ---
 def test_prophet_forecast(mock_yf, sample_price_history):
     tool = ProphetTool()
-    tool.yf_tool.get_price_history.return_value = sample_price_history
+    tool.yf_tool.get_price_frame.return_value = sample_price_history
     
     # Mock Prophet to avoid slow fitting in unit tests?
     # Actually, fitting on 250 points is fast enough for unit test usually (<1s)
     # But for strict unit testing we might want to mock Prophet.
     # Let's run real Prophet for integration-like verification of the flow.
     
-    result = tool.forecast_price("AAPL", periods=5)
+    result = tool.forecast_price("AAPL", periods=5, backend="prophet")
     
     assert "error" not in result
     assert result['ticker'] == "AAPL"
     assert result['trend'] in ["bullish", "bearish", "neutral"]
-    assert len(result['forecast_data']) == 5
+    assert len(result['forecast_data']['yhat']) == 5
     assert result['forecast_price_30d'] > 0
 
 # --- Technical Analysis Tests ---
 def test_tech_indicators(mock_yf_tech, sample_price_history):
     tool = TechnicalAnalysis()
-    tool.yf_tool.get_price_history.return_value = sample_price_history
+    tool.yf_tool.get_price_frame.return_value = sample_price_history
     
     indicators = tool.calculate_indicators("AAPL")
     
@@ -70,3 +67,124 @@ def test_tech_indicators(mock_yf_tech, sample_price_history):
     # But verifying keys exist is main goal.
     assert 'volatility_annualized_pct' in indicators
     assert 'bb_upper' in indicators
+
+# --- Batch Forecast Tests ---
+def test_forecast_many_orders_results_and_reports_progress(mock_yf):
+    tool = ProphetTool()
+    tool.yf_tool.sync_price_history_many.return_value = {"BAD": "No price data available"}
+    seen = []
+
+    def fake_forecast(self, ticker, periods=30, backend=None, summary_only=False):
+        if ticker == "MSFT":
+            return {"error": "Insufficient data for forecasting"}
+        return {"ticker": ticker, "periods": periods}
+
+    with patch.object(ProphetTool, 'forecast_price', fake_forecast):
+        result = tool.forecast_many(["NVDA", "BAD", "MSFT", "AAPL"], periods=5, max_workers=1,
+                                    progress=lambda done, total, ticker: seen.append((done, total)))
+
+    assert list(result["results"]) == ["NVDA", "AAPL"]
+    assert result["results"]["AAPL"] == {"ticker": "AAPL", "periods": 5}
+    assert result["errors"] == {"BAD": "No price data available", "MSFT": "Insufficient data for forecasting"}
+    assert seen[-1] == (4, 4)
+
+def fake_forecast_worker(ticker, periods, backend, summary_only):
+    # Module level so spawned workers can import it
+    import time
+    if ticker == "HUNG":
+        time.sleep(60)
+    return {"ticker": ticker}
+
+def test_forecast_many_times_out_off_main_thread(mock_yf):
+    # As the forecast_price_many MCP tool runs it, via asyncio.to_thread
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    tool = ProphetTool()
+    tool.yf_tool.sync_price_history_many.return_value = {}
+
+    with patch('src.tools.forecast.prophet_forecast._forecast_worker', fake_forecast_worker), \
+         ThreadPoolExecutor(1) as executor:
+        started = time.perf_counter()
+        result = executor.submit(tool.forecast_many, ["HUNG", "AAPL"], backend="prophet",
+                                 max_workers=1, timeout=1).result()
+
+    # The hung fit is killed rather than waited for; the next ticker gets a fresh worker
+    assert time.perf_counter() - started < 30
+    assert "time limit" in result["errors"]["HUNG"]
+    assert result["results"]["AAPL"] == {"ticker": "AAPL"}
+
+# --- Warm Start Tests ---
+def test_prophet_reuses_and_warm_starts_fits(mock_yf, sample_price_history):
+    from prophet import Prophet
+    # Bypass the result cache so every call reaches the model
+    forecast = ProphetTool._forecast_price.__wrapped__
+    tool = ProphetTool()
+    tool.yf_tool.get_price_frame.return_value = sample_price_history.iloc[:-1]
+    first = forecast(tool, "AAPL", periods=5, backend="prophet", summary_only=False)
+
+    with patch.object(Prophet, 'fit', autospec=True, side_effect=Prophet.fit) as fit:
+        # No new bars: the stored model is reused without fitting
+        again = forecast(tool, "AAPL", periods=5, backend="prophet", summary_only=False)
+        assert fit.call_count == 0
+        assert again['forecast_data']['start'] == first['forecast_data']['start']
+
+        # A new bar triggers a refit seeded from the stored parameters
+        tool.yf_tool.get_price_frame.return_value = sample_price_history
+        result = forecast(tool, "AAPL", periods=5, backend="prophet", summary_only=False)
+        assert fit.call_count == 1
+        assert set(fit.call_args.kwargs['init']) == {'k', 'm', 'sigma_obs', 'delta', 'beta'}
+
+    assert pd.Timestamp(result['forecast_data']['start']) == sample_price_history.index[-1] + pd.Timedelta(days=1)
+
+# --- Drift Backend Tests ---
+def test_drift_forecast_is_default(mock_yf, sample_price_history):
+    tool = ProphetTool()
+    tool.yf_tool.get_price_frame.return_value = sample_price_history
+
+    result = tool.forecast_price("AAPL", periods=5)
+
+    assert result['model'] == "drift"
+    assert result['change_pct'] > 0
+    data = result['forecast_data']
+    assert data['freq'] == "D" and len(data['yhat']) == 5
+    assert all(isinstance(v, float) for v in data['yhat'])
+    first = expand_forecast(data).iloc[0]
+    assert first['ds'] == sample_price_history.index[-1] + pd.Timedelta(days=1)
+    assert first['yhat_lower'] <= first['yhat'] <= first['yhat_upper']
+
+    summary = ProphetTool._forecast_price.__wrapped__(tool, "AAPL", periods=5, backend="drift", summary_only=True)
+    assert "forecast_data" not in summary
+    assert summary['forecast_price_30d'] == result['forecast_price_30d']
+    assert result['forecast_lower'] < result['forecast_price_30d'] < result['forecast_upper']
+
+def test_drift_bands_flat_over_weekends():
+    from src.tools.forecast.forecasters import DriftForecaster
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range(end='2024-06-14', periods=300)  # Ends on a Friday
+    close = pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.01, 300))), index=dates)
+
+    forecast = DriftForecaster().forecast("AAPL", close, periods=3)
+    # Saturday and Sunday add no trading days; Monday does
+    assert forecast['yhat'].iloc[0] == forecast['yhat'].iloc[1]
+    assert forecast['yhat_upper'].iloc[2] > forecast['yhat_upper'].iloc[1]
+
+def test_default_backend_shares_cache_entry(mock_yf, sample_price_history, monkeypatch):
+    from src.config import settings
+    tool = ProphetTool()
+    tool.yf_tool.get_price_frame.return_value = sample_price_history
+    from src.utils import cache as cache_module
+    monkeypatch.setattr(settings, "forecast_backend", "drift")
+    tool.forecast_price("AAPL", periods=5)
+    key = ProphetTool._forecast_price.cache_key(tool, "AAPL", periods=5, backend="drift", summary_only=False)
+    assert key in cache_module._cache
+
+    # A changed default resolves to the new backend's entry, not the old one
+    monkeypatch.setattr(settings, "forecast_backend", "prophet")
+    with patch('src.tools.forecast.prophet_forecast.get_forecaster', side_effect=ValueError("switched")) as get:
+        assert tool.forecast_price("AAPL", periods=5) == {"error": "switched"}
+    get.assert_called_once_with("prophet")
+
+def test_unknown_backend(mock_yf, sample_price_history):
+    tool = ProphetTool()
+    tool.yf_tool.get_price_frame.return_value = sample_price_history
+    assert "Unknown forecast backend" in tool.forecast_price("AAPL", backend="nope")["error"]
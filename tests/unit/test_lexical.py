@@ -0,0 +1,98 @@
+import os
+import threading
+import pytest
+from src.rag.lexical import BM25Index, tokenize
+
+@pytest.fixture
+def index(tmp_path):
+    index = BM25Index.load(str(tmp_path / "bm25.pkl"))
+    index.add(
+        ["a", "b", "c"],
+        ["Item 1A. Risk Factors: goodwill impairment may occur.",
+         "Revenue grew on strong iPhone demand.",
+         "Goodwill is tested annually; no goodwill impairment was recorded."],
+        [{"ticker": "AAPL"}, {"ticker": "AAPL"}, {"ticker": "MSFT"}],
+    )
+    return index
+
+def test_tokenize_keeps_exact_terms():
+    assert tokenize("Item 1A. CUSIP 037833100 for AAPL") == ["item", "1a", "cusip", "037833100", "aapl"]
+
+def test_search_ranks_by_bm25(index):
+    results = index.search("goodwill impairment", n_results=5)
+    # Repeated term ranks higher; documents without any query term are excluded
+    assert [r["id"] for r in results] == ["c", "a"]
+    assert results[0]["bm25"] > results[1]["bm25"] > 0
+    assert index.search("item 1a")[0]["id"] == "a"
+    assert index.search("unknownterm") == []
+
+def test_search_filters_and_persists(index, tmp_path):
+    assert [r["id"] for r in index.search("goodwill", where={"ticker": "AAPL"})] == ["a"]
+
+    index.save()
+    reloaded = BM25Index.load(str(tmp_path / "bm25.pkl"))
+    assert len(reloaded) == 3
+    # Known IDs are skipped; new ones are searchable alongside the loaded postings
+    assert reloaded.add(["a", "d"], ["dup", "Goodwill goodwill goodwill impairment"], [{}, {}]) == 1
+    assert reloaded.search("goodwill", n_results=1)[0]["id"] == "d"
+
+def test_search_reads_only_query_term_postings():
+    # Cost scales with the query terms' postings, not the vocabulary or corpus text
+    class CountingPostings(dict):
+        def __init__(self, *args):
+            super().__init__(*args)
+            self.read = []
+
+        def __getitem__(self, term):
+            self.read.append(term)
+            return super().__getitem__(term)
+
+    index = BM25Index()
+    words = [f"term{i}" for i in range(5000)]
+    index.add([str(i) for i in range(2000)],
+              [" ".join(words[(i * 7 + j) % 5000] for j in range(100)) for i in range(2000)],
+              [{"ticker": "T"}] * 2000)
+    index.search("term1")  # Merges pending postings into arrays
+    index._postings = CountingPostings(index._postings)
+
+    results = index.search("term1 term2 term300 missing", n_results=20, where={"ticker": "T"})
+    assert sorted(index._postings.read) == ["term1", "term2", "term300"]
+    assert len(results) == 20
+
+def test_concurrent_saves_keep_every_writer_adds(tmp_path):
+    # Two ingesting processes open the same file; neither loses the other's chunks
+    path = str(tmp_path / "bm25.pkl")
+    first, second = BM25Index.load(path), BM25Index.load(path)
+    first.add(["a"], ["goodwill impairment"], [{}])
+    first.save()
+    second.add(["b"], ["iphone revenue"], [{}])
+    second.save()
+
+    assert sorted(BM25Index.load(path).ids) == ["a", "b"]
+    assert second.search("goodwill")[0]["id"] == "a"
+    # A reader picks up the other writer's save on refresh
+    first.refresh()
+    assert first.search("iphone")[0]["id"] == "b"
+    assert not [p for p in os.listdir(tmp_path) if p.endswith(".tmp")]
+
+def test_searches_from_threads_while_adding():
+    index = BM25Index()
+    errors = []
+
+    def search():
+        try:
+            for _ in range(200):
+                index.search("goodwill", n_results=3)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=search) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for i in range(300):
+        index.add([str(i)], [f"goodwill note {i}"], [{}])
+    for t in threads:
+        t.join()
+
+    assert not errors
+    assert len(index.search("goodwill", n_results=500)) == 300
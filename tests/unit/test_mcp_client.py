@@ -0,0 +1,255 @@
+import asyncio
+import pytest
+from fastmcp import Client, FastMCP
+from src.utils.mcp_client import MCPSessionPool
+
+@pytest.fixture
+def server():
+    mcp = FastMCP("test-server")
+
+    @mcp.tool()
+    async def echo(text: str) -> dict:
+        await asyncio.sleep(0.05)
+        return {"text": text}
+
+    return mcp
+
+class CountingPool(MCPSessionPool):
+    """Pool that connects to in-memory servers and counts new sessions."""
+    def __init__(self, servers, **kwargs):
+        super().__init__(**kwargs)
+        self.servers = servers
+        self.connects = 0
+
+    def _create_client(self, server_path):
+        self.connects += 1
+        return Client(self.servers[server_path])
+
+# --- Session Pool Tests ---
+@pytest.mark.asyncio
+async def test_pool_reuses_session(server):
+    pool = CountingPool({"echo": server})
+    try:
+        for i in range(3):
+            result = await pool.call_tool("echo", "echo", {"text": str(i)})
+            assert result.data == {"text": str(i)}
+        assert pool.connects == 1
+    finally:
+        await pool.close()
+
+@pytest.mark.asyncio
+async def test_pool_bounds_concurrency(server):
+    pool = CountingPool({"echo": server}, max_concurrency=2)
+    in_flight = 0
+    peak = 0
+    original = pool.get_client
+
+    async def tracking_get_client(server_path):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        client = await original(server_path)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return client
+
+    pool.get_client = tracking_get_client
+    try:
+        await asyncio.gather(*[pool.call_tool("echo", "echo", {"text": "x"}) for _ in range(6)])
+        assert peak <= 2
+    finally:
+        await pool.close()
+
+@pytest.mark.asyncio
+async def test_pool_reconnects_dead_session(server):
+    pool = CountingPool({"echo": server})
+    try:
+        await pool.call_tool("echo", "echo", {"text": "a"})
+        # Simulate a dropped connection
+        await pool._clients["echo"].__aexit__(None, None, None)
+        result = await pool.call_tool("echo", "echo", {"text": "b"})
+        assert result.data == {"text": "b"}
+        assert pool.connects == 2
+    finally:
+        await pool.close()
+
+# --- Result Parsing Tests ---
+@pytest.mark.asyncio
+async def test_structured_results_parsed():
+    import numpy as np
+    from src.utils.mcp_client import parse_tool_result
+    from src.utils.serialization import to_jsonable
+
+    mcp = FastMCP("typed")
+
+    @mcp.tool()
+    def quote() -> dict:
+        return to_jsonable({"price": np.float64(1.5), "series": np.arange(200.0)}, binary_threshold=100)
+
+    @mcp.tool()
+    def text() -> str:
+        return "plain text"
+
+    pool = CountingPool({"typed": mcp})
+    try:
+        result = parse_tool_result(await pool.call_tool("typed", "quote", {}))
+        assert result["price"] == 1.5
+        assert isinstance(result["series"], np.ndarray) and result["series"][-1] == 199.0
+        assert parse_tool_result(await pool.call_tool("typed", "text", {})) == "plain text"
+    finally:
+        await pool.close()
+
+# --- Fan-out Tests ---
+@pytest.mark.asyncio
+async def test_call_mcp_tools_concurrent_ordered_with_timeouts(server, monkeypatch):
+    import time
+    from src.utils import mcp_client
+    from src.utils.mcp_client import ToolCall, call_mcp_tools
+
+    @server.tool()
+    async def slow() -> dict:
+        await asyncio.sleep(5)
+        return {}
+
+    pool = CountingPool({"echo": server}, max_concurrency=8)
+    monkeypatch.setattr(mcp_client, "get_session_pool", lambda: pool)
+    try:
+        started = time.perf_counter()
+        results = await call_mcp_tools(
+            [ToolCall("echo", "echo", {"text": str(i)}) for i in range(4)]
+            + [ToolCall("echo", "slow", timeout=0.2), ToolCall("echo", "missing")]
+        )
+        # Four 50ms calls plus a 200ms timeout overlap instead of adding up
+        assert time.perf_counter() - started < 1.0
+        assert results[:4] == [{"text": str(i)} for i in range(4)]
+        assert "timed out" in results[4]["error"]
+        assert "error" in results[5]
+    finally:
+        await pool.close()
+
+# --- Transport Tests ---
+def test_transport_selection(monkeypatch):
+    from fastmcp.client.transports import FastMCPTransport, PythonStdioTransport, SSETransport
+    from src.config import settings
+    from src.utils.mcp_client import resolve_transport
+
+    pool = MCPSessionPool()
+    path = "src/mcp_servers/template.py"
+    assert resolve_transport("http://localhost:8000/sse") == "sse"
+    assert isinstance(pool._create_client(path).transport, FastMCPTransport)
+    # URLs use SSE even without an /sse suffix (Client alone would pick Streamable HTTP)
+    assert isinstance(pool._create_client("http://localhost:8000").transport, SSETransport)
+
+    monkeypatch.setattr(settings, "mcp_transport", "stdio")
+    assert isinstance(pool._create_client(path).transport, PythonStdioTransport)
+
+@pytest.mark.asyncio
+async def test_in_process_call():
+    from src.utils.mcp_client import load_server
+    from src.mcp_servers.template import mcp
+
+    pool = MCPSessionPool()
+    try:
+        assert load_server("src/mcp_servers/template.py") is mcp
+        result = await pool.call_tool("src/mcp_servers/template.py", "example_tool", {"text": "hi"})
+        assert result.data == {"result": "Processed: hi"}
+    finally:
+        await pool.close()
+
+# --- Result Cache Tests ---
+@pytest.mark.asyncio
+async def test_result_cache_and_coalescing(monkeypatch):
+    from src.utils import mcp_client
+    from src.utils.mcp_client import call_mcp_tool, clear_result_cache, tool_cache_scope
+
+    mcp = FastMCP("cache-server")
+    calls = {"quote": 0, "live": 0}
+
+    @mcp.tool(meta={"cache_ttl": 60})
+    async def quote(ticker: str) -> dict:
+        calls["quote"] += 1
+        await asyncio.sleep(0.05)
+        return {"ticker": ticker}
+
+    @mcp.tool()
+    async def live(ticker: str) -> dict:
+        calls["live"] += 1
+        return {"ticker": ticker}
+
+    pool = CountingPool({"srv": mcp})
+    monkeypatch.setattr(mcp_client, "get_session_pool", lambda: pool)
+    clear_result_cache()
+    try:
+        # Concurrent identical calls share one request; results are independent copies
+        first, second = await asyncio.gather(call_mcp_tool("srv", "quote", ticker="NVDA"),
+                                             call_mcp_tool("srv", "quote", ticker="NVDA"))
+        assert first == second == {"ticker": "NVDA"} and first is not second
+        # Advertised TTL: served from the cross-run cache
+        await call_mcp_tool("srv", "quote", ticker="NVDA")
+        assert calls["quote"] == 1
+
+        # No TTL: only reused within a run
+        await call_mcp_tool("srv", "live", ticker="NVDA")
+        with tool_cache_scope():
+            await call_mcp_tool("srv", "live", ticker="NVDA")
+            await call_mcp_tool("srv", "live", ticker="NVDA")
+        assert calls["live"] == 2
+    finally:
+        clear_result_cache()
+        await pool.close()
+
+@pytest.mark.asyncio
+async def test_coalesced_call_survives_owner_timeout(monkeypatch):
+    from src.utils import mcp_client
+    from src.utils.mcp_client import ToolCall, call_mcp_tool, call_mcp_tools, clear_result_cache
+
+    mcp = FastMCP("slow-server")
+    calls = {"n": 0}
+
+    @mcp.tool()
+    async def slow(ticker: str) -> dict:
+        calls["n"] += 1
+        await asyncio.sleep(0.3)
+        return {"ticker": ticker}
+
+    pool = CountingPool({"srv": mcp})
+    monkeypatch.setattr(mcp_client, "get_session_pool", lambda: pool)
+    clear_result_cache()
+    try:
+        async def joiner():
+            await asyncio.sleep(0.05)  # Join after the owning call has started
+            return await call_mcp_tool("srv", "slow", ticker="NVDA")
+
+        owner, joined = await asyncio.gather(
+            call_mcp_tools([ToolCall("srv", "slow", {"ticker": "NVDA"}, timeout=0.1)]), joiner())
+        # The owner timing out leaves the shared request running for the joiner
+        assert "timed out" in owner[0]["error"]
+        assert joined == {"ticker": "NVDA"}
+        assert calls["n"] == 1
+    finally:
+        await pool.close()
+
+@pytest.mark.asyncio
+async def test_wrapped_errors_are_not_cached(monkeypatch):
+    from src.utils import mcp_client
+    from src.utils.mcp_client import call_mcp_tool, clear_result_cache, tool_cache_scope
+
+    mcp = FastMCP("flaky-server")
+    calls = {"n": 0}
+
+    @mcp.tool(meta={"cache_ttl": 60})
+    async def forecast(ticker: str) -> dict:
+        calls["n"] += 1
+        return {"forecast": {"error": "Data unavailable"}}
+
+    pool = CountingPool({"srv": mcp})
+    monkeypatch.setattr(mcp_client, "get_session_pool", lambda: pool)
+    clear_result_cache()
+    try:
+        with tool_cache_scope():
+            for _ in range(2):
+                assert await call_mcp_tool("srv", "forecast", ticker="NVDA") == {"forecast": {"error": "Data unavailable"}}
+        assert calls["n"] == 2
+    finally:
+        clear_result_cache()
+        await pool.close()
@@ -0,0 +1,64 @@
+import pytest
+import pandas as pd
+import numpy as np
+from unittest.mock import patch
+from src.tools.forecast.panel_indicators import PanelIndicators, compute_indicators, latest_values
+from src.utils.serialization import to_jsonable
+
+@pytest.fixture
+def panel():
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range('2023-01-02', periods=260, name='Date')
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (260, 3)), axis=0))
+    frame = pd.DataFrame(close, index=dates, columns=["AAPL", "MSFT", "NEWCO"])
+    # NEWCO only starts trading a third of the way in
+    frame.iloc[:90, 2] = np.nan
+    return frame
+
+def reference(close: pd.Series) -> dict:
+    """Indicators computed the pandas way, one ticker at a time."""
+    close = close.dropna()
+    delta = close.diff()
+    gain = delta.where(delta > 0, 0).rolling(14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
+    macd = close.ewm(span=12, adjust=False).mean() - close.ewm(span=26, adjust=False).mean()
+    return {
+        "sma_20": close.rolling(20).mean(),
+        "sma_200": close.rolling(200).mean(),
+        "rsi_14": 100 - 100 / (1 + gain / loss),
+        "macd": macd,
+        "macd_signal": macd.ewm(span=9, adjust=False).mean(),
+        "bb_upper": close.rolling(20).mean() + 2 * close.rolling(20).std(),
+        "volatility_annualized_pct": np.log(close / close.shift(1)).expanding().std() * np.sqrt(252) * 100,
+    }
+
+def test_panel_matches_per_ticker_pandas(panel):
+    series = compute_indicators(panel.to_numpy())
+    for i, ticker in enumerate(panel.columns):
+        expected = reference(panel[ticker])
+        offset = len(panel) - len(expected["sma_20"])
+        for name, values in expected.items():
+            np.testing.assert_allclose(series[name][offset:, i], values.to_numpy(), rtol=1e-8, err_msg=f"{ticker} {name}")
+        assert np.isnan(series["sma_20"][:offset, i]).all()
+
+    latest = latest_values(series)
+    assert np.isnan(latest["sma_200"][2])  # Not enough NEWCO history yet
+    assert latest["current_price"][0] == panel["AAPL"].iloc[-1]
+
+def test_calculate_indicators_many(panel):
+    frames = {t: panel[[t]].dropna().rename(columns={t: "Close"}) for t in panel.columns}
+    with patch('src.tools.forecast.panel_indicators.YahooFinanceTool') as mock_yf:
+        mock_yf.return_value.get_price_frames_many.return_value = (frames, {"BAD": "No price data available"})
+        result = PanelIndicators().calculate_indicators_many(["AAPL", "MSFT", "NEWCO", "BAD"], include_series=True)
+
+    assert set(result["results"]) == {"AAPL", "MSFT", "NEWCO"}
+    assert result["errors"] == {"BAD": "No price data available"}
+    assert len(result["dates"]) == len(panel)
+    newco = result["results"]["NEWCO"]
+    assert np.isnan(newco["series"]["current_price"][0])
+    assert newco["series"]["current_price"][-1] == newco["current_price"]
+
+    # Missing values are null once serialized for MCP
+    payload = to_jsonable(result)
+    assert payload["results"]["NEWCO"]["series"]["current_price"][0] is None
+    assert newco["signals"]
@@ -0,0 +1,187 @@
+import pytest
+import pandas as pd
+import numpy as np
+from unittest.mock import patch
+from src.tools.financial.price_store import PriceStore, normalize_bars, period_start
+from src.tools.financial.yahoo_finance import YahooFinanceTool
+from src.utils.market_calendar import MarketHoursTTL
+
+def make_history(start=None, periods=300, tz='America/New_York'):
+    """Build a frame shaped like yfinance Ticker.history() output, ending today by default."""
+    if start is None:
+        dates = pd.bdate_range(end=pd.Timestamp.today(), periods=periods, tz=tz, name='Date')
+    else:
+        dates = pd.bdate_range(start=start, periods=periods, tz=tz, name='Date')
+    close = np.linspace(100, 200, periods)
+    return pd.DataFrame({
+        "Open": close - 1, "High": close + 1, "Low": close - 2, "Close": close,
+        "Volume": np.full(periods, 1_000_000, dtype="int64"),
+        "Dividends": 0.0, "Stock Splits": 0.0,
+    }, index=dates)
+
+@pytest.fixture
+def store(tmp_path):
+    return PriceStore(root=str(tmp_path))
+
+# --- Store Tests ---
+def test_normalize_bars():
+    bars = normalize_bars(make_history(periods=5))
+    assert bars.index.tz is None
+    assert bars.index.name == 'Date'
+    assert all(dtype == np.float64 for dtype in bars.dtypes)
+
+def test_store_roundtrip(store):
+    bars = normalize_bars(make_history())
+    store.write("aapl", bars, {"period": "2y"})
+
+    assert store.tickers() == ["AAPL"]
+    assert store.metadata("AAPL")["period"] == "2y"
+
+    loaded = store.read("AAPL")
+    pd.testing.assert_frame_equal(loaded, bars, check_freq=False, check_index_type=False)
+
+    start = bars.index[100]
+    sliced = store.read("AAPL", start=start, columns=["Close"])
+    assert list(sliced.columns) == ["Close"]
+    assert sliced.index[0] == start
+    assert len(sliced) == len(bars) - 100
+
+def test_concurrent_writes_same_ticker(store):
+    import os
+    from concurrent.futures import ThreadPoolExecutor
+    frames = [normalize_bars(make_history(periods=n)) for n in range(200, 216)]
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda bars: store.write("AAPL", bars), frames))
+
+    # One complete write wins; no temp files are left behind
+    assert len(store.read("AAPL")) in {len(f) for f in frames}
+    assert os.listdir(store.root) == ["AAPL.arrow"]
+
+def test_store_missing_ticker(store):
+    assert store.read("MSFT") is None
+    assert store.metadata("MSFT") == {}
+
+def test_period_start():
+    today = pd.Timestamp('2024-06-15')
+    assert period_start("1y", today) == pd.Timestamp('2023-06-15')
+    assert period_start("ytd", today) == pd.Timestamp('2024-01-01')
+    assert period_start("max", today) is None
+
+# --- Yahoo Fetch Path Tests ---
+def test_price_frame_served_from_store(store):
+    with patch.object(YahooFinanceTool, 'price_store', store), \
+         patch('src.tools.financial.yahoo_finance.yf.Ticker') as mock_ticker:
+        mock_ticker.return_value.history.return_value = make_history(start='2024-01-02')
+
+        first = YahooFinanceTool.get_price_frame("AAPL", period="max")
+        second = YahooFinanceTool.get_price_frame("AAPL", period="max")
+
+        assert mock_ticker.return_value.history.call_count == 1
+        pd.testing.assert_frame_equal(first, second)
+
+        records = YahooFinanceTool.get_price_history("AAPL", period="max")
+        assert records[0]['Date'] == '2024-01-02'
+        assert records[-1]['Close'] == 200.0
+
+def test_incremental_sync_fetches_only_new_bars(store):
+    full = make_history(periods=300)
+    with patch.object(YahooFinanceTool, 'price_store', store), \
+         patch('src.tools.financial.yahoo_finance.yf.Ticker') as mock_ticker:
+        history = mock_ticker.return_value.history
+        history.return_value = full.iloc[:-5]
+        YahooFinanceTool.get_price_frame("AAPL", period="max")
+
+        # Store goes stale: only bars from the last stored one onwards are requested
+        with patch('src.tools.financial.yahoo_finance.PRICE_HISTORY_TTL', MarketHoursTTL(open_ttl=0, closed_ttl=0)):
+            history.return_value = full.iloc[-6:]
+            bars = YahooFinanceTool.get_price_frame("AAPL", period="max")
+
+        assert history.call_args.kwargs == {"start": full.index[-6].strftime('%Y-%m-%d')}
+        assert len(bars) == 300
+        assert store.metadata("AAPL")["last_bar"] == full.index[-1].strftime('%Y-%m-%d')
+
+        # Shorter periods are sliced from the merged series without another download
+        calls = history.call_count
+        short = YahooFinanceTool.get_price_frame("AAPL", period="1mo")
+        assert history.call_count == calls
+        assert short.index[-1] == bars.index[-1]
+
+def test_new_dividend_triggers_full_refetch(store):
+    full = make_history(periods=300)
+    with patch.object(YahooFinanceTool, 'price_store', store), \
+         patch('src.tools.financial.yahoo_finance.yf.Ticker') as mock_ticker:
+        history = mock_ticker.return_value.history
+        history.return_value = full.iloc[:-5]
+        YahooFinanceTool.get_price_frame("AAPL", period="max")
+
+        delta = full.iloc[-6:].copy()
+        delta.iloc[-1, delta.columns.get_loc("Dividends")] = 0.25
+        history.side_effect = [delta, full]
+        with patch('src.tools.financial.yahoo_finance.PRICE_HISTORY_TTL', MarketHoursTTL(open_ttl=0, closed_ttl=0)):
+            YahooFinanceTool.get_price_frame("AAPL", period="max")
+
+        assert history.call_args.kwargs == {"period": "max"}
+        assert len(store.read("AAPL")) == 300
+
+def test_empty_incremental_sync_keeps_series_stale(store):
+    full = make_history(periods=300)
+    with patch.object(YahooFinanceTool, 'price_store', store), \
+         patch('src.tools.financial.yahoo_finance.yf.Ticker') as mock_ticker:
+        history = mock_ticker.return_value.history
+        history.return_value = full.iloc[:-5]
+        YahooFinanceTool.get_price_frame("AAPL", period="max")
+        fetched_at = store.metadata("AAPL")["fetched_at"]
+
+        # Provider hiccup: the incremental download comes back empty
+        history.return_value = full.iloc[:0]
+        with patch('src.tools.financial.yahoo_finance.PRICE_HISTORY_TTL', MarketHoursTTL(open_ttl=0, closed_ttl=0)):
+            with pytest.raises(ValueError, match="No price data returned"):
+                YahooFinanceTool.sync_price_history("AAPL", period="max")
+
+        assert "start" in history.call_args.kwargs
+        assert store.metadata("AAPL")["fetched_at"] == fetched_at
+        assert len(store.read("AAPL")) == 295
+
+# --- Batch Tests ---
+def test_price_history_many_reports_partial_failures(store):
+    aapl = make_history(periods=50)
+    data = pd.concat({"AAPL": aapl.tz_localize(None), "BAD": aapl.tz_localize(None) * np.nan}, axis=1)
+    with patch.object(YahooFinanceTool, 'price_store', store), \
+         patch('src.tools.financial.yahoo_finance.yf.download', return_value=data) as mock_download:
+        result = YahooFinanceTool.get_price_history_many(["AAPL", "BAD", "AAPL"], period="1mo")
+
+        mock_download.assert_called_once()
+        assert mock_download.call_args.args[0] == ["AAPL", "BAD"]
+        assert list(result["results"]) == ["AAPL"]
+        assert result["results"]["AAPL"][-1]["Close"] == 200.0
+        assert "BAD" in result["errors"]
+
+def test_incremental_bulk_sync_reports_missing_tickers(store):
+    full = make_history(periods=300)
+    with patch.object(YahooFinanceTool, 'price_store', store):
+        for ticker in ["AAPL", "MSFT"]:
+            store.merge(ticker, normalize_bars(full.iloc[:-5]))
+        fetched_at = store.metadata("MSFT")["fetched_at"]
+
+        # Stale store; the bulk download only returns AAPL
+        delta = full.iloc[-6:].tz_localize(None)
+        with patch('src.tools.financial.yahoo_finance.PRICE_HISTORY_TTL', MarketHoursTTL(open_ttl=0, closed_ttl=0)), \
+             patch('src.tools.financial.yahoo_finance.yf.download', return_value=pd.concat({"AAPL": delta}, axis=1)):
+            errors = YahooFinanceTool.sync_price_history_many(["AAPL", "MSFT"], period="max")
+
+        assert errors == {"MSFT": "No price data returned"}
+        assert len(store.read("AAPL")) == 300
+        # The failed ticker is not marked fresh
+        assert store.metadata("MSFT")["fetched_at"] == fetched_at
+        assert len(store.read("MSFT")) == 295
+
+def test_stock_info_many():
+    def fake_info(ticker):
+        if ticker == "BAD":
+            return {"error": "not found"}
+        return {"symbol": ticker}
+
+    with patch.object(YahooFinanceTool, 'get_stock_info', side_effect=fake_info):
+        result = YahooFinanceTool.get_stock_info_many(["AAPL", "MSFT", "BAD"])
+    assert result["results"]["MSFT"] == {"symbol": "MSFT"}
+    assert result["errors"] == {"BAD": "not found"}
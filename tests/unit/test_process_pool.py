@@ -0,0 +1,48 @@
+import os
+import subprocess
+import sys
+import time
+import pytest
+from src.utils.process_pool import TaskError, TaskTimeout, run_tasks
+
+def square(x):
+    return x * x
+
+def fail(message):
+    raise ValueError(message)
+
+def start_child_and_hang(pid_file):
+    # Stands in for cmdstanpy running the Stan binary
+    child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+    with open(pid_file, "w") as f:
+        f.write(str(child.pid))
+    time.sleep(60)
+
+def is_running(pid: int) -> bool:
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().split(")")[-1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+def test_run_tasks_returns_results_and_errors():
+    outcomes = {key: (result, error) for key, result, error in
+                run_tasks(square, {"a": (3,), "b": (4,)}, max_workers=2)}
+    assert outcomes == {"a": (9, None), "b": (16, None)}
+
+    [(key, result, error)] = run_tasks(fail, {"x": ("boom",)}, max_workers=1)
+    assert result is None and isinstance(error, TaskError) and str(error) == "boom"
+
+@pytest.mark.skipif(not os.path.isdir("/proc") or not hasattr(os, "killpg"), reason="needs POSIX process groups")
+def test_timeout_kills_worker_and_its_subprocesses(tmp_path):
+    pid_file = str(tmp_path / "child.pid")
+    started = time.perf_counter()
+    [(key, result, error)] = run_tasks(start_child_and_hang, {"slow": (pid_file,)}, max_workers=1, timeout=1)
+
+    assert isinstance(error, TaskTimeout)
+    assert time.perf_counter() - started < 30
+    child = int(open(pid_file).read())
+    deadline = time.monotonic() + 5
+    while is_running(child) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not is_running(child)
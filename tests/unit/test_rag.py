@@ -1,15 +1,19 @@
 import pytest
+import numpy as np
 from unittest.mock import MagicMock, patch
-from src.rag.embeddings import LocalEmbeddings
+from src.rag.embeddings import HAS_ONNX, EmbeddingCache, LocalEmbeddings
 from src.rag.chunking import RecursiveChunker, SECChunker
 from src.rag.vectorstore import QuantChroma
 from src.rag.retriever import HybridRetriever
 
 # --- Embeddings Tests ---
 @pytest.fixture
-def mock_sentence_transformer():
-    with patch('src.rag.embeddings.SentenceTransformer') as mock:
+def mock_sentence_transformer(tmp_path):
+    with patch('src.rag.embeddings.SentenceTransformer') as mock, \
+         patch('src.rag.embeddings.EMBEDDING_CACHE_DIR', str(tmp_path)):
         yield mock
+    # Fresh singleton per test
+    LocalEmbeddings._instance = None
 
 def test_embeddings_singleton(mock_sentence_transformer):
     e1 = LocalEmbeddings()
@@ -19,10 +23,70 @@ def test_embeddings_singleton(mock_sentence_transformer):
 def test_embed_query(mock_sentence_transformer):
     embedder = LocalEmbeddings()
     # Mock encode output
-    embedder.model.encode.return_value = MagicMock(tolist=lambda: [0.1, 0.2])
+    embedder.model.encode.return_value = np.array([[0.5, 0.25]])
     
     vec = embedder.embed_query("test")
-    assert vec == [0.1, 0.2]
+    assert isinstance(vec, np.ndarray)
+    assert vec.tolist() == [0.5, 0.25]
+
+def test_embedding_cache_encodes_only_misses(mock_sentence_transformer, tmp_path):
+    embedder = LocalEmbeddings()
+    embedder.cache = EmbeddingCache(str(tmp_path / "emb"))
+    embedder.model.encode.side_effect = lambda texts, **kwargs: np.array([[len(t), 1.0] for t in texts])
+
+    first = embedder.embed_documents(["aa", "bbb", "aa"])
+    assert first.tolist() == [[2.0, 1.0], [3.0, 1.0], [2.0, 1.0]]
+    # Misses are encoded once each, longest first
+    assert embedder.model.encode.call_count == 1
+    assert embedder.model.encode.call_args.args[0] == ["bbb", "aa"]
+
+    embedder.model.encode.reset_mock()
+    assert embedder.embed_documents(["bbb", "c"]).tolist() == [[3.0, 1.0], [1.0, 1.0]]
+    assert embedder.model.encode.call_args.args[0] == ["c"]
+
+def test_encode_length_sorted_batches_restore_order(mock_sentence_transformer, monkeypatch):
+    from src.config import settings
+    embedder = LocalEmbeddings()
+    embedder.cache = None
+    monkeypatch.setattr(settings, "embedding_batch_size", 2)
+    embedder.model.encode.side_effect = lambda texts, **kwargs: np.array([[len(t)] for t in texts])
+
+    vectors = embedder.embed_documents(["a", "ccc", "bb", "dddd"])
+    assert vectors.dtype == np.float32
+    assert vectors[:, 0].tolist() == [1, 3, 2, 4]
+    assert embedder.model.encode.call_args.args[0] == ["dddd", "ccc", "bb", "a"]
+    assert embedder.model.encode.call_args.kwargs["batch_size"] == 2
+
+def test_load_model_backend_selection(mock_sentence_transformer, monkeypatch):
+    from src.rag import embeddings
+    monkeypatch.setattr(embeddings, "HAS_ONNX", True)
+    _, backend = embeddings.load_model("m", "onnx")
+    assert backend == "onnx"
+    assert mock_sentence_transformer.call_args.kwargs["backend"] == "onnx"
+
+    # Missing optional dependencies fall back to torch
+    monkeypatch.setattr(embeddings, "HAS_ONNX", False)
+    _, backend = embeddings.load_model("m", "onnx")
+    assert backend == "torch"
+    with pytest.raises(ValueError):
+        embeddings.load_model("m", "tpu")
+
+@pytest.mark.skipif(not HAS_ONNX, reason="optimum[onnxruntime] not installed")
+def test_onnx_parity_with_torch():
+    from src.rag.embeddings import load_model
+    texts = ["Goodwill impairment charges increased in fiscal 2023.",
+             "Item 1A. Risk Factors",
+             "The Company repurchased $90 billion of its common stock."]
+    try:
+        torch_model, _ = load_model(LocalEmbeddings._model_name, "torch")
+        onnx_model, _ = load_model(LocalEmbeddings._model_name, "onnx")
+    except Exception as e:
+        pytest.skip(f"Embedding model unavailable: {e}")
+
+    a = torch_model.encode(texts, normalize_embeddings=True)
+    b = onnx_model.encode(texts, normalize_embeddings=True)
+    assert a.shape == b.shape
+    assert (a * b).sum(axis=1).min() > 0.99
 
 # --- Chunking Tests ---
 def test_recursive_chunker():
@@ -49,6 +113,10 @@ def mock_chroma():
     with patch('chromadb.PersistentClient') as mock:
         yield mock
 
+@pytest.fixture(autouse=True)
+def lexical_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr('src.rag.vectorstore.LEXICAL_DIR', str(tmp_path / "bm25"))
+
 @pytest.fixture
 def mock_embedder_cls():
     with patch('src.rag.vectorstore.LocalEmbeddings') as mock:
@@ -69,6 +137,42 @@ def test_vectorstore_add(mock_chroma, mock_embedder_cls):
     assert len(kwargs['documents']) == 2
     assert len(kwargs['embeddings']) == 2
 
+def test_vectorstore_skips_existing_chunks(mock_chroma, mock_embedder_cls):
+    from src.rag.vectorstore import chunk_id
+    mock_embedder_cls.return_value.embed_documents.side_effect = lambda texts: [[0.1]] * len(texts)
+
+    vs = QuantChroma()
+    meta = {'ticker': 'AAPL', 'source': '10k.txt'}
+    chunks = [{'text': 'Old  paragraph', 'metadata': meta}, {'text': 'New paragraph', 'metadata': meta},
+              {'text': 'New paragraph', 'metadata': meta}]
+    # IDs are stable across processes and ignore whitespace differences
+    assert chunk_id('Old paragraph\n', meta) == chunk_id('Old  paragraph', meta)
+    vs.collection.get.return_value = {'ids': [chunk_id('Old paragraph', meta)]}
+
+    assert vs.add_documents(chunks) == 1
+    kwargs = vs.collection.upsert.call_args.kwargs
+    assert kwargs['documents'] == ['New paragraph']
+    assert kwargs['ids'] == [chunk_id('New paragraph', meta)]
+
+def test_vectorstore_failed_embedding_skips_lexical(mock_chroma, mock_embedder_cls):
+    import numpy as np
+    mock_embedder_cls.return_value.embed_documents.return_value = np.empty((0, 0))
+
+    vs = QuantChroma()
+    assert vs.add_documents([{'text': 'Goodwill impairment', 'metadata': {}}]) == 0
+    vs.collection.upsert.assert_not_called()
+    # No BM25-only chunks without vectors
+    assert len(vs.lexical) == 0
+
+def test_lexical_search_sees_other_ingestions(mock_chroma, mock_embedder_cls):
+    mock_embedder_cls.return_value.embed_documents.side_effect = lambda texts: [[0.1]] * len(texts)
+    reader, writer = QuantChroma(), QuantChroma()
+    assert reader.lexical_search("goodwill") == []
+
+    # Another process (its own QuantChroma) ingests a filing
+    writer.add_documents([{'text': 'Goodwill impairment charge', 'metadata': {'ticker': 'AAPL'}}])
+    assert [r['text'] for r in reader.lexical_search("goodwill")] == ['Goodwill impairment charge']
+
 # --- Retriever Tests ---
 def test_retriever(mock_chroma, mock_embedder_cls):
     retriever = HybridRetriever()
@@ -84,3 +188,25 @@ def test_retriever(mock_chroma, mock_embedder_cls):
     results = retriever.retrieve("query", ticker="AAPL")
     assert len(results) == 1
     assert results[0]['text'] == 'Doc 1'
+
+def test_retriever_fuses_lexical_results(mock_chroma, mock_embedder_cls):
+    retriever = HybridRetriever()
+    retriever.vectorstore.lexical.add(
+        ['2', '3'], ['Goodwill impairment charge', 'Unrelated text'], [{'ticker': 'AAPL'}, {'ticker': 'AAPL'}])
+    retriever.vectorstore.collection.query.return_value = {
+        'ids': [['1', '2']],
+        'documents': [['Doc 1', 'Goodwill impairment charge']],
+        'metadatas': [[{'ticker': 'AAPL'}, {'ticker': 'AAPL'}]],
+        'distances': [[0.1, 0.2]]
+    }
+
+    results = retriever.retrieve("goodwill impairment", ticker="AAPL", limit=2)
+    # Found by both searches, so it outranks the top vector-only hit
+    assert [r['id'] for r in results] == ['2', '1']
+    assert results[0]['distance'] == 0.2 and results[0]['bm25'] > 0
+
+def test_rrf_fuse():
+    from src.rag.retriever import rrf_fuse
+    fused = rrf_fuse([[{'id': 'a'}, {'id': 'b'}], [{'id': 'b'}, {'id': 'c'}]], k=60)
+    assert [d['id'] for d in fused] == ['b', 'a', 'c']
+    assert fused[0]['score'] == pytest.approx(1 / 62 + 1 / 61)
@@ -0,0 +1,37 @@
+import datetime
+import json
+import numpy as np
+import pandas as pd
+from src.utils.serialization import to_jsonable, from_jsonable
+
+def test_to_jsonable_normalizes_types():
+    frame = pd.DataFrame({pd.Timestamp('2024-03-31'): [1.0, np.nan]}, index=["Revenue", "EBIT"])
+    payload = to_jsonable({
+        "price": np.float64(101.5),
+        "volume": np.int64(10),
+        "flag": np.bool_(True),
+        "missing": float("nan"),
+        "when": pd.Timestamp('2024-01-02'),
+        "stamp": datetime.datetime(2024, 1, 2, 15, 30),
+        "nat": pd.NaT,
+        "values": np.array([1.0, np.inf]),
+        "frame": frame,
+    })
+
+    assert payload == {
+        "price": 101.5, "volume": 10, "flag": True, "missing": None,
+        "when": "2024-01-02", "stamp": "2024-01-02T15:30:00", "nat": None,
+        "values": [1.0, None],
+        "frame": {"2024-03-31": {"Revenue": 1.0, "EBIT": None}},
+    }
+    # Strict JSON (no NaN literals)
+    json.dumps(payload, allow_nan=False)
+
+def test_binary_arrays_roundtrip():
+    values = np.linspace(0, 1, 1000)
+    payload = to_jsonable({"small": np.arange(3), "large": values}, binary_threshold=100)
+
+    assert payload["small"] == [0, 1, 2]
+    assert "__ndarray__" in payload["large"]
+    decoded = from_jsonable(json.loads(json.dumps(payload)))
+    np.testing.assert_array_equal(decoded["large"], values)
@@ -0,0 +1,89 @@
+import pytest
+import pandas as pd
+import numpy as np
+from unittest.mock import patch
+from src.tools.forecast.streaming_indicators import IndicatorState, StreamingIndicators, WilderRSI
+
+@pytest.fixture
+def closes():
+    rng = np.random.default_rng(1)
+    dates = pd.bdate_range('2023-01-02', periods=400, name='Date')
+    return pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.02, 400))), index=dates, name='Close')
+
+def wilder_reference(close: pd.Series, period: int = 14) -> float:
+    moves = close.diff().dropna().to_numpy()
+    gains, losses = np.clip(moves, 0, None), np.clip(-moves, 0, None)
+    avg_gain, avg_loss = gains[:period].mean(), losses[:period].mean()
+    for g, l in zip(gains[period:], losses[period:]):
+        avg_gain = (avg_gain * (period - 1) + g) / period
+        avg_loss = (avg_loss * (period - 1) + l) / period
+    return 100 - 100 / (1 + avg_gain / avg_loss)
+
+def test_incremental_matches_batch(closes):
+    state = IndicatorState()
+    for date, value in closes.items():
+        state.update(date, value)
+    values = state.snapshot()
+
+    macd = closes.ewm(span=12, adjust=False).mean() - closes.ewm(span=26, adjust=False).mean()
+    log_returns = np.log(closes / closes.shift(1))
+    assert values["sma_200"] == pytest.approx(closes.iloc[-200:].mean(), rel=1e-12)
+    assert values["macd"] == pytest.approx(macd.iloc[-1], rel=1e-9)
+    assert values["macd_signal"] == pytest.approx(macd.ewm(span=9, adjust=False).mean().iloc[-1], rel=1e-9)
+    assert values["bb_upper"] == pytest.approx(closes.iloc[-20:].mean() + 2 * closes.iloc[-20:].std(), rel=1e-9)
+    assert values["volatility_annualized_pct"] == pytest.approx(log_returns.iloc[-252:].std() * np.sqrt(252) * 100, rel=1e-9)
+    assert values["rsi_14"] == pytest.approx(wilder_reference(closes), rel=1e-9)
+
+def test_state_roundtrip_and_peek(closes):
+    full, resumed = IndicatorState(), IndicatorState()
+    for date, value in closes.iloc[:-1].items():
+        full.update(date, value)
+        resumed.update(date, value)
+    resumed = IndicatorState.from_state(resumed.to_state())
+
+    # Peeking at a partial bar gives the same values as consuming it, without changing state
+    peeked = resumed.snapshot(partial_close=closes.iloc[-1])
+    assert resumed.last_date == closes.index[-2]
+    full.update(closes.index[-1], closes.iloc[-1])
+    for name, value in full.snapshot().items():
+        assert peeked[name] == pytest.approx(value, rel=1e-9)
+
+def test_wilder_rsi_warmup():
+    rsi = WilderRSI(3)
+    assert np.isnan(rsi.update(10.0))
+    rsi.update(11.0)
+    rsi.update(12.0)
+    assert rsi.update(13.0) == 100.0
+
+def test_tool_consumes_only_new_bars(isolated_cache, closes):
+    frame = closes.to_frame()
+    with patch('src.tools.forecast.streaming_indicators.YahooFinanceTool') as mock_yf, \
+         patch('src.tools.forecast.streaming_indicators.is_market_open', return_value=False):
+        tool = StreamingIndicators()
+        tool.yf_tool.get_price_frame.return_value = frame.iloc[:-2]
+        first = tool.get_indicators("AAPL")
+
+        tool.yf_tool.get_price_frame.return_value = frame
+        with patch.object(IndicatorState, 'update', autospec=True, side_effect=IndicatorState.update) as update:
+            second = tool.get_indicators("AAPL")
+
+    assert update.call_count == 2
+    assert first["as_of"] == closes.index[-3].strftime('%Y-%m-%d')
+    assert second["current_price"] == closes.iloc[-1]
+    assert second["signals"]
+
+@pytest.mark.parametrize("bars", [250, 500])
+def test_tool_volatility_defined_after_rebuild(isolated_cache, bars):
+    # A calendar year of daily bars holds fewer than 252 returns
+    rng = np.random.default_rng(2)
+    dates = pd.bdate_range('2024-01-02', periods=bars, name='Date')
+    frame = pd.DataFrame({'Close': 100 * np.exp(np.cumsum(rng.normal(0, 0.02, bars)))}, index=dates)
+    with patch('src.tools.forecast.streaming_indicators.YahooFinanceTool') as mock_yf, \
+         patch('src.tools.forecast.streaming_indicators.is_market_open', return_value=False):
+        tool = StreamingIndicators()
+        tool.yf_tool.get_price_frame.return_value = frame
+        result = tool.get_indicators("AAPL")
+
+    log_returns = np.log(frame['Close'] / frame['Close'].shift(1)).dropna()
+    assert tool.yf_tool.get_price_frame.call_args.kwargs["period"] == "2y"
+    assert result["volatility_annualized_pct"] == pytest.approx(log_returns.iloc[-252:].std() * np.sqrt(252) * 100, rel=1e-9)